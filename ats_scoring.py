@@ -0,0 +1,117 @@
+import re
+from itertools import chain
+from typing import List
+
+# BM25 parameters and the blend used for the final 0-1 score
+BM25_K1 = 1.5
+BM25_B = 0.75
+COVERAGE_WEIGHT = 0.5
+BM25_WEIGHT = 0.35
+COSINE_WEIGHT = 0.15
+MAX_REPORTED_KEYWORDS = 20
+
+# Keeps tech tokens such as c++, c#, node.js and ci/cd pieces intact
+TOKEN_REGEX = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+SHORT_TERMS = frozenset({"c", "r", "go", "ai", "ml", "ui", "ux", "qa", "bi", "ci", "cd", "os", "db"})
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be been before being below between both but by
+can could did do does doing down during each etc few for from further had has have having he her here hers
+him his how i if in into is it its itself just me more most my no nor not now of off on once only or other
+our ours out over own per same she should so some such than that the their them then there these they this
+those through to too under until up us use used using very via was we were what when where which while who
+whom why will with within would you your yours
+able ability across candidate candidates company description experience including job looking must plus
+preferred required requirement requirements responsibilities role skills strong team work working years
+name email phone address summary education project projects http https www com
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        token for token in TOKEN_REGEX.findall(text.lower())
+        if token not in STOPWORDS
+        and not token.isdigit()
+        and (len(token) > 2 or token in SHORT_TERMS or token[-1] in "+#")
+    ]
+
+
+def _segments(text: str) -> List[List[str]]:
+    return [tokens for tokens in (tokenize(line) for line in text.splitlines()) if tokens]
+
+
+# Score how well `resume_text` covers `requirements_text` without calling an LLM.
+#
+# Both texts are split into line segments and turned into one segment x term
+# count matrix; IDF comes from segment document frequencies. The returned
+# "score" blends keyword coverage, a BM25 term-saturation score normalised to
+# 0-1, and TF-IDF cosine similarity.
+def score_resume(resume_text: str, requirements_text: str, k1: float = BM25_K1, b: float = BM25_B) -> dict:
+    # numpy is only needed once a resume is scored; tokenize is imported by
+    # modules on the app's startup path
+    import numpy as np
+
+    resume_segments = _segments(resume_text)
+    requirement_segments = _segments(requirements_text)
+    if not requirement_segments:
+        return {"score": 0.0, "keyword_coverage": 0.0, "bm25": 0.0, "cosine": 0.0,
+                "matched_keywords": [], "missing_keywords": []}
+
+    segments = resume_segments + requirement_segments
+    vocabulary = {term: index for index, term in enumerate(dict.fromkeys(chain.from_iterable(segments)))}
+    terms = np.array(list(vocabulary), dtype=object)
+
+    rows = np.repeat(np.arange(len(segments)), [len(segment) for segment in segments])
+    cols = np.fromiter((vocabulary[term] for term in chain.from_iterable(segments)), dtype=np.int64, count=len(rows))
+    matrix = np.zeros((len(segments), len(vocabulary)))
+    np.add.at(matrix, (rows, cols), 1.0)
+
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    idf = np.log((len(segments) + 1) / (document_frequency + 1)) + 1.0
+
+    resume_tf = matrix[:len(resume_segments)].sum(axis=0)
+    requirement_tf = matrix[len(resume_segments):].sum(axis=0)
+    required = requirement_tf > 0
+    present = resume_tf > 0
+
+    keyword_coverage = float(np.count_nonzero(present & required) / np.count_nonzero(required))
+
+    # BM25 saturation of each required term in the resume, capped at 1 so a
+    # term mentioned at a normal rate counts fully and repetition can't inflate the score
+    resume_length = resume_tf.sum()
+    average_length = (resume_length + requirement_tf.sum()) / 2
+    length_norm = k1 * (1 - b + b * resume_length / average_length)
+    saturation = np.minimum(1.0, resume_tf * (k1 + 1) / (resume_tf + length_norm))
+    weights = idf[required]
+    bm25 = float((weights * saturation[required]).sum() / weights.sum())
+
+    resume_vector = resume_tf * idf
+    requirement_vector = requirement_tf * idf
+    denominator = np.linalg.norm(resume_vector) * np.linalg.norm(requirement_vector)
+    cosine = float(resume_vector @ requirement_vector / denominator) if denominator else 0.0
+
+    # Report keywords ordered by how much they matter to the requirements
+    importance = requirement_tf * idf
+    order = np.argsort(-importance, kind="stable")
+    missing = terms[order[required[order] & ~present[order]]][:MAX_REPORTED_KEYWORDS].tolist()
+    matched = terms[order[required[order] & present[order]]][:MAX_REPORTED_KEYWORDS].tolist()
+
+    score = COVERAGE_WEIGHT * keyword_coverage + BM25_WEIGHT * bm25 + COSINE_WEIGHT * cosine
+    return {
+        "score": round(float(score), 4),
+        "keyword_coverage": round(keyword_coverage, 4),
+        "bm25": round(bm25, 4),
+        "cosine": round(cosine, 4),
+        "matched_keywords": matched,
+        "missing_keywords": missing,
+    }
+
+
+def format_score_feedback(result: dict) -> str:
+    lines = [
+        f"Local ATS match: {result['score']:.0%} "
+        f"(keyword coverage {result['keyword_coverage']:.0%}, BM25 {result['bm25']:.0%}, "
+        f"similarity {result['cosine']:.0%})"
+    ]
+    if result["missing_keywords"]:
+        lines.append("Missing keywords: " + ", ".join(result["missing_keywords"]))
+    return "\n".join(lines)
@@ -0,0 +1,75 @@
+# Benchmark: LLM calls and wall time per resume for the "llm" and "local" ATS scorers.
+#
+# A fake LLM writes the resume by echoing the candidate details and answers the
+# ATS prompt with a fixed percentage below the threshold, which is what forces
+# the LLM-scored loop through every iteration.
+#
+#   python benchmarks/bench_ats_scoring.py [runs]
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_CACHE_ENABLED"] = "0"
+
+import graph
+from ats_scoring import score_resume
+from llm_provider import set_llm
+
+CANDIDATE = (
+    "Name: Jane Roe\nEmail: jane@example.com\nLinkedIn: linkedin.com/in/janeroe\nGitHub: github.com/janeroe\n"
+    "Education: BSc Computer Science\nExperience:\n- Backend engineer building Python and Go microservices on Kubernetes\n"
+    "- Data engineer maintaining Spark pipelines and PostgreSQL warehouses\nProjects:\n- Realtime analytics dashboard in React"
+)
+
+
+class CountingFakeLLM:
+    model = "fake"
+    temperature = 0
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.calls += 1
+        if prompt.startswith("Create a professional resume"):
+            return prompt.split("information:\n\n", 1)[1].split("\n\nImprovement strategy", 1)[0]
+        if prompt.startswith("You are an Applicant Tracking System"):
+            return "Solid resume. Overall match: 72%."
+        return "Add more quantified achievements."
+
+
+async def run(scorer, runs):
+    fake = CountingFakeLLM()
+    set_llm("resume_graph", fake)
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = await graph.run_resume_ats_workflow(CANDIDATE, ats_scorer=scorer)
+        assert result and result["final_result"]
+    elapsed = time.perf_counter() - start
+    return fake.calls / runs, elapsed / runs, result["iterations"]
+
+
+async def run_scorers(runs):
+    try:
+        for scorer in ("llm", "local"):
+            calls, seconds, iterations = await run(scorer, runs)
+            print(f"{scorer:>5}: {calls:5.1f} LLM calls/resume, {iterations} iterations, {seconds * 1000:7.2f} ms/resume (excl. LLM latency)")
+    finally:
+        # The checkpoint database connection runs on a non-daemon thread
+        await graph.run_store.close()
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    asyncio.run(run_scorers(runs))
+
+    start = time.perf_counter()
+    for _ in range(runs * 10):
+        score_resume(CANDIDATE, CANDIDATE)
+    print(f"score_resume: {(time.perf_counter() - start) / (runs * 10) * 1e6:.0f} us/call")
+
+
+if __name__ == "__main__":
+    main()
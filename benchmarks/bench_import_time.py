@@ -0,0 +1,109 @@
+# Cold-start benchmark: how long `import main` takes (python -X importtime),
+# which top-level imports dominate, and how long startup and background
+# warm-up take until /ready would answer 200.
+#
+#   python benchmarks/bench_import_time.py [--repeat 5] [--budget-ms 1500]
+#
+# Exits non-zero when the fastest import of main exceeds the budget or when one
+# of the LAZY_MODULES (loaded on first use / during warm-up) is imported by
+# `import main` itself.
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAZY_MODULES = ("langchain", "langchain_core", "langgraph", "langchain_google_genai", "google.ai",
+                "reportlab", "pypdf", "fpdf", "numpy")
+IMPORTTIME_REGEX = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+READY_SCRIPT = """
+import asyncio, json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def run():
+    async with main.app.router.lifespan_context(main.app):
+        started = time.perf_counter()
+        while not main.warm_up.stats()["finished"]:
+            await asyncio.sleep(0.005)
+        return started, time.perf_counter(), main.warm_up.stats()
+
+started, warmed, stats = asyncio.run(run())
+print(json.dumps({"import": imported - start, "startup": started - imported,
+                  "warm_up": warmed - started, "steps": stats["steps"]}))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500")))
+    parser.add_argument("--top", type=int, default=12)
+    return parser.parse_args()
+
+
+def bench_env(workdir: str) -> dict:
+    env = dict(os.environ)
+    env.pop("GOOGLE_API_KEY", None)
+    env.update({
+        "LLM_PROVIDER": "fake",
+        "DATABASE_URL": f"sqlite:///{workdir}/bench.db",
+        "LLM_CACHE_PATH": f"{workdir}/llm_cache.db",
+        "WORKFLOW_CHECKPOINT_PATH": f"{workdir}/workflow_checkpoints.db",
+        "LOG_LEVEL": "WARNING",
+    })
+    return env
+
+
+# One `python -X importtime -c "import main"`; returns {module: (self_us, cumulative_us, depth)}
+def import_profile(env: dict) -> dict:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_REGEX.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2)
+    return modules
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        env = bench_env(workdir)
+        # Prime the bytecode cache so the first run is not an outlier
+        import_profile(env)
+        profiles = [import_profile(env) for _ in range(args.repeat)]
+        ready = json.loads(subprocess.run([sys.executable, "-c", READY_SCRIPT], cwd=ROOT, env=env,
+                                          capture_output=True, text=True, check=True).stdout)
+
+    totals = sorted(profile["main"][1] / 1000 for profile in profiles)
+    fastest = min(profiles, key=lambda profile: profile["main"][1])
+    print(f"import main: min {totals[0]:.0f} ms, median {totals[len(totals) // 2]:.0f} ms "
+          f"over {args.repeat} runs (budget {args.budget_ms:.0f} ms)")
+
+    print("\nslowest direct imports of main (cumulative ms, fastest run):")
+    direct = [(name, cumulative) for name, (_, cumulative, depth) in fastest.items() if depth == 1]
+    for name, cumulative in sorted(direct, key=lambda item: -item[1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}  {name}")
+
+    eager = sorted(name for name in fastest if name in LAZY_MODULES)
+    print(f"\nlazy modules imported by `import main`: {', '.join(eager) if eager else 'none'}")
+
+    print(f"\nstartup (lifespan hooks): {ready['startup'] * 1000:.0f} ms")
+    print(f"warm-up until ready:      {ready['warm_up'] * 1000:.0f} ms")
+    for name, step in ready["steps"].items():
+        print(f"  {name:<14} {step['status']:<8} {step.get('seconds', 0) * 1000:8.0f} ms")
+
+    if totals[0] > args.budget_ms or eager:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
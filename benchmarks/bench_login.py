@@ -0,0 +1,64 @@
+# Benchmark: login (bcrypt verify) throughput per core, before and after the worker pool.
+#
+# "before" verifies inline on the event loop like the old /login handler;
+# "after" uses passwords.verify_and_update_password. A 10 ms ticker runs
+# alongside and reports the worst event-loop stall it saw.
+#
+#   BCRYPT_ROUNDS=12 python benchmarks/bench_login.py [logins]
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passwords import PASSWORD_HASH_WORKERS, pwd_context, verify_and_update_password
+
+PASSWORD = "correct horse battery staple"
+
+
+async def ticker(stop: asyncio.Event):
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - start - 0.01)
+    return worst
+
+
+async def run(mode: str, logins: int, hashed: str):
+    async def login_inline():
+        return pwd_context.verify_and_update(PASSWORD, hashed)
+
+    async def login_pooled():
+        return await verify_and_update_password(PASSWORD, hashed)
+
+    login = login_inline if mode == "before" else login_pooled
+    stop = asyncio.Event()
+    stall = asyncio.create_task(ticker(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    assert all(valid for valid, _ in results)
+    return elapsed, await stall
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    cores = os.cpu_count() or 1
+    hashed = pwd_context.hash(PASSWORD)
+    print(f"bcrypt rounds: {pwd_context.to_dict()['bcrypt__default_rounds']}, cores: {cores}, pool workers: {PASSWORD_HASH_WORKERS}")
+    for mode in ("before", "after"):
+        elapsed, stall = asyncio.run(run(mode, logins, hashed))
+        throughput = logins / elapsed
+        cores_used = 1 if mode == "before" else min(PASSWORD_HASH_WORKERS, cores)
+        print(
+            f"{mode:>6}: {throughput:7.1f} logins/s on {cores_used} core(s) ({throughput / cores_used:6.1f} per core), "
+            f"worst event-loop stall {stall * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# Benchmark and golden check for graph.parse_resume_data.
+#
+# First every resume in benchmarks/resume_parse_corpus/*.txt is parsed and
+# compared with its .json golden output (--update rewrites the goldens). Then
+# "before" (the old multi-pass parser, copied below) and "after" are timed on
+# synthetic LLM outputs of growing length; a linear parser keeps a flat
+# microseconds-per-line figure as the input grows.
+#
+#   python benchmarks/bench_parse_resume.py [--update]
+import json
+import logging
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from graph import parse_resume_data
+
+CORPUS_DIR = Path(__file__).resolve().parent / "resume_parse_corpus"
+LINE_COUNTS = (100, 1_000, 10_000, 50_000)
+
+
+def parse_resume_data_before(result):
+    try:
+        # Split the cleaned text into lines
+        lines = [line for line in result.strip().splitlines() if line.strip()]
+        parsed_data = {}
+
+        # Initialize placeholders with default values
+        parsed_data.update({
+            'name': '',
+            'contact_info': '',
+            'summary': '',
+            'experience': [],
+            'education': '',
+            'skills': {},
+            'projects': [],
+            'certifications': [],
+            'additional_info': ''
+        })
+
+        # Helper function to detect if a line is a section heading
+        def is_section(line):
+            return any(
+                section in line.lower()
+                for section in ['summary', 'experience', 'education', 'skills', 'projects', 'certifications', 'additional']
+            )
+
+        # Regular expressions for dynamic parsing
+        email_regex = re.compile(r'\S+@\S+')
+        phone_regex = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+        linkedin_regex = re.compile(r'linkedin\.com/in/\S+')
+        github_regex = re.compile(r'github\.com/\S+')
+
+        # Capture name and contact info from the first few lines
+        contact_info_lines = []
+        for i, line in enumerate(lines):
+            if email_regex.search(line) or phone_regex.search(line) or linkedin_regex.search(line) or github_regex.search(line):
+                contact_info_lines.append(line)
+            else:
+                parsed_data['name'] = lines[0].strip() if i == 0 else parsed_data['name']
+            if len(contact_info_lines) >= 3:
+                break
+        parsed_data['contact_info'] = ' | '.join(contact_info_lines)
+
+        # Identify section indices dynamically
+        section_indices = {}
+        for i, line in enumerate(lines):
+            if is_section(line):
+                section_name = line.lower().strip().split()[0]
+                section_indices[section_name] = i
+
+        # Parse Summary
+        if 'summary' in section_indices:
+            summary_start = section_indices['summary'] + 1
+            summary_end = min([v for k, v in section_indices.items() if v > summary_start] + [len(lines)])
+            parsed_data['summary'] = ' '.join(lines[summary_start:summary_end]).strip()
+
+        # Parse Experience
+        if 'experience' in section_indices:
+            exp_start = section_indices['experience'] + 1
+            exp_end = min([v for k, v in section_indices.items() if v > exp_start] + [len(lines)])
+            current_job = {}
+            for line in lines[exp_start:exp_end]:
+                if '|' in line:  # Check for job title | company | dates format
+                    if current_job:
+                        parsed_data['experience'].append(current_job)
+                    parts = line.split('|')
+                    current_job = {
+                        'title': parts[0].strip() if len(parts) > 0 else '',
+                        'company': parts[1].strip() if len(parts) > 1 else '',
+                        'dates': parts[2].strip() if len(parts) > 2 else '',
+                        'duties': []
+                    }
+                elif line.strip().startswith('-') or line.strip().startswith('•'):
+                    if current_job:
+                        current_job['duties'].append(line.strip()[1:].strip())
+            if current_job:
+                parsed_data['experience'].append(current_job)
+
+        # Parse Education
+        if 'education' in section_indices:
+            edu_start = section_indices['education'] + 1
+            edu_end = min([v for k, v in section_indices.items() if v > edu_start] + [len(lines)])
+            parsed_data['education'] = ' '.join(lines[edu_start:edu_end]).strip()
+
+        # Parse Skills
+        if 'skills' in section_indices:
+            skills_start = section_indices['skills'] + 1
+            skills_end = min([v for k, v in section_indices.items() if v > skills_start] + [len(lines)])
+            for line in lines[skills_start:skills_end]:
+                if ':' in line:
+                    key, value = line.split(':', 1)
+                    parsed_data['skills'][key.strip()] = value.strip()
+                else:
+                    parsed_data['skills'].setdefault('General', []).append(line.strip())
+
+        # Parse Projects
+        if 'projects' in section_indices:
+            proj_start = section_indices['projects'] + 1
+            current_project = {}
+            for line in lines[proj_start:]:
+                if ':' in line:
+                    if current_project:
+                        parsed_data['projects'].append(current_project)
+                    parts = line.split(':', 1)
+                    current_project = {
+                        'name': parts[0].strip(),
+                        'description': parts[1].strip() if len(parts) > 1 else ''
+                    }
+                else:
+                    if current_project:
+                        current_project['description'] += ' ' + line.strip()
+            if current_project:
+                parsed_data['projects'].append(current_project)
+
+        # Parse Certifications
+        if 'certifications' in section_indices:
+            cert_start = section_indices['certifications'] + 1
+            cert_end = len(lines)
+            parsed_data['certifications'] = [line.strip() for line in lines[cert_start:cert_end] if line.strip()]
+        # print(parsed_data)
+        return parsed_data
+
+    except Exception as e:
+        logging.error(f"Error parsing resume data: {e}")
+        return {
+            'name': 'Error parsing resume',
+            'contact_info': '',
+            'summary': 'Error occurred while parsing the resume.',
+            'experience': [],
+            'education': '',
+            'skills': {},
+            'projects': [],
+            'certifications': [],
+            'additional_info': ''
+        }
+
+
+def synthetic_resume(lines: int) -> str:
+    header = [
+        "Jane Doe",
+        "jane.doe@example.com | (555) 123-4567",
+        "linkedin.com/in/janedoe",
+        "Summary",
+        "Backend engineer building Python services.",
+        "Skills",
+        "Languages: Python, Go, SQL",
+        "Experience",
+    ]
+    body = []
+    job = 0
+    while len(header) + len(body) < lines - 6:
+        body.append(f"Engineer {job} | Company {job} | 20{job % 100:02d} - Present")
+        body.extend(f"- Shipped feature {job}.{duty} and improved reliability" for duty in range(4))
+        job += 1
+    footer = [
+        "Projects",
+        "Tracer: Lightweight distributed tracing for asyncio apps.",
+        "Education",
+        "B.S. Computer Science, State University",
+        "Certifications",
+        "Certified Kubernetes Administrator",
+    ]
+    return "\n".join(header + body + footer)
+
+
+def check_golden(update: bool) -> int:
+    failures = 0
+    for path in sorted(CORPUS_DIR.glob("*.txt")):
+        parsed = parse_resume_data(path.read_text(encoding="utf-8"))
+        golden = path.with_suffix(".json")
+        if update:
+            golden.write_text(json.dumps(parsed, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+            print(f"updated {golden.name}")
+        elif json.loads(golden.read_text(encoding="utf-8")) != parsed:
+            failures += 1
+            print(f"MISMATCH {path.name}")
+    return failures
+
+
+def timed(fn, text: str) -> float:
+    repeats = max(1, 20_000 // text.count("\n"))
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(text)
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    update = "--update" in sys.argv[1:]
+    failures = check_golden(update)
+    if not update:
+        print(f"golden corpus: {len(list(CORPUS_DIR.glob('*.txt'))) - failures} ok, {failures} mismatched")
+
+    print(f"{'lines':>7} {'before ms':>10} {'after ms':>10} {'before us/line':>15} {'after us/line':>14}")
+    for lines in LINE_COUNTS:
+        text = synthetic_resume(lines)
+        before = timed(parse_resume_data_before, text)
+        after = timed(parse_resume_data, text)
+        print(
+            f"{lines:>7} {before * 1000:>10.2f} {after * 1000:>10.2f} "
+            f"{before * 1e6 / lines:>15.2f} {after * 1e6 / lines:>14.2f}"
+        )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Benchmark: PDF text extraction over a corpus of synthetic resumes/portfolios.
+#
+# "before" is the old page loop with repeated string concatenation; "after" is
+# pdf_extract.extract_pdf_text (process pool, large documents split across
+# its workers, one join).
+# The last row shows how quickly an over-limit document is rejected.
+#
+#   python benchmarks/bench_pdf_extract.py [repeats]
+import os
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import LETTER
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate
+
+from pdf_extract import PDFTooLargeError, extract_pdf_text, shutdown_pool
+
+PAGE_COUNTS = (1, 2, 5, 20, 50)
+PARAGRAPH = (
+    "Senior software engineer with experience designing Python and Go services, "
+    "Kubernetes deployments, PostgreSQL schemas and React front ends. "
+) * 6
+
+
+def synthetic_pdf(pages: int) -> bytes:
+    styles = getSampleStyleSheet()
+    story = []
+    for page in range(pages):
+        if page:
+            story.append(PageBreak())
+        story.append(Paragraph(f"Page {page + 1}", styles["Heading1"]))
+        story.extend(Paragraph(PARAGRAPH, styles["Normal"]) for _ in range(3))
+    buffer = BytesIO()
+    SimpleDocTemplate(buffer, pagesize=LETTER).build(story)
+    return buffer.getvalue()
+
+
+def extract_before(data: bytes) -> str:
+    reader = PdfReader(BytesIO(data))
+    text = ""
+    for page in range(len(reader.pages)):
+        text += reader.pages[page].extract_text()
+    return text
+
+
+def timed(fn, data, repeats):
+    fn(data)  # warm up (also starts the process pool)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(data)
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(f"{'pages':>6} {'bytes':>9} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for pages in PAGE_COUNTS:
+        data = synthetic_pdf(pages)
+        before = timed(extract_before, data, repeats)
+        after = timed(extract_pdf_text, data, repeats)
+        print(f"{pages:>6} {len(data):>9} {before * 1000:>10.1f} {after * 1000:>10.1f} {before / after:>7.1f}x")
+
+    data = synthetic_pdf(500)
+    start = time.perf_counter()
+    try:
+        extract_pdf_text(data)
+    except PDFTooLargeError as e:
+        print(f"500-page document rejected in {(time.perf_counter() - start) * 1000:.1f} ms: {e}")
+    shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
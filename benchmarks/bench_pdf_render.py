@@ -0,0 +1,210 @@
+# Benchmark: resume PDF renders per second.
+#
+# "before" is the old graph.create_resume_pdf (stylesheet rebuilt and the
+# whole story printed on every call, copied below); the "after" rows use
+# pdf_render: sequential renders with the shared stylesheet, concurrent
+# renders of distinct resumes on the process pool, and repeat renders served
+# from the output cache.
+#
+#   python benchmarks/bench_pdf_render.py [renders]
+import asyncio
+import contextlib
+import copy
+import json
+import os
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import LETTER
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+import pdf_render
+
+SAMPLE = Path(__file__).resolve().parent / "resume_parse_corpus" / "standard.json"
+
+
+def create_resume_pdf_before(file_name, details):
+    doc = SimpleDocTemplate(file_name, pagesize=LETTER, rightMargin=72, leftMargin=72, topMargin=36, bottomMargin=36)
+    styles = getSampleStyleSheet()
+    
+    # Create custom styles
+    styles.add(ParagraphStyle(
+        name='NameStyle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=6,
+        alignment=TA_CENTER
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='ContactStyle',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=20,
+        alignment=TA_CENTER
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceBefore=12,
+        spaceAfter=6,
+        textColor='navy'
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='BulletPoint',
+        parent=styles['Normal'],
+        fontSize=11,
+        leftIndent=20,
+        bulletIndent=10,
+        spaceBefore=2,
+        spaceAfter=2
+    ))
+    
+# Add the missing JobTitle style
+    styles.add(ParagraphStyle(
+        name='JobTitle',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=6,
+        textColor='black',
+        bold=True  # Make the job title bold
+    ))
+    story = []
+    
+    # Header section
+    story.append(Paragraph(details['name'], styles['NameStyle']))
+    story.append(Paragraph(details['contact_info'], styles['ContactStyle']))
+    
+    # Summary section
+    if details['summary']:
+        story.append(Paragraph('SUMMARY', styles['SectionHeader']))
+        story.append(Paragraph(details['summary'], styles['Normal']))
+        story.append(Spacer(1, 12))
+    
+    # Experience section (empty in your case)
+    if details['experience']:
+        story.append(Paragraph('PROFESSIONAL EXPERIENCE', styles['SectionHeader']))
+        for job in details['experience']:
+            # Job title and company line
+            job_header = f"{job['title']} | {job['company']}"
+            if job.get('location') and job.get('date'):
+                job_header += f" | {job['location']} | {job['date']}"
+            story.append(Paragraph(job_header, styles['JobTitle']))
+            
+            # Job duties
+            for duty in job['duties']:
+                story.append(Paragraph(f"• {duty}", styles['BulletPoint']))
+            story.append(Spacer(1, 6))
+    
+    # Education section
+    if details['education']:
+        story.append(Paragraph('EDUCATION', styles['SectionHeader']))
+        story.append(Paragraph(details['education'], styles['Normal']))
+        story.append(Spacer(1, 12))
+    
+    # Skills section
+    if details['skills']:
+        story.append(Paragraph('SKILLS', styles['SectionHeader']))
+        skills_text = ""
+        for skill, value in details['skills'].items():
+            if skills_text:
+                skills_text += "<br/>"
+            skills_text += f"<b>{skill}:</b> {value}"
+        story.append(Paragraph(skills_text, styles['Normal']))
+        story.append(Spacer(1, 12))
+    
+    # Projects section
+    if details['projects']:
+        story.append(Paragraph('PROJECTS', styles['SectionHeader']))
+        for project in details['projects']:
+            project_text = f"<b>{project['name']}:</b> {project['description']}"
+            story.append(Paragraph(project_text, styles['Normal']))
+            story.append(Spacer(1, 6))
+    
+    # Certifications section (if not empty)
+    if details['certifications']:
+        story.append(Paragraph('CERTIFICATIONS', styles['SectionHeader']))
+        for cert in details['certifications']:
+            story.append(Paragraph(cert, styles['Normal']))
+        story.append(Spacer(1, 12))
+
+    # Additional Information
+    if details['additional_info']:
+        story.append(Paragraph('ADDITIONAL INFORMATION', styles['SectionHeader']))
+        story.append(Paragraph(details['additional_info'], styles['Normal']))
+        story.append(Spacer(1, 12))
+    
+    try:
+        print(story)
+        # Generate the PDF
+        doc.build(story)
+        # print(f"PDF successfully generated: {file_name}")
+    except Exception as e:
+        # print(f"Error generating PDF: {e}")
+        raise
+
+
+def render_before(details: dict) -> bytes:
+    buffer = BytesIO()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        create_resume_pdf_before(buffer, details)
+    return buffer.getvalue()
+
+
+def variants(details: dict, count: int, tag: str):
+    for index in range(count):
+        variant = copy.deepcopy(details)
+        variant["name"] = f"{details['name']} {tag}{index}"
+        yield variant
+
+
+def rate(renders: int, seconds: float) -> str:
+    return f"{renders / seconds:8.1f} renders/s ({seconds * 1000 / renders:6.2f} ms each)"
+
+
+async def concurrent_renders(resumes):
+    start = time.perf_counter()
+    await asyncio.gather(*(pdf_render.render_resume(resume) for resume in resumes))
+    return time.perf_counter() - start
+
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    details = json.loads(SAMPLE.read_text(encoding="utf-8"))
+
+    render_before(details)
+    start = time.perf_counter()
+    for resume in variants(details, renders, "b"):
+        render_before(resume)
+    print(f"before, sequential       : {rate(renders, time.perf_counter() - start)}")
+
+    pdf_render.render_resume_bytes(details)
+    start = time.perf_counter()
+    for resume in variants(details, renders, "s"):
+        pdf_render.render_resume_bytes(resume)
+    print(f"after, sequential        : {rate(renders, time.perf_counter() - start)}")
+
+    async def run_async():
+        await concurrent_renders(list(variants(details, pdf_render.PDF_RENDER_WORKERS or 1, "w")))  # start workers
+        elapsed = await concurrent_renders(list(variants(details, renders, "p")))
+        print(f"after, pool x{pdf_render.PDF_RENDER_WORKERS:<2} concurrent: {rate(renders, elapsed)}")
+        await pdf_render.render_resume(details)
+        elapsed = await concurrent_renders([details] * renders)
+        print(f"after, cache hits        : {rate(renders, elapsed)}")
+
+    asyncio.run(run_async())
+    print(f"render cache: {pdf_render.render_cache.stats()}")
+    pdf_render.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
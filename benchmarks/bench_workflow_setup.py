@@ -0,0 +1,63 @@
+# Microbenchmark: per-request setup cost of the resume/ATS workflow.
+#
+# "before" rebuilds the StateGraph and the three prompt templates on every
+# request (the old run_resume_ats_workflow behaviour); "after" fetches the
+# compiled graph from the registry and formats the shared templates.
+#
+#   python benchmarks/bench_workflow_setup.py [iterations]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.prompts import PromptTemplate
+from graph import (
+    PROMPT_TEMPLATES,
+    build_resume_ats_graph,
+    get_prompt,
+    get_workflow,
+    workflow_config,
+)
+
+
+PROMPT_INPUTS = [
+    ("resume_builder", {"input_data": "x", "improvement_strategy": ""}),
+    ("ats_checker", {"resume": "x"}),
+    ("improvement", {"ats_feedback": "x"}),
+]
+
+
+def setup_before():
+    build_resume_ats_graph()
+    for name, inputs in PROMPT_INPUTS:
+        PromptTemplate.from_template(PROMPT_TEMPLATES[name]).format(**inputs)
+
+
+def setup_after():
+    get_workflow("resume_ats")
+    workflow_config()
+    for name, inputs in PROMPT_INPUTS:
+        get_prompt(name).format(**inputs)
+
+
+def measure(fn, iterations):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    before = measure(setup_before, iterations)
+    after = measure(setup_after, iterations)
+    print(f"iterations:           {iterations}")
+    print(f"before (per request): {before * 1e6:10.1f} us")
+    print(f"after  (per request): {after * 1e6:10.1f} us")
+    print(f"speedup:              {before / after:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
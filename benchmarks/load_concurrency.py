@@ -0,0 +1,87 @@
+# Load test: concurrent LLM-backed requests must not serialize on the event loop.
+#
+# The Gemini clients are replaced (through llm_provider.set_llm) with a fake
+# that takes LATENCY seconds per call. With a non-blocking path, N concurrent /interview-prep/ requests finish
+# in roughly one LATENCY; a blocking client (simulated with time.sleep) takes
+# N * LATENCY. A cheap GET / is timed while the LLM requests are in flight to
+# show that unrelated routes stay responsive.
+#
+#   python benchmarks/load_concurrency.py [concurrency] [latency_seconds]
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Every request sends the same prompt; measure the LLM path, not the caches
+os.environ["LLM_CACHE_ENABLED"] = "0"
+os.environ["QUESTION_BANK_ENABLED"] = "0"
+
+import httpx
+
+import main
+from llm_provider import LLM_ROLES, set_llm
+
+MCQ_OUTPUT = "\n".join(
+    f"Q{i}. Sample question {i}?\nA) One\nB) Two\nC) Three\nD) Four\nAnswer: B"
+    for i in range(1, 16)
+)
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class AsyncFakeLLM:
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def ainvoke(self, input, **kwargs):
+        await asyncio.sleep(self.latency)
+        return FakeMessage(MCQ_OUTPUT)
+
+
+class BlockingFakeLLM(AsyncFakeLLM):
+    async def ainvoke(self, input, **kwargs):
+        time.sleep(self.latency)
+        return FakeMessage(MCQ_OUTPUT)
+
+
+async def run_round(fake, concurrency):
+    for role in LLM_ROLES:
+        set_llm(role, fake)
+    transport = httpx.ASGITransport(app=main.app)
+    form = {"job_description": "Build APIs", "job_role": "Backend Engineer", "experience_level": "Mid"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def probe():
+            # Give the LLM requests a head start so the probe lands mid-flight
+            await asyncio.sleep(fake.latency / 4)
+            start = time.perf_counter()
+            await client.get("/")
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(client.post("/interview-prep/", data=form) for _ in range(concurrency)),
+            probe(),
+        )
+        elapsed = time.perf_counter() - start
+    responses, probe_latency = results[:-1], results[-1]
+    assert all(r.status_code == 200 for r in responses), [r.status_code for r in responses]
+    return elapsed, probe_latency
+
+
+def main_():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    for label, fake in (("blocking", BlockingFakeLLM(latency)), ("async", AsyncFakeLLM(latency))):
+        elapsed, probe_latency = asyncio.run(run_round(fake, concurrency))
+        print(
+            f"{label:>8}: {concurrency} requests in {elapsed:6.2f}s "
+            f"(serial would be {concurrency * latency:.2f}s), GET / while busy: {probe_latency * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main_()
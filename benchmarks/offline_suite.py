@@ -0,0 +1,248 @@
+# Offline benchmark suite: drives every endpoint and the resume graph against
+# the fake LLM provider (no network, no GOOGLE_API_KEY) at a fixed concurrency
+# and reports throughput, p50/p99 latency and process memory per scenario.
+#
+#   python benchmarks/offline_suite.py [--concurrency 16] [--requests 64]
+#       [--latency 0.05] [--jitter 0.02] [--only interview_prep,resume_checker]
+#
+# The LLM response cache and the question bank are off unless --with-caches is
+# given, so the numbers reflect the full request path. RSS is always reported;
+# --trace-memory adds the Python heap peak per scenario.
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCENARIOS = (
+    "root", "signup", "login", "cover_letter", "interview_prep", "interview_prep_hot", "interview_prep_stream",
+    "resume_checker", "resume_checker_batch", "generate_resume", "generate_resume_stream",
+    "resume_job", "graph",
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=64, help="requests per scenario")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra uniform fake LLM latency")
+    parser.add_argument("--only", default="", help="comma-separated scenario names")
+    parser.add_argument("--with-caches", action="store_true")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="report the Python heap peak per scenario (tracemalloc slows every allocation)")
+    return parser.parse_args()
+
+
+def configure_environment(args, workdir: str):
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_SECONDS"] = str(args.latency)
+    os.environ["FAKE_LLM_JITTER_SECONDS"] = str(args.jitter)
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["LLM_CACHE_PATH"] = f"{workdir}/llm_cache.db"
+    os.environ["WORKFLOW_CHECKPOINT_PATH"] = f"{workdir}/workflow_checkpoints.db"
+    os.environ.setdefault("BCRYPT_ROUNDS", "10")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if not args.with_caches:
+        os.environ["LLM_CACHE_ENABLED"] = "0"
+        os.environ["QUESTION_BANK_ENABLED"] = "0"
+
+
+def sample_pdf(name: str) -> bytes:
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    lines = [name, "Email: jane.doe@example.com", "Phone: (555) 123-4567",
+             "Experience: Senior engineer building Python, FastAPI and Kubernetes services"]
+    for index, line in enumerate(lines):
+        pdf.drawString(72, 750 - 18 * index, line)
+    pdf.save()
+    return buffer.getvalue()
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+RESUME_INPUT = {
+    "name": "Jane Doe", "email": "jane.doe@example.com", "linkedin": "linkedin.com/in/janedoe",
+    "github": "github.com/janedoe", "education": "B.S. Computer Science",
+    "experience": ["Senior engineer building Python services", "Data pipelines on Airflow"],
+    "projects": ["Ledger: double-entry accounting library"],
+    "ats_scorer": "llm", "max_iterations": 2,
+}
+JOB_DESCRIPTION = "Backend engineer: Python, FastAPI, PostgreSQL, Kubernetes, AWS, CI/CD."
+
+
+def build_requests(client, main, graph):
+    pdf = sample_pdf("Jane Doe")
+    prep = {"job_description": JOB_DESCRIPTION, "job_role": "Backend Engineer", "experience_level": "Senior"}
+
+    async def root(i):
+        return await client.get("/")
+
+    async def signup(i):
+        return await client.post("/signup", json={
+            "email": f"user{i}@example.com", "password": "correct horse", "phone_number": "5551234567"
+        })
+
+    async def login(i):
+        return await client.post("/login", json={"email": f"user{i}@example.com", "password": "correct horse"})
+
+    async def cover_letter(i):
+        return await client.post("/cover-letter/", data={
+            "job_role": "Backend Engineer", "company_name": "Acme", "job_description": JOB_DESCRIPTION
+        }, files={"resume": ("resume.pdf", pdf, "application/pdf")})
+
+    async def interview_prep(i):
+        return await client.post("/interview-prep/", data={**prep, "job_role": f"Backend Engineer {i}"})
+
+    # Every request asks about the same posting, so concurrent ones coalesce
+    async def interview_prep_hot(i):
+        return await client.post("/interview-prep/", data=prep)
+
+    async def interview_prep_stream(i):
+        return await client.post("/interview-prep/", data={**prep, "job_role": f"Backend Engineer {i}", "stream": "true"})
+
+    async def resume_checker(i):
+        return await client.post("/resume-checker", data={"job_description": f"{JOB_DESCRIPTION} #{i}"},
+                                 files={"resume": ("resume.pdf", pdf, "application/pdf")})
+
+    async def resume_checker_batch(i):
+        files = [("resumes", (f"resume{n}.pdf", pdf, "application/pdf")) for n in range(4)]
+        return await client.post("/resume-checker/batch", data={"job_description": f"{JOB_DESCRIPTION} #{i}"},
+                                 files=files)
+
+    async def generate_resume(i):
+        return await client.post("/generate_resume/", json={**RESUME_INPUT, "name": f"Jane Doe {i}"})
+
+    async def generate_resume_stream(i):
+        return await client.post("/generate_resume/stream", json={**RESUME_INPUT, "name": f"Jane Doe {i}"})
+
+    async def resume_job(i):
+        response = await client.post("/generate_resume/jobs", json={**RESUME_INPUT, "name": f"Jane Doe {i}"})
+        if response.status_code != 202:
+            return response
+        status_url = f"/generate_resume/jobs/{response.json()['job_id']}"
+        while True:
+            response = await client.get(status_url)
+            if response.json().get("status") in ("succeeded", "failed"):
+                return response
+            await asyncio.sleep(0.02)
+
+    async def run_graph(i):
+        result = await graph.run_resume_ats_workflow(
+            main.format_resume_input(main.ResumeInput(**{**RESUME_INPUT, "name": f"Jane Doe {i}"})),
+            max_iterations=2, ats_scorer="llm",
+        )
+        return result
+
+    return {
+        "root": root, "signup": signup, "login": login, "cover_letter": cover_letter,
+        "interview_prep": interview_prep, "interview_prep_hot": interview_prep_hot,
+        "interview_prep_stream": interview_prep_stream,
+        "resume_checker": resume_checker, "resume_checker_batch": resume_checker_batch,
+        "generate_resume": generate_resume, "generate_resume_stream": generate_resume_stream,
+        "resume_job": resume_job, "graph": run_graph,
+    }
+
+
+def succeeded(result) -> bool:
+    if result is None:
+        return False
+    if isinstance(result, dict):
+        return bool(result.get("final_result"))
+    if result.status_code >= 400:
+        return False
+    body = result.text
+    return '"error"' not in body and '"status":"failed"' not in body.replace(" ", "")
+
+
+async def run_scenario(request_fn, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ok = succeeded(await request_fn(i))
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+    return elapsed, latencies, errors, peak
+
+
+async def run_suite(args):
+    import httpx
+
+    import graph
+    import main
+
+    selected = [name for name in args.only.split(",") if name] or list(SCENARIOS)
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        # Measure the warm app, not the background warm-up
+        while not main.warm_up.stats()["finished"]:
+            await asyncio.sleep(0.01)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            requests = build_requests(client, main, graph)
+            # login needs the accounts created by signup
+            if "login" in selected and "signup" not in selected:
+                await run_scenario(requests["signup"], args.requests, args.concurrency)
+
+            print(f"{'scenario':<24} {'reqs':>5} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} "
+                  f"{'py peak MB':>10} {'rss MB':>8}")
+            for name in SCENARIOS:
+                if name not in selected:
+                    continue
+                elapsed, latencies, errors, peak = await run_scenario(requests[name], args.requests, args.concurrency)
+                print(
+                    f"{name:<24} {len(latencies):>5} {errors:>6} {len(latencies) / elapsed:>8.1f} "
+                    f"{percentile(latencies, 0.5) * 1000:>9.1f} {percentile(latencies, 0.99) * 1000:>9.1f} "
+                    f"{peak / 2 ** 20 if peak is not None else float('nan'):>10.1f} {rss_mb():>8.1f}"
+                )
+            coalescing = (await client.get("/llm-coalescing/stats")).json()
+            print(f"LLM calls started {coalescing['leaders']}, requests coalesced {coalescing['coalesced']}")
+
+
+def main_():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(args, workdir)
+        print(f"fake LLM {args.latency * 1000:.0f}+{args.jitter * 1000:.0f} ms/call, "
+              f"concurrency {args.concurrency}, {args.requests} requests per scenario, "
+              f"caches {'on' if args.with_caches else 'off'}")
+        if args.trace_memory:
+            tracemalloc.start()
+        asyncio.run(run_suite(args))
+
+
+if __name__ == "__main__":
+    main_()
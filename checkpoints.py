@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Checkpoint settings (override through environment variables)
+WORKFLOW_CHECKPOINT_ENABLED = os.getenv("WORKFLOW_CHECKPOINT_ENABLED", "1").lower() not in ("0", "false", "no")
+WORKFLOW_CHECKPOINT_PATH = os.getenv("WORKFLOW_CHECKPOINT_PATH", "./workflow_checkpoints.db")
+# Failed or interrupted runs stay resumable this long
+WORKFLOW_CHECKPOINT_RETENTION_SECONDS = int(os.getenv("WORKFLOW_CHECKPOINT_RETENTION_SECONDS", str(24 * 3600)))
+WORKFLOW_CHECKPOINT_SWEEP_INTERVAL_SECONDS = int(os.getenv("WORKFLOW_CHECKPOINT_SWEEP_INTERVAL_SECONDS", "300"))
+# A running run renews its lease every HEARTBEAT seconds; one whose lease is
+# older than LEASE seconds is treated as interrupted (its process went away)
+# and may be resumed by any worker
+WORKFLOW_RUN_HEARTBEAT_SECONDS = float(os.getenv("WORKFLOW_RUN_HEARTBEAT_SECONDS", "10"))
+WORKFLOW_RUN_LEASE_SECONDS = float(os.getenv("WORKFLOW_RUN_LEASE_SECONDS", "30"))
+
+# Identifies this process as the owner of the runs it executes
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def warm_up():
+    import aiosqlite  # noqa: F401
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver  # noqa: F401
+
+
+# SQLite store behind the resume workflow: LangGraph's AsyncSqliteSaver keeps
+# one checkpoint per completed node under the run ID (the thread_id), and a
+# workflow_runs table in the same file tracks each run's status. Checkpoints of
+# succeeded runs are deleted straight away; failed and interrupted runs are
+# kept for WORKFLOW_CHECKPOINT_RETENTION_SECONDS so they can be resumed.
+#
+# A run is executed by whoever holds its lease (owner + heartbeat_at), so
+# every process sharing the file agrees on whether it is still running.
+class WorkflowRunStore:
+    def __init__(self, path: str, retention_seconds: int, sweep_interval: int,
+                 lease_seconds: float = WORKFLOW_RUN_LEASE_SECONDS, owner: str = PROCESS_ID):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.sweep_interval = sweep_interval
+        self.lease_seconds = lease_seconds
+        self.owner = owner
+        self.saver = None
+        self._conn = None
+        self._loop = None
+        self._open_lock: Optional[asyncio.Lock] = None
+        self._last_sweep = 0.0
+        self._closed = False
+
+    # Allows checkpointer() to open the store again after close()
+    def start(self):
+        self._closed = False
+
+    # The checkpointer, opened on first use; the aiosqlite connection belongs
+    # to the event loop that opened it
+    async def checkpointer(self):
+        if self._closed:
+            raise RuntimeError("Workflow run store is closed")
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Close the previous loop's connection so its worker thread ends
+            await self._close_connection()
+            self._loop = loop
+            self._open_lock = asyncio.Lock()
+        if self.saver is None:
+            async with self._open_lock:
+                if self.saver is None:
+                    await self._open()
+        return self.saver
+
+    async def _open(self):
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        conn = await aiosqlite.connect(self.path)
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+        async with saver.lock:
+            await conn.execute(
+                "CREATE TABLE IF NOT EXISTS workflow_runs ("
+                "run_id TEXT PRIMARY KEY, status TEXT NOT NULL, error TEXT, owner TEXT, heartbeat_at REAL, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            await conn.execute("CREATE INDEX IF NOT EXISTS ix_workflow_runs_updated_at ON workflow_runs (updated_at)")
+            await conn.commit()
+        self._conn = conn
+        self.saver = saver
+
+    # Take the lease on run_id and mark it running; False when another live
+    # execution holds it. One statement, so concurrent claimers cannot both win.
+    async def claim(self, run_id: str) -> bool:
+        await self.checkpointer()
+        now = time.time()
+        async with self.saver.lock:
+            cursor = await self._conn.execute(
+                "INSERT INTO workflow_runs (run_id, status, error, owner, heartbeat_at, created_at, updated_at) "
+                "VALUES (?, 'running', NULL, ?, ?, ?, ?) "
+                "ON CONFLICT(run_id) DO UPDATE SET status = 'running', error = NULL, owner = excluded.owner, "
+                "heartbeat_at = excluded.heartbeat_at, updated_at = excluded.updated_at "
+                "WHERE workflow_runs.status != 'running' OR COALESCE(workflow_runs.heartbeat_at, 0) < ?",
+                (run_id, self.owner, now, now, now, now - self.lease_seconds),
+            )
+            claimed = cursor.rowcount > 0
+            await cursor.close()
+            await self._conn.commit()
+        return claimed
+
+    # Renew the lease; False once another process has taken the run over
+    async def heartbeat(self, run_id: str) -> bool:
+        await self.checkpointer()
+        async with self.saver.lock:
+            cursor = await self._conn.execute(
+                "UPDATE workflow_runs SET heartbeat_at = ? WHERE run_id = ? AND owner = ? AND status = 'running'",
+                (time.time(), run_id, self.owner),
+            )
+            renewed = cursor.rowcount > 0
+            await cursor.close()
+            await self._conn.commit()
+        return renewed
+
+    # Renews the lease while run (the task executing the graph) works, and
+    # cancels it once the lease is lost, so it stops writing checkpoints that
+    # the new owner is writing too
+    async def keep_alive(self, run_id: str, run: asyncio.Task, interval: float = WORKFLOW_RUN_HEARTBEAT_SECONDS):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.heartbeat(run_id):
+                    logger.warning(f"Lost the lease on workflow run {run_id}, stopping it")
+                    run.cancel()
+                    return
+            except Exception as e:
+                logger.error(f"Workflow run {run_id} heartbeat failed: {e}")
+
+    # Seconds until the lease on run_id lapses if its holder stops renewing it
+    async def lease_remaining(self, run_id: str) -> float:
+        run = await self.get(run_id)
+        if run is None or run["status"] != "running":
+            return 0.0
+        return max(0.0, run["heartbeat_at"] + self.lease_seconds - time.time())
+
+    # Record how a claimed run ended; a run taken over by another process is left alone
+    async def mark(self, run_id: str, status: str, error: Optional[str] = None):
+        await self.checkpointer()
+        now = time.time()
+        async with self.saver.lock:
+            await self._conn.execute(
+                "UPDATE workflow_runs SET status = ?, error = ?, updated_at = ? WHERE run_id = ? AND owner = ?",
+                (status, error, now, run_id, self.owner),
+            )
+            await self._conn.commit()
+        if status == "succeeded":
+            await self.saver.adelete_thread(run_id)
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            await self.sweep()
+
+    async def get(self, run_id: str) -> Optional[dict]:
+        await self.checkpointer()
+        async with self.saver.lock, self._conn.execute(
+            "SELECT status, error, heartbeat_at, created_at, updated_at FROM workflow_runs WHERE run_id = ?",
+            (run_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        status, error, heartbeat_at, created_at, updated_at = row
+        if status == "running" and (heartbeat_at or 0) < time.time() - self.lease_seconds:
+            # Its process stopped without recording how the run ended
+            status = "interrupted"
+        return {"run_id": run_id, "status": status, "error": error, "heartbeat_at": heartbeat_at,
+                "created_at": created_at, "updated_at": updated_at}
+
+    async def sweep(self) -> int:
+        cutoff = time.time() - self.retention_seconds
+        # Long-running runs keep their rows as long as their lease is renewed
+        expired = "updated_at < ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)"
+        async with self.saver.lock, self._conn.execute(
+            f"SELECT run_id FROM workflow_runs WHERE {expired}", (cutoff, cutoff)
+        ) as cursor:
+            run_ids = [row[0] for row in await cursor.fetchall()]
+        for run_id in run_ids:
+            await self.saver.adelete_thread(run_id)
+        async with self.saver.lock:
+            await self._conn.execute(f"DELETE FROM workflow_runs WHERE {expired}", (cutoff, cutoff))
+            await self._conn.commit()
+        if run_ids:
+            logger.info(f"Purged {len(run_ids)} expired workflow runs")
+        return len(run_ids)
+
+    # Close for good (until start()): runs still finishing cannot reopen the
+    # connection, whose worker thread would otherwise keep the process alive
+    async def close(self):
+        self._closed = True
+        await self._close_connection()
+        self._loop = None
+
+    async def _close_connection(self):
+        conn, self._conn, self.saver = self._conn, None, None
+        if conn is not None:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.warning(f"Could not close the workflow checkpoint database: {e}")
+
+
+run_store = WorkflowRunStore(
+    WORKFLOW_CHECKPOINT_PATH, WORKFLOW_CHECKPOINT_RETENTION_SECONDS, WORKFLOW_CHECKPOINT_SWEEP_INTERVAL_SECONDS
+)
@@ -0,0 +1,48 @@
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Rendered files are kept in memory for a short while so a streaming client
+# can fetch them after the final progress event
+DOWNLOAD_TTL_SECONDS = int(os.getenv("DOWNLOAD_TTL_SECONDS", "900"))
+DOWNLOAD_MAX_ITEMS = int(os.getenv("DOWNLOAD_MAX_ITEMS", "200"))
+
+
+class DownloadStore:
+    def __init__(self, ttl_seconds: int, max_items: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, content: bytes, filename: str, media_type: str = "application/pdf") -> str:
+        token = secrets.token_urlsafe(16)
+        with self._lock:
+            self._expire(time.monotonic())
+            self._items[token] = (time.monotonic(), content, filename, media_type)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return token
+
+    def get(self, token: str) -> Optional[Tuple[bytes, str, str]]:
+        with self._lock:
+            self._expire(time.monotonic())
+            item = self._items.get(token)
+        if item is None:
+            return None
+        _, content, filename, media_type = item
+        return content, filename, media_type
+
+    def _expire(self, now: float):
+        # Items are stored in insertion order, so expired ones are at the front
+        while self._items:
+            token, (created, *_) = next(iter(self._items.items()))
+            if now - created <= self.ttl_seconds:
+                break
+            del self._items[token]
+
+
+download_store = DownloadStore(DOWNLOAD_TTL_SECONDS, DOWNLOAD_MAX_ITEMS)
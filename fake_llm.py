@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+from typing import Callable, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+# Simulated model latency per call: base seconds plus uniform jitter
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.05"))
+FAKE_LLM_JITTER_SECONDS = float(os.getenv("FAKE_LLM_JITTER_SECONDS", "0"))
+# Characters per chunk when streaming
+FAKE_LLM_CHUNK_CHARS = 64
+
+
+def prompt_text(prompt) -> str:
+    if isinstance(prompt, str):
+        return prompt
+    return "\n".join(getattr(message, "content", str(message)) for message in prompt)
+
+
+def prompt_digest(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+# A stable pseudo-random percentage in [low, high] for a prompt
+def prompt_score(prompt: str, low: int = 60, high: int = 95) -> int:
+    return low + int(prompt_digest(prompt)[:8], 16) % (high - low + 1)
+
+
+def mcq_output(prompt: str) -> str:
+    tag = prompt_digest(prompt)[:6]
+    return "\n".join(
+        f"Q{i}. [{tag}] Which practice best addresses scenario {i} for this role?\n"
+        f"A) Option one\nB) Option two\nC) Option three\nD) Option four\n"
+        f"Answer: {'ABCD'[i % 4]}"
+        for i in range(1, 16)
+    )
+
+
+RESUME_OUTPUT = """Jane Doe
+jane.doe@example.com | (555) 123-4567 | linkedin.com/in/janedoe | github.com/janedoe
+Summary
+Backend engineer with six years of experience building Python services and data pipelines.
+Experience
+Senior Software Engineer | Acme Corp | 2021 - Present
+- Led the migration of the billing platform to event-driven services
+- Cut p99 API latency by 40% with query and caching work
+Education
+B.S. Computer Science, State University, 2018
+Skills
+Languages: Python, Go, SQL
+Cloud: AWS, Kubernetes, Terraform
+Projects
+Ledger: Open-source double-entry accounting library."""
+
+
+def resume_graph_output(prompt: str) -> str:
+    if "Applicant Tracking System (ATS) checker" in prompt:
+        return (
+            "The resume is well structured and parses cleanly. Add more role-specific keywords "
+            f"and quantify impact.\nOverall match score: {prompt_score(prompt)}%"
+        )
+    if "strategy to improve the resume" in prompt:
+        return "1. Mirror the job description's keywords.\n2. Quantify each achievement.\n3. Tighten the summary."
+    return RESUME_OUTPUT
+
+
+def ats_check_output(prompt: str) -> str:
+    return json.dumps({
+        "mistakes": ["Inconsistent date formats", "Summary is too generic"],
+        "missing_keywords": ["Kubernetes", "CI/CD"],
+        "jd_match": prompt_score(prompt),
+        "suggestions": [
+            "Quantify the impact of each role",
+            "Add the missing keywords where they are true",
+            "Move skills above education",
+        ],
+    })
+
+
+RESPONDERS = {
+    "mcq": mcq_output,
+    "resume_graph": resume_graph_output,
+    "ats_check": ats_check_output,
+}
+
+
+# Deterministic stand-in for the Gemini clients: the same prompt always gets
+# the same canned answer after a configurable delay. Chat models return
+# AIMessages (with usage metadata), text models plain strings, like the real ones.
+class FakeLLM:
+    def __init__(self, model: str, respond: Callable[[str], str], chat: bool = True,
+                 latency: float = FAKE_LLM_LATENCY_SECONDS, jitter: float = FAKE_LLM_JITTER_SECONDS,
+                 seed: Optional[int] = None):
+        self.model = f"fake/{model}"
+        self.temperature = 0
+        self.respond = respond
+        self.chat = chat
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    async def _delay(self):
+        await asyncio.sleep(self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0))
+
+    def _usage(self, prompt: str, text: str) -> dict:
+        input_tokens = max(1, len(prompt) // 4)
+        output_tokens = max(1, len(text) // 4)
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens}
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.calls += 1
+        text_in = prompt_text(prompt)
+        await self._delay()
+        text = self.respond(text_in)
+        if self.chat:
+            return AIMessage(content=text, usage_metadata=self._usage(text_in, text))
+        return text
+
+    async def astream(self, prompt, **kwargs):
+        self.calls += 1
+        text = self.respond(prompt_text(prompt))
+        chunks = [text[i:i + FAKE_LLM_CHUNK_CHARS] for i in range(0, len(text), FAKE_LLM_CHUNK_CHARS)]
+        # Spread the latency over the stream like a real model's token rate
+        for chunk in chunks:
+            await asyncio.sleep(self.latency / len(chunks))
+            yield AIMessageChunk(content=chunk) if self.chat else chunk
+
+
+def fake_for_role(role: str, spec: dict) -> FakeLLM:
+    return FakeLLM(spec["model"], RESPONDERS[role], chat=spec["chat"])
@@ -0,0 +1,42 @@
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAI
+from langchain_google_genai import _genai_extension as genaix
+from langchain_google_genai._common import get_client_info
+
+from llm_client import llm_client
+
+# Every Gemini model calls the same endpoint, so all of them use one sync and
+# one async client (one gRPC channel each) owned by llm_client, instead of the
+# channel each LangChain model would otherwise open for itself
+GEMINI_ENDPOINT = "gemini"
+
+
+def _sync_client(api_key: str):
+    return llm_client.transport(GEMINI_ENDPOINT, lambda: genaix.build_generative_service(
+        api_key=api_key, client_info=get_client_info("ChatGoogleGenerativeAI")
+    ))
+
+
+# Chat model whose async calls go through the shared async client
+class SharedChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+    @property
+    def async_client(self):
+        try:
+            return llm_client.async_transport(GEMINI_ENDPOINT, lambda: genaix.build_generative_async_service(
+                credentials=None,
+                api_key=self.google_api_key.get_secret_value(),
+                client_info=get_client_info("ChatGoogleGenerativeAI"),
+            ))
+        except RuntimeError:
+            # No running event loop: LangChain falls back to the sync client
+            return None
+
+
+def gemini_model(spec: dict, api_key: str, options: dict):
+    if spec["chat"]:
+        llm = chat = SharedChatGoogleGenerativeAI(model=spec["model"], google_api_key=api_key, **options)
+    else:
+        # Text models wrap a chat model and only make sync calls through it
+        llm = GoogleGenerativeAI(model=spec["model"], api_key=api_key, **options)
+        chat = llm.client
+    chat.client = _sync_client(api_key)
+    return llm
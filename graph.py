@@ -1,26 +1,81 @@
+import asyncio
+import json
 import logging
-from langchain_google_genai import GoogleGenerativeAI
-from typing import TypedDict, Annotated, Sequence
-from langgraph.graph import StateGraph, END
-from langchain.prompts import PromptTemplate
-from reportlab.lib.pagesizes import letter, LETTER
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER
+from contextlib import aclosing
+from typing import TYPE_CHECKING, TypedDict, Annotated, Sequence, List, Optional
 import  re
 import os
+import threading
+import time
+import uuid
 from dotenv import load_dotenv
+from checkpoints import WORKFLOW_CHECKPOINT_ENABLED, run_store
+from llm_cache import cached_ainvoke
+from llm_provider import get_llm
+from metrics import WORKFLOW_RUNS, observe_graph_run, timed_node
+from ats_scoring import score_resume, format_score_feedback
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
 
 load_dotenv()
 
 # Set up logging
 # logging.basicConfig(level=logging.DEBUG)
 # logger = logging.getLogger(__name__)
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not GOOGLE_API_KEY:
-    raise ValueError("GOOGLE_API_KEY not found in environment variables")
 
-llm = GoogleGenerativeAI(model="gemini-pro", api_key=GOOGLE_API_KEY)
+# Default stopping rules for the improvement loop; override per request through
+# the "configurable" section of the run config (see run_resume_ats_workflow).
+DEFAULT_SCORE_THRESHOLD = 0.9
+DEFAULT_MAX_ITERATIONS = 5
+
+# "local" scores resumes with ats_scoring (no LLM call for the score itself);
+# "llm" scrapes the percentage out of the ATS checker's LLM feedback
+DEFAULT_ATS_SCORER = os.getenv("ATS_SCORER", "local")
+# The local score is a keyword/BM25 blend, which tops out lower than the LLM's percentages
+DEFAULT_LOCAL_SCORE_THRESHOLD = float(os.getenv("ATS_LOCAL_SCORE_THRESHOLD", "0.75"))
+
+# Stop early once the best score has not improved by PLATEAU_MIN_DELTA over the
+# last PLATEAU_PATIENCE checks (0 disables), or when another round would not
+# fit in the latency budget (seconds, unset means no budget)
+DEFAULT_PLATEAU_PATIENCE = int(os.getenv("ATS_PLATEAU_PATIENCE", "2"))
+DEFAULT_PLATEAU_MIN_DELTA = float(os.getenv("ATS_PLATEAU_MIN_DELTA", "0.01"))
+DEFAULT_LATENCY_BUDGET = float(os.getenv("WORKFLOW_LATENCY_BUDGET_SECONDS")) if os.getenv("WORKFLOW_LATENCY_BUDGET_SECONDS") else None
+# The first check has only timed resume_builder; a full round also pays for
+# the feedback and improvement calls
+FIRST_ROUND_ESTIMATE_FACTOR = 2.0
+
+# Prompt templates are parsed once, on first use, and shared by every run
+PROMPT_TEMPLATES = {
+    "resume_builder": (
+        "Create a professional resume based on the following information:\n\n{input_data}\n\n"
+        "Improvement strategy (if any):\n{improvement_strategy}\n\n"
+        "Generate a well-formatted resume:"
+    ),
+    "ats_checker": (
+        "You are an Applicant Tracking System (ATS) checker. Analyze the following resume "
+        "and provide feedback on its ATS compatibility, including suggestions for improvement. "
+        "Also, provide a percentage match (0-100%) based on how well the resume matches the job requirements:\n\n"
+        "Resume:\n{resume}\n\n"
+        "Provide your analysis, feedback, and percentage match:"
+    ),
+    "improvement": (
+        "Based on the following ATS feedback, provide a concise strategy to improve the resume:\n\n"
+        "ATS Feedback:\n{ats_feedback}\n\n"
+        "Improvement strategy:"
+    ),
+}
+_prompts = {}
+
+def get_prompt(name: str):
+    prompt = _prompts.get(name)
+    if prompt is None:
+        from langchain_core.prompts import PromptTemplate
+        prompt = _prompts[name] = PromptTemplate.from_template(PROMPT_TEMPLATES[name])
+    return prompt
+
+SCORE_REGEX = re.compile(r'(\d+(?:\.\d+)?)%')
+# Prefer a percentage that is labelled as the match/score over any other percentage
+MATCH_SCORE_REGEX = re.compile(r'(?:match|score)[^%\n]{0,40}?(\d+(?:\.\d+)?)\s*%', re.IGNORECASE)
 
 class State(TypedDict):
     messages: Annotated[Sequence[str], "The messages in the conversation"]
@@ -30,6 +85,14 @@ class State(TypedDict):
     improvement_strategy: Annotated[str, "Strategy for improving the resume"]
     iterations: Annotated[int, "Number of improvement iterations"]
     final_result: Annotated[str, "The final result of the workflow"]
+    job_description: Annotated[str, "Job requirements the resume is scored against (optional)"]
+    best_resume: Annotated[str, "Highest-scoring resume seen so far"]
+    best_score: Annotated[float, "Score of best_resume"]
+    best_feedback: Annotated[str, "ATS feedback for best_resume"]
+    score_history: Annotated[List[float], "ATS score of every check, in order"]
+    last_checked_at: Annotated[float, "Wall-clock time of the last ATS check"]
+    round_trip_seconds: Annotated[float, "Estimated duration of one improvement round"]
+    stop_reason: Annotated[str, "Why the loop stopped (empty while it continues)"]
 
 def get_content(llm_output):
     if isinstance(llm_output, str):
@@ -39,103 +102,134 @@ def get_content(llm_output):
     else:
         return str(llm_output)
 
-def resume_builder(state: State) -> State:
+async def resume_builder(state: State) -> State:
     # logger.debug("Entering resume_builder")
-    try:
-        input_data = state["messages"][0]
-        improvement_strategy = state.get("improvement_strategy", "")
-        prompt = PromptTemplate.from_template(
-            "Create a professional resume based on the following information:\n\n{input_data}\n\n"
-            "Improvement strategy (if any):\n{improvement_strategy}\n\n"
-            "Generate a well-formatted resume:"
-        )
-        resume = llm.invoke(prompt.format(input_data=input_data, improvement_strategy=improvement_strategy))
-        resume_content = get_content(resume)
-        # logger.debug(f"Resume generated: {resume_content[:100]}...")  # Log first 100 characters
-        return {
-            "messages": state["messages"],
-            "resume": resume_content,
-            "ats_feedback": state.get("ats_feedback", ""),
-            "ats_score": state.get("ats_score", 0.0),
-            "improvement_strategy": state.get("improvement_strategy", ""),
-            "iterations": state.get("iterations", 0),
-            "final_result": ""
-        }
-    except Exception as e:
-        # logger.error(f"Error in resume_builder: {e}")
-        return {
-            "messages": state["messages"],
-            "resume": "Error generating resume",
-            "ats_feedback": "",
-            "ats_score": 0.0,
-            "improvement_strategy": "",
-            "iterations": state.get("iterations", 0),
-            "final_result": ""
-        }
+    # Errors fail the run; it can be resumed from the last checkpoint
+    input_data = state["messages"][0]
+    improvement_strategy = state.get("improvement_strategy", "")
+    resume = await cached_ainvoke(get_llm("resume_graph"), get_prompt("resume_builder").format(input_data=input_data, improvement_strategy=improvement_strategy), call_site="resume_builder")
+    resume_content = get_content(resume)
+    # logger.debug(f"Resume generated: {resume_content[:100]}...")  # Log first 100 characters
+    return {
+        "messages": state["messages"],
+        "resume": resume_content,
+        "ats_feedback": state.get("ats_feedback", ""),
+        "ats_score": state.get("ats_score", 0.0),
+        "improvement_strategy": state.get("improvement_strategy", ""),
+        "iterations": state.get("iterations", 0),
+        "final_result": ""
+    }
+
+def loop_settings(config: "RunnableConfig"):
+    configurable = (config or {}).get("configurable", {})
+    scorer = configurable.get("ats_scorer", DEFAULT_ATS_SCORER)
+    default_threshold = DEFAULT_LOCAL_SCORE_THRESHOLD if scorer == "local" else DEFAULT_SCORE_THRESHOLD
+    score_threshold = configurable.get("score_threshold")
+    return {
+        "ats_scorer": scorer,
+        "score_threshold": default_threshold if score_threshold is None else score_threshold,
+        "max_iterations": configurable.get("max_iterations", DEFAULT_MAX_ITERATIONS),
+        "plateau_patience": configurable.get("plateau_patience", DEFAULT_PLATEAU_PATIENCE),
+        "plateau_min_delta": configurable.get("plateau_min_delta", DEFAULT_PLATEAU_MIN_DELTA),
+        "started_at": configurable.get("started_at"),
+        "deadline": configurable.get("deadline"),
+    }
+
+# Returns why the improvement loop should stop, or None to run another round
+def stop_reason(ats_score: float, iterations: int, score_history: List[float],
+                round_trip_seconds: float, config: "RunnableConfig") -> Optional[str]:
+    settings = loop_settings(config)
+    if ats_score >= settings["score_threshold"]:
+        return "score_threshold"
+    if iterations >= settings["max_iterations"]:
+        return "max_iterations"
+    patience = settings["plateau_patience"]
+    if patience and len(score_history) > patience:
+        earlier_best = max(score_history[:-patience])
+        recent_best = max(score_history[-patience:])
+        if recent_best < earlier_best + settings["plateau_min_delta"]:
+            return "plateau"
+    deadline = settings["deadline"]
+    if deadline is not None and time.time() + round_trip_seconds > deadline:
+        return "deadline"
+    return None
 
-def ats_checker(state: State) -> State:
+def extract_llm_score(feedback_content: str) -> float:
+    score_match = MATCH_SCORE_REGEX.search(feedback_content) or SCORE_REGEX.search(feedback_content)
+    if not score_match:
+        # logger.warning("No percentage found in feedback")
+        return 0.0
+    return min(float(score_match.group(1)) / 100, 1.0)
+
+# Bookkeeping shared by both ats_checker outcomes: score history, round-trip
+# timing, the best resume so far and the stop decision for this check
+def score_progress(state: State, score: float, config: "RunnableConfig") -> dict:
+    settings = loop_settings(config)
+    now = time.time()
+    score_history = list(state.get("score_history") or [])
+    # A resumed run measures from when it was resumed, not from its last check
+    previous_check = max(state.get("last_checked_at") or 0.0, settings["started_at"] or 0.0) or now
+    round_trip_seconds = now - previous_check
+    if not score_history:
+        round_trip_seconds *= FIRST_ROUND_ESTIMATE_FACTOR
+    score_history.append(score)
+    return {
+        "score_history": score_history,
+        "last_checked_at": now,
+        "round_trip_seconds": round_trip_seconds,
+        "stop_reason": stop_reason(score, state["iterations"], score_history, round_trip_seconds, config) or "",
+    }
+
+def track_best(state: State, score: float, feedback_content: str) -> dict:
+    if state.get("best_resume") and score <= state.get("best_score", 0.0):
+        return {}
+    return {"best_resume": state["resume"], "best_score": score, "best_feedback": feedback_content}
+
+async def ats_checker(state: State, config: "RunnableConfig") -> State:
     # logger.debug("Entering ats_checker")
-    try:
-        resume = state["resume"]
-        prompt = PromptTemplate.from_template(
-            "You are an Applicant Tracking System (ATS) checker. Analyze the following resume "
-            "and provide feedback on its ATS compatibility, including suggestions for improvement. "
-            "Also, provide a percentage match (0-100%) based on how well the resume matches the job requirements:\n\n"
-            "Resume:\n{resume}\n\n"
-            "Provide your analysis, feedback, and percentage match:"
-        )
-        feedback = llm.invoke(prompt.format(resume=resume))
+    resume = state["resume"]
+    if loop_settings(config)["ats_scorer"] == "llm":
+        feedback = await cached_ainvoke(get_llm("resume_graph"), get_prompt("ats_checker").format(resume=resume), call_site="ats_checker")
         feedback_content = get_content(feedback)
-        
-        # Extract score using regex
-        import re
-        score_match = re.search(r'(\d+(?:\.\d+)?)%', feedback_content)
-        if score_match:
-            score = float(score_match.group(1)) / 100
-        else:
-            # logger.warning("No percentage found in feedback")
-            score = 0.0
-        
-        # logger.debug(f"ATS Score: {score}")
-        return {
-            "messages": state["messages"],
-            "resume": state["resume"],
-            "ats_feedback": feedback_content,
-            "ats_score": score,
-            "improvement_strategy": state["improvement_strategy"],
-            "iterations": state["iterations"],
-            "final_result": ""
-        }
-    except Exception as e:
-        # logger.error(f"Error in ats_checker: {e}")
-        return {
-            "messages": state["messages"],
-            "resume": state["resume"],
-            "ats_feedback": "Error in ATS checking",
-            "ats_score": 0.0,
-            "improvement_strategy": state["improvement_strategy"],
-            "iterations": state["iterations"],
-            "final_result": ""
-        }
+        score = extract_llm_score(feedback_content)
+        progress = score_progress(state, score, config)
+    else:
+        # Score locally against the job description, or the candidate's own
+        # details when none was given, and only pay for LLM feedback when
+        # another improvement round is actually going to run
+        requirements = state.get("job_description") or state["messages"][0]
+        local_score = score_resume(resume, requirements)
+        score = local_score["score"]
+        feedback_content = format_score_feedback(local_score)
+        progress = score_progress(state, score, config)
+        if not progress["stop_reason"]:
+            feedback = await cached_ainvoke(get_llm("resume_graph"), get_prompt("ats_checker").format(resume=resume), call_site="ats_checker")
+            feedback_content = f"{feedback_content}\n\n{get_content(feedback)}"
+
+    # logger.debug(f"ATS Score: {score}")
+    return {
+        "messages": state["messages"],
+        "resume": state["resume"],
+        "ats_feedback": feedback_content,
+        "ats_score": score,
+        "improvement_strategy": state["improvement_strategy"],
+        "iterations": state["iterations"],
+        "final_result": "",
+        **progress,
+        **track_best(state, score, feedback_content)
+    }
 
 def decision(state: State):
     # logger.debug(f"Entering decision. ATS Score: {state['ats_score']}, Iterations: {state['iterations']}")
-    ats_score = state["ats_score"]
-    iterations = state["iterations"]
-    if ats_score >= 0.9 or iterations >= 5:
+    if state.get("stop_reason"):
         return "final"
     else:
         return "improvement"
 
-def improvement(state: State) -> State:
+async def improvement(state: State) -> State:
     # logger.debug("Entering improvement")
     ats_feedback = state["ats_feedback"]
-    prompt = PromptTemplate.from_template(
-        "Based on the following ATS feedback, provide a concise strategy to improve the resume:\n\n"
-        "ATS Feedback:\n{ats_feedback}\n\n"
-        "Improvement strategy:"
-    )
-    improvement_strategy = llm.invoke(prompt.format(ats_feedback=ats_feedback))
+    improvement_strategy = await cached_ainvoke(get_llm("resume_graph"), get_prompt("improvement").format(ats_feedback=ats_feedback), call_site="improvement")
     return {
         "messages": state["messages"],
         "resume": state["resume"],
@@ -148,28 +242,33 @@ def improvement(state: State) -> State:
 
 def final(state: State) -> State:
     # logger.debug("Entering final")
-    final_resume = state['resume']
-    score = state['ats_score']
+    # Return the best-scoring resume seen, not necessarily the last one
+    final_resume = state.get('best_resume') or state['resume']
+    score = state.get('best_score', state['ats_score']) if state.get('best_resume') else state['ats_score']
     iterations = state['iterations']
-    ats_feedback = state['ats_feedback']
+    ats_feedback = state.get('best_feedback') or state['ats_feedback']
     final_result = f"Resume achieved an ATS score of {score:.2%} after {iterations} iterations.\n\nResume Content:\n\n{final_resume}\n\nATS Feedback:\n\n{ats_feedback}"
     # logger.info(f"Final result: {final_result[:100]}...")  # Log first 100 characters
     return {
         "messages": state["messages"],
-        "resume": state["resume"],
-        "ats_feedback": state["ats_feedback"],
-        "ats_score": state["ats_score"],
+        "resume": final_resume,
+        "ats_feedback": ats_feedback,
+        "ats_score": score,
         "improvement_strategy": state["improvement_strategy"],
         "iterations": state["iterations"],
         "final_result": final_result
     }
 
-def run_resume_ats_workflow(input_data: str):
+def build_resume_ats_graph():
+    # langgraph is the slowest import in the app; it loads when the first
+    # workflow is compiled (at warm-up) rather than when graph is imported
+    from langgraph.graph import StateGraph, END
+
     workflow = StateGraph(State)
-    workflow.add_node("resume_builder", resume_builder)
-    workflow.add_node("ats_checker", ats_checker)
-    workflow.add_node("improvement", improvement)
-    workflow.add_node("final", final)
+    workflow.add_node("resume_builder", timed_node("resume_builder", resume_builder))
+    workflow.add_node("ats_checker", timed_node("ats_checker", ats_checker))
+    workflow.add_node("improvement", timed_node("improvement", improvement))
+    workflow.add_node("final", timed_node("final", final))
     workflow.add_conditional_edges(
         "ats_checker",
         decision,
@@ -182,165 +281,373 @@ def run_resume_ats_workflow(input_data: str):
     workflow.add_edge("improvement", "resume_builder")
     workflow.add_edge("improvement", END)
     workflow.set_entry_point("resume_builder")
-    graph = workflow.compile()
-    
+    return workflow.compile()
+
+# Workflow registry: graphs are compiled on first use (or by warm_workflows at
+# startup) and the compiled graph is shared by every subsequent request.
+WORKFLOW_BUILDERS = {
+    "resume_ats": build_resume_ats_graph,
+}
+_compiled_workflows = {}
+_registry_lock = threading.Lock()
+
+def get_workflow(name: str = "resume_ats"):
+    graph = _compiled_workflows.get(name)
+    if graph is None:
+        with _registry_lock:
+            graph = _compiled_workflows.get(name)
+            if graph is None:
+                graph = WORKFLOW_BUILDERS[name]()
+                _compiled_workflows[name] = graph
+    return graph
+
+def warm_workflows():
+    for name in PROMPT_TEMPLATES:
+        get_prompt(name)
+    for name in WORKFLOW_BUILDERS:
+        get_workflow(name)
+
+# The same compiled graph with the SQLite checkpointer attached: after every
+# node the state is saved under the run ID, so a run that fails or is
+# interrupted can continue from the last completed node
+_checkpointed_workflows = {}
+
+async def checkpointed_workflow(name: str = "resume_ats"):
+    graph = get_workflow(name)
+    if not WORKFLOW_CHECKPOINT_ENABLED:
+        return graph
+    saver = await run_store.checkpointer()
+    checkpointed = _checkpointed_workflows.get(name)
+    if checkpointed is None or checkpointed.checkpointer is not saver:
+        checkpointed = _checkpointed_workflows[name] = graph.copy(update={"checkpointer": saver})
+    return checkpointed
+
+def workflow_config(score_threshold: float = None, max_iterations: int = None, ats_scorer: str = None,
+                    latency_budget: float = None, run_id: str = None) -> "RunnableConfig":
+    # Saved with every checkpoint so that a resumed run keeps its stopping rules
+    run_settings = {"score_threshold": score_threshold, "max_iterations": max_iterations,
+                    "ats_scorer": ats_scorer, "latency_budget": latency_budget}
+    max_iterations = DEFAULT_MAX_ITERATIONS if max_iterations is None else max_iterations
+    latency_budget = DEFAULT_LATENCY_BUDGET if latency_budget is None else latency_budget
+    started_at = time.time()
+    return {
+        "configurable": {
+            "thread_id": run_id,
+            # None means the default threshold for the chosen scorer (see loop_settings)
+            "score_threshold": score_threshold,
+            "max_iterations": max_iterations,
+            "ats_scorer": ats_scorer or DEFAULT_ATS_SCORER,
+            "started_at": started_at,
+            "deadline": started_at + latency_budget if latency_budget is not None else None,
+        },
+        "metadata": {"run_settings": json.dumps(run_settings)},
+        # Each loop is builder -> checker -> improvement, plus the final node
+        "recursion_limit": max(25, 3 * (max_iterations + 1) + 2),
+    }
+
+def initial_state(input_data: str, job_description: str = None) -> State:
+    return {
+        "messages": [input_data],
+        "resume": "",
+        "ats_feedback": "",
+        "ats_score": 0.0,
+        "improvement_strategy": "",
+        "iterations": 0,
+        "final_result": "",
+        "job_description": job_description or "",
+        "best_resume": "",
+        "best_score": 0.0,
+        "best_feedback": "",
+        "score_history": [],
+        "last_checked_at": 0.0,
+        "round_trip_seconds": 0.0,
+        "stop_reason": ""
+    }
+
+class WorkflowRunError(RuntimeError):
+    def __init__(self, run_id: str, message: str, resumable: bool):
+        super().__init__(message)
+        self.run_id = run_id
+        self.resumable = resumable
+
+class WorkflowRunNotFoundError(LookupError):
+    pass
+
+# retry_after: seconds until the current holder's lease lapses if it stops renewing it
+class WorkflowRunActiveError(RuntimeError):
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+async def mark_run(run_id: str, status: str, error: str = None):
+    if not WORKFLOW_CHECKPOINT_ENABLED:
+        return
     try:
-        # logger.info("Starting resume generation workflow")
-        result = graph.invoke({
-            "messages": [input_data],
-            "resume": "",
-            "ats_feedback": "",
-            "ats_score": 0.0,
-            "improvement_strategy": "",
-            "iterations": 0,
-            "final_result": ""
-        })
-        # logger.info("Workflow completed successfully")
-        # print( result["final_result"] )
-        return result
-        
+        await run_store.mark(run_id, status, error)
+    except Exception as e:
+        logging.error(f"Could not record workflow run {run_id} as {status}: {e}")
+
+_GRAPH_DONE = object()
+
+async def stream_graph(graph, graph_input, config: "RunnableConfig", chunks: asyncio.Queue):
+    async with aclosing(graph.astream(graph_input, config=config, stream_mode=["updates", "values"])) as stream:
+        async for chunk in stream:
+            await chunks.put(chunk)
+    await chunks.put(_GRAPH_DONE)
+
+# The next chunk stream_graph hands over, or the runner's exception once it has stopped
+async def next_graph_chunk(chunks: asyncio.Queue, runner: asyncio.Task):
+    getter = asyncio.ensure_future(chunks.get())
+    try:
+        await asyncio.wait({getter, runner}, return_when=asyncio.FIRST_COMPLETED)
+    except BaseException:
+        getter.cancel()
+        raise
+    if not getter.done() and (runner.cancelled() or runner.exception() is not None):
+        getter.cancel()
+        return runner.result()
+    return await getter
+
+async def stop_task(task: asyncio.Task):
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+# Runs the graph for run_id (graph_input None continues from its checkpoint),
+# yielding ("update", {node: state update}) per node and finally
+# ("result", final state). Failures are raised as WorkflowRunError. The run's
+# lease in the run store keeps any worker process from executing it twice at
+# once. The graph runs in a task of its own that hands chunks over one at a
+# time, so a lost lease stops it mid-node rather than after its next checkpoint.
+async def execute_workflow_run(graph, run_id: str, graph_input, config: "RunnableConfig", resumed: bool = False):
+    if WORKFLOW_CHECKPOINT_ENABLED and not await run_store.claim(run_id):
+        raise WorkflowRunActiveError(
+            f"Workflow run {run_id} is already running", retry_after=await run_store.lease_remaining(run_id)
+        )
+    WORKFLOW_RUNS.labels("resumed" if resumed else "started").inc()
+    chunks = asyncio.Queue(maxsize=1)
+    runner = asyncio.create_task(stream_graph(graph, graph_input, config, chunks))
+    heartbeat = asyncio.create_task(run_store.keep_alive(run_id, runner)) if WORKFLOW_CHECKPOINT_ENABLED else None
+    state = None
+    try:
+        while (item := await next_graph_chunk(chunks, runner)) is not _GRAPH_DONE:
+            mode, chunk = item
+            if mode == "values":
+                state = chunk
+            else:
+                yield "update", chunk
+    except (asyncio.CancelledError, GeneratorExit) as e:
+        await stop_task(runner)
+        WORKFLOW_RUNS.labels("interrupted").inc()
+        lease_lost = heartbeat is not None and heartbeat.done() and not heartbeat.cancelled()
+        if lease_lost and isinstance(e, asyncio.CancelledError):
+            # keep_alive stopped the graph: another worker has taken the run over
+            raise WorkflowRunError(run_id, f"Workflow run {run_id} was taken over by another worker", False) from None
+        await mark_run(run_id, "interrupted")
+        raise
     except Exception as e:
-        # logger.error(f"Error running workflow: {e}")
+        WORKFLOW_RUNS.labels("failed").inc()
+        await mark_run(run_id, "failed", str(e))
+        raise WorkflowRunError(run_id, f"Workflow run {run_id} failed: {e}", WORKFLOW_CHECKPOINT_ENABLED) from e
+    finally:
+        if heartbeat is not None:
+            heartbeat.cancel()
+        await stop_task(runner)
+    # A finished run has nothing left to resume, so its checkpoints go
+    WORKFLOW_RUNS.labels("succeeded").inc()
+    await mark_run(run_id, "succeeded")
+    observe_graph_run(state)
+    yield "result", {**state, "run_id": run_id}
+
+async def run_resume_ats_workflow(input_data: str, score_threshold: float = None, max_iterations: int = None,
+                                  job_description: str = None, ats_scorer: str = None,
+                                  latency_budget: float = None, run_id: str = None):
+    run_id = run_id or uuid.uuid4().hex
+    graph = await checkpointed_workflow("resume_ats")
+    config = workflow_config(score_threshold, max_iterations, ats_scorer, latency_budget, run_id)
+    # logger.info("Starting resume generation workflow")
+    result = None
+    async for kind, value in execute_workflow_run(graph, run_id, initial_state(input_data, job_description), config):
+        if kind == "result":
+            result = value
+    return result
+
+# Continues a failed or interrupted run from its last checkpoint with the
+# settings it was started with; nodes that already completed are not run again.
+# latency_budget, if given, replaces the original budget for the remaining steps.
+async def continue_resume_ats_workflow(run_id: str, latency_budget: float = None):
+    if not WORKFLOW_CHECKPOINT_ENABLED:
+        raise WorkflowRunNotFoundError("Workflow checkpointing is disabled")
+    graph = await checkpointed_workflow("resume_ats")
+    snapshot = await graph.aget_state({"configurable": {"thread_id": run_id}})
+    if not snapshot.values:
+        raise WorkflowRunNotFoundError(f"No checkpoint for workflow run {run_id}")
+    if not snapshot.next:
+        return {**snapshot.values, "run_id": run_id}
+    settings = json.loads((snapshot.metadata or {}).get("run_settings") or "{}")
+    if latency_budget is not None:
+        settings["latency_budget"] = latency_budget
+    config = workflow_config(run_id=run_id, **settings)
+    result = None
+    async for kind, value in execute_workflow_run(graph, run_id, None, config, resumed=True):
+        if kind == "result":
+            result = value
+    return result
+
+async def workflow_run_status(run_id: str) -> Optional[dict]:
+    if not WORKFLOW_CHECKPOINT_ENABLED:
         return None
+    # A run whose lease has lapsed is reported as interrupted (see WorkflowRunStore.get)
+    status = await run_store.get(run_id)
+    if status is None:
+        return None
+    graph = await checkpointed_workflow("resume_ats")
+    snapshot = await graph.aget_state({"configurable": {"thread_id": run_id}})
+    status["next_nodes"] = list(snapshot.next)
+    if snapshot.values:
+        status["iterations"] = snapshot.values.get("iterations", 0)
+        status["ats_score"] = snapshot.values.get("ats_score", 0.0)
+        status["best_score"] = snapshot.values.get("best_score", 0.0)
+    status["resumable"] = bool(snapshot.next) and status["status"] != "running"
+    return status
+
+# Streaming variant of run_resume_ats_workflow: yields {"event": "run", "run_id"}
+# first, then one progress event per node transition and finally
+# {"event": "result", "state": <final state>}.
+async def stream_resume_ats_workflow(input_data: str, score_threshold: float = None, max_iterations: int = None,
+                                     job_description: str = None, ats_scorer: str = None,
+                                     latency_budget: float = None, run_id: str = None):
+    run_id = run_id or uuid.uuid4().hex
+    graph = await checkpointed_workflow("resume_ats")
+    started = time.monotonic()
+    state = initial_state(input_data, job_description)
+    config = workflow_config(score_threshold, max_iterations, ats_scorer, latency_budget, run_id)
+    yield {"event": "run", "run_id": run_id}
+    async with aclosing(execute_workflow_run(graph, run_id, state, config)) as events:
+        async for kind, value in events:
+            if kind == "result":
+                yield {"event": "result", "state": value}
+                continue
+            for node, node_state in value.items():
+                if node_state:
+                    state = {**state, **node_state}
+                yield {
+                    "event": "node",
+                    "node": node,
+                    "iteration": state["iterations"],
+                    "ats_score": state["ats_score"],
+                    "elapsed": round(time.monotonic() - started, 3),
+                }
 
 # ... (rest of the code remains the same)
 
 
-def parse_resume_data(result):
-    try:
-        # Split the cleaned text into lines
-        lines = [line for line in result.strip().splitlines() if line.strip()]
-        parsed_data = {}
+# Section headings: an optional qualifier word ("Professional", "Technical",
+# ...) then a section keyword, then only capitalised words or the connecting
+# words &/and/of/the in any case, e.g. "SKILLS", "Work Experience",
+# "Summary of Qualifications", "Certifications & Licenses:". Lines such as
+# "Experience with AWS" or "- Led projects" are content, not headings.
+SECTION_HEADING_REGEX = re.compile(
+    r'^(?:[A-Z][A-Za-z]*\s+)?'
+    r'((?i:summary|experience|education|skills|projects|certifications|additional))'
+    r'(?:\s+(?:(?i:&|and|of|the)|[A-Z][A-Za-z]*))*\s*:?$'
+)
+# Email, phone, LinkedIn or GitHub anywhere in a header line
+CONTACT_REGEX = re.compile(
+    r'\S+@\S+|\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}|linkedin\.com/in/\S+|github\.com/\S+'
+)
+BULLET_PREFIXES = ('-', '•')
+MAX_CONTACT_LINES = 3
 
-        # Initialize placeholders with default values
-        parsed_data.update({
-            'name': '',
-            'contact_info': '',
-            'summary': '',
-            'experience': [],
-            'education': '',
-            'skills': {},
-            'projects': [],
-            'certifications': [],
-            'additional_info': ''
-        })
 
-        # Helper function to detect if a line is a section heading
-        def is_section(line):
-            return any(
-                section in line.lower()
-                for section in ['summary', 'experience', 'education', 'skills', 'projects', 'certifications', 'additional']
-            )
+def empty_resume_data():
+    return {
+        'name': '',
+        'contact_info': '',
+        'summary': '',
+        'experience': [],
+        'education': '',
+        'skills': {},
+        'projects': [],
+        'certifications': [],
+        'additional_info': ''
+    }
 
-        # Regular expressions for dynamic parsing
-        email_regex = re.compile(r'\S+@\S+')
-        phone_regex = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
-        linkedin_regex = re.compile(r'linkedin\.com/in/\S+')
-        github_regex = re.compile(r'github\.com/\S+')
 
-        # Capture name and contact info from the first few lines
+# Single pass over the lines: a heading switches the current section and every
+# other line is handled by the section it falls in. Lines before the first
+# heading are the header (name on the first line, then contact details).
+def parse_resume_data(result):
+    try:
+        parsed_data = empty_resume_data()
         contact_info_lines = []
-        for i, line in enumerate(lines):
-            if email_regex.search(line) or phone_regex.search(line) or linkedin_regex.search(line) or github_regex.search(line):
-                contact_info_lines.append(line)
-            else:
-                parsed_data['name'] = lines[0].strip() if i == 0 else parsed_data['name']
-            if len(contact_info_lines) >= 3:
-                break
-        parsed_data['contact_info'] = ' | '.join(contact_info_lines)
+        text_sections = {'summary': [], 'education': [], 'additional': []}
+        section = None
+        current_job = None
+        current_project = None
+        first_line = True
+
+        for line in result.strip().splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            heading = SECTION_HEADING_REGEX.match(line)
+            if heading:
+                section = heading.group(1).lower()
+                first_line = False
+                continue
 
-        # Identify section indices dynamically
-        section_indices = {}
-        for i, line in enumerate(lines):
-            if is_section(line):
-                section_name = line.lower().strip().split()[0]
-                section_indices[section_name] = i
-
-        # Parse Summary
-        if 'summary' in section_indices:
-            summary_start = section_indices['summary'] + 1
-            summary_end = min([v for k, v in section_indices.items() if v > summary_start] + [len(lines)])
-            parsed_data['summary'] = ' '.join(lines[summary_start:summary_end]).strip()
-
-        # Parse Experience
-        if 'experience' in section_indices:
-            exp_start = section_indices['experience'] + 1
-            exp_end = min([v for k, v in section_indices.items() if v > exp_start] + [len(lines)])
-            current_job = {}
-            for line in lines[exp_start:exp_end]:
-                if '|' in line:  # Check for job title | company | dates format
+            if section is None:
+                if CONTACT_REGEX.search(line):
+                    if len(contact_info_lines) < MAX_CONTACT_LINES:
+                        contact_info_lines.append(line)
+                elif first_line:
+                    parsed_data['name'] = line
+            elif section in text_sections:
+                text_sections[section].append(line)
+            elif section == 'experience':
+                if line.startswith(BULLET_PREFIXES):
                     if current_job:
-                        parsed_data['experience'].append(current_job)
+                        current_job['duties'].append(line[1:].strip())
+                elif '|' in line:  # job title | company | dates
                     parts = line.split('|')
                     current_job = {
-                        'title': parts[0].strip() if len(parts) > 0 else '',
+                        'title': parts[0].strip(),
                         'company': parts[1].strip() if len(parts) > 1 else '',
                         'dates': parts[2].strip() if len(parts) > 2 else '',
                         'duties': []
                     }
-                elif line.strip().startswith('-') or line.strip().startswith('•'):
-                    if current_job:
-                        current_job['duties'].append(line.strip()[1:].strip())
-            if current_job:
-                parsed_data['experience'].append(current_job)
-
-        # Parse Education
-        if 'education' in section_indices:
-            edu_start = section_indices['education'] + 1
-            edu_end = min([v for k, v in section_indices.items() if v > edu_start] + [len(lines)])
-            parsed_data['education'] = ' '.join(lines[edu_start:edu_end]).strip()
-
-        # Parse Skills
-        if 'skills' in section_indices:
-            skills_start = section_indices['skills'] + 1
-            skills_end = min([v for k, v in section_indices.items() if v > skills_start] + [len(lines)])
-            for line in lines[skills_start:skills_end]:
+                    parsed_data['experience'].append(current_job)
+            elif section == 'skills':
                 if ':' in line:
                     key, value = line.split(':', 1)
                     parsed_data['skills'][key.strip()] = value.strip()
                 else:
-                    parsed_data['skills'].setdefault('General', []).append(line.strip())
-
-        # Parse Projects
-        if 'projects' in section_indices:
-            proj_start = section_indices['projects'] + 1
-            current_project = {}
-            for line in lines[proj_start:]:
+                    parsed_data['skills'].setdefault('General', []).append(line)
+            elif section == 'projects':
                 if ':' in line:
-                    if current_project:
-                        parsed_data['projects'].append(current_project)
-                    parts = line.split(':', 1)
-                    current_project = {
-                        'name': parts[0].strip(),
-                        'description': parts[1].strip() if len(parts) > 1 else ''
-                    }
-                else:
-                    if current_project:
-                        current_project['description'] += ' ' + line.strip()
-            if current_project:
-                parsed_data['projects'].append(current_project)
-
-        # Parse Certifications
-        if 'certifications' in section_indices:
-            cert_start = section_indices['certifications'] + 1
-            cert_end = len(lines)
-            parsed_data['certifications'] = [line.strip() for line in lines[cert_start:cert_end] if line.strip()]
-        # print(parsed_data)
+                    name, description = line.split(':', 1)
+                    current_project = {'name': name.strip(), 'description': description.strip()}
+                    parsed_data['projects'].append(current_project)
+                elif current_project:
+                    current_project['description'] += ' ' + line
+            elif section == 'certifications':
+                parsed_data['certifications'].append(line)
+            first_line = False
+
+        parsed_data['contact_info'] = ' | '.join(contact_info_lines)
+        parsed_data['summary'] = ' '.join(text_sections['summary'])
+        parsed_data['education'] = ' '.join(text_sections['education'])
+        parsed_data['additional_info'] = ' '.join(text_sections['additional'])
         return parsed_data
 
     except Exception as e:
         logging.error(f"Error parsing resume data: {e}")
-        return {
+        parsed_data = empty_resume_data()
+        parsed_data.update({
             'name': 'Error parsing resume',
-            'contact_info': '',
-            'summary': 'Error occurred while parsing the resume.',
-            'experience': [],
-            'education': '',
-            'skills': {},
-            'projects': [],
-            'certifications': [],
-            'additional_info': ''
-        }
+            'summary': 'Error occurred while parsing the resume.'
+        })
+        return parsed_data
 
 def extract_resume_content(text):
     # Identify the start and end markers
@@ -357,129 +664,6 @@ def extract_resume_content(text):
     else:
         return "Resume content not found."
 
-def create_resume_pdf(file_name, details):
-    doc = SimpleDocTemplate(file_name, pagesize=LETTER, rightMargin=72, leftMargin=72, topMargin=36, bottomMargin=36)
-    styles = getSampleStyleSheet()
-    
-    # Create custom styles
-    styles.add(ParagraphStyle(
-        name='NameStyle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=6,
-        alignment=TA_CENTER
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='ContactStyle',
-        parent=styles['Normal'],
-        fontSize=11,
-        spaceAfter=20,
-        alignment=TA_CENTER
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='SectionHeader',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceBefore=12,
-        spaceAfter=6,
-        textColor='navy'
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='BulletPoint',
-        parent=styles['Normal'],
-        fontSize=11,
-        leftIndent=20,
-        bulletIndent=10,
-        spaceBefore=2,
-        spaceAfter=2
-    ))
-    
-# Add the missing JobTitle style
-    styles.add(ParagraphStyle(
-        name='JobTitle',
-        parent=styles['Normal'],
-        fontSize=12,
-        spaceAfter=6,
-        textColor='black',
-        bold=True  # Make the job title bold
-    ))
-    story = []
-    
-    # Header section
-    story.append(Paragraph(details['name'], styles['NameStyle']))
-    story.append(Paragraph(details['contact_info'], styles['ContactStyle']))
-    
-    # Summary section
-    if details['summary']:
-        story.append(Paragraph('SUMMARY', styles['SectionHeader']))
-        story.append(Paragraph(details['summary'], styles['Normal']))
-        story.append(Spacer(1, 12))
-    
-    # Experience section (empty in your case)
-    if details['experience']:
-        story.append(Paragraph('PROFESSIONAL EXPERIENCE', styles['SectionHeader']))
-        for job in details['experience']:
-            # Job title and company line
-            job_header = f"{job['title']} | {job['company']}"
-            if job.get('location') and job.get('date'):
-                job_header += f" | {job['location']} | {job['date']}"
-            story.append(Paragraph(job_header, styles['JobTitle']))
-            
-            # Job duties
-            for duty in job['duties']:
-                story.append(Paragraph(f"• {duty}", styles['BulletPoint']))
-            story.append(Spacer(1, 6))
-    
-    # Education section
-    if details['education']:
-        story.append(Paragraph('EDUCATION', styles['SectionHeader']))
-        story.append(Paragraph(details['education'], styles['Normal']))
-        story.append(Spacer(1, 12))
-    
-    # Skills section
-    if details['skills']:
-        story.append(Paragraph('SKILLS', styles['SectionHeader']))
-        skills_text = ""
-        for skill, value in details['skills'].items():
-            if skills_text:
-                skills_text += "<br/>"
-            skills_text += f"<b>{skill}:</b> {value}"
-        story.append(Paragraph(skills_text, styles['Normal']))
-        story.append(Spacer(1, 12))
-    
-    # Projects section
-    if details['projects']:
-        story.append(Paragraph('PROJECTS', styles['SectionHeader']))
-        for project in details['projects']:
-            project_text = f"<b>{project['name']}:</b> {project['description']}"
-            story.append(Paragraph(project_text, styles['Normal']))
-            story.append(Spacer(1, 6))
-    
-    # Certifications section (if not empty)
-    if details['certifications']:
-        story.append(Paragraph('CERTIFICATIONS', styles['SectionHeader']))
-        for cert in details['certifications']:
-            story.append(Paragraph(cert, styles['Normal']))
-        story.append(Spacer(1, 12))
-
-    # Additional Information
-    if details['additional_info']:
-        story.append(Paragraph('ADDITIONAL INFORMATION', styles['SectionHeader']))
-        story.append(Paragraph(details['additional_info'], styles['Normal']))
-        story.append(Spacer(1, 12))
-    
-    try:
-        print(story)
-        # Generate the PDF
-        doc.build(story)
-        # print(f"PDF successfully generated: {file_name}")
-    except Exception as e:
-        # print(f"Error generating PDF: {e}")
-        raise
-
 # Helper function to safely create text for PDF
 def clean_text_for_pdf(text):
     text=extract_resume_content(text)
@@ -0,0 +1,303 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.orm import undefer
+
+from checkpoints import PROCESS_ID
+from database import SessionLocal
+from models import ResumeJob
+
+logger = logging.getLogger(__name__)
+
+# Queue settings (override through environment variables)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "100"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))
+JOB_SWEEP_INTERVAL_SECONDS = int(os.getenv("JOB_SWEEP_INTERVAL_SECONDS", "300"))
+# A running job renews its lease every HEARTBEAT seconds; one whose lease is
+# older than LEASE seconds lost its process and is queued again
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "30"))
+
+# Handler signature: (job id, request payload, latency budget) -> (pdf bytes, filename, ats score)
+JobHandler = Callable[[str, dict, Optional[float]], Awaitable[tuple]]
+
+
+class QueueFullError(Exception):
+    pass
+
+
+# Raised by a handler whose job cannot run yet (e.g. a crashed process still
+# holds the lease on its workflow run); the job is queued again after delay
+# seconds and the attempt does not count
+class JobRetryLater(Exception):
+    def __init__(self, message: str, delay: float):
+        super().__init__(message)
+        self.delay = delay
+
+
+def job_status(job: ResumeJob) -> dict:
+    status = {
+        "job_id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.status == "succeeded":
+        status["ats_score"] = job.ats_score
+        status["filename"] = job.filename
+        status["download_url"] = f"/generate_resume/jobs/{job.id}/pdf"
+    elif job.status == "failed":
+        status["error"] = job.error
+    return status
+
+
+# Persistent resume-generation queue: jobs live in the resume_jobs table, a
+# fixed pool of asyncio workers runs them, and queued or interrupted jobs are
+# picked up again on the next start.
+#
+# Several processes may share the table: a job is run by whoever claims it
+# (owner + heartbeat_at), and only jobs whose lease has lapsed are recovered.
+class ResumeJobQueue:
+    def __init__(self, handler: JobHandler, workers: int = JOB_WORKERS, max_pending: int = JOB_MAX_PENDING,
+                 max_attempts: int = JOB_MAX_ATTEMPTS, retention_seconds: int = JOB_RETENTION_SECONDS,
+                 heartbeat_seconds: float = JOB_HEARTBEAT_SECONDS, lease_seconds: float = JOB_LEASE_SECONDS,
+                 owner: str = PROCESS_ID):
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.lease_seconds = lease_seconds
+        self.owner = owner
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued = set()
+        self._retries = set()
+        self._tasks = []
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._queued = set()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+        self._tasks.append(asyncio.create_task(self._recoverer()))
+        for job_id in await self._recover():
+            self._enqueue(job_id)
+
+    async def stop(self):
+        for handle in self._retries:
+            handle.cancel()
+        self._retries = set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, request: dict, latency_budget: Optional[float] = None) -> dict:
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        if self._queue.qsize() >= self.max_pending:
+            raise QueueFullError("Too many resume jobs are queued, try again later")
+        job = await self._create(request, latency_budget)
+        self._enqueue(job["job_id"])
+        return job
+
+    async def status(self, job_id: str) -> Optional[dict]:
+        async with SessionLocal() as db:
+            job = await db.get(ResumeJob, job_id)
+            return job_status(job) if job else None
+
+    async def result(self, job_id: str) -> Optional[ResumeJob]:
+        async with SessionLocal() as db:
+            return await db.get(ResumeJob, job_id, options=[undefer(ResumeJob.result_pdf)])
+
+    async def _create(self, request: dict, latency_budget: Optional[float]) -> dict:
+        async with SessionLocal() as db:
+            job = ResumeJob(id=uuid.uuid4().hex, status="queued", request=json.dumps(request),
+                            latency_budget=latency_budget, attempts=0)
+            db.add(job)
+            await db.commit()
+            await db.refresh(job)
+            return job_status(job)
+
+    def _enqueue(self, job_id: str):
+        if job_id not in self._queued:
+            self._queued.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    def _enqueue_later(self, job_id: str, delay: float):
+        def retry():
+            self._retries.discard(handle)
+            self._enqueue(job_id)
+
+        handle = asyncio.get_running_loop().call_later(delay, retry)
+        self._retries.add(handle)
+
+    # Queued jobs plus running jobs whose owner stopped renewing the lease (it
+    # crashed or was restarted); those are retried unless they have already
+    # used up their attempts. Jobs a live process is running are left alone.
+    async def _recover(self) -> list:
+        now = datetime.utcnow()
+        interrupted = and_(
+            ResumeJob.status == "running",
+            or_(ResumeJob.heartbeat_at.is_(None), ResumeJob.heartbeat_at < now - timedelta(seconds=self.lease_seconds)),
+        )
+        async with SessionLocal() as db:
+            await db.execute(
+                update(ResumeJob)
+                .where(interrupted, ResumeJob.attempts >= self.max_attempts)
+                .values(status="failed", error="Interrupted too many times", finished_at=now)
+            )
+            requeued = await db.execute(
+                update(ResumeJob).where(interrupted).values(status="queued", owner=None, heartbeat_at=None)
+            )
+            job_ids = (await db.execute(
+                select(ResumeJob.id).where(ResumeJob.status == "queued").order_by(ResumeJob.created_at)
+            )).scalars().all()
+            await db.commit()
+        if requeued.rowcount:
+            logger.info(f"Recovered {requeued.rowcount} interrupted resume jobs")
+        return job_ids
+
+    # One conditional UPDATE, so two processes can never both claim a job
+    async def _claim(self, job_id: str):
+        async with SessionLocal() as db:
+            result = await db.execute(
+                update(ResumeJob)
+                .where(ResumeJob.id == job_id, ResumeJob.status == "queued")
+                .values(status="running", attempts=ResumeJob.attempts + 1,
+                        owner=self.owner, heartbeat_at=datetime.utcnow())
+            )
+            if result.rowcount != 1:
+                await db.rollback()
+                return None
+            job = (await db.execute(
+                select(ResumeJob.request, ResumeJob.latency_budget).where(ResumeJob.id == job_id)
+            )).one()
+            await db.commit()
+            return json.loads(job.request), job.latency_budget
+
+    # Renew the lease; False once the job was recovered by another process
+    async def _heartbeat(self, job_id: str) -> bool:
+        async with SessionLocal() as db:
+            result = await db.execute(
+                update(ResumeJob)
+                .where(ResumeJob.id == job_id, ResumeJob.owner == self.owner, ResumeJob.status == "running")
+                .values(heartbeat_at=datetime.utcnow())
+            )
+            await db.commit()
+            return result.rowcount == 1
+
+    # Renews the lease while the job runs and cancels it once the lease is lost
+    async def _keep_alive(self, job_id: str, run: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                if not await self._heartbeat(job_id):
+                    logger.warning(f"Lost the lease on resume job {job_id}, cancelling it")
+                    run.cancel()
+                    return
+            except Exception as e:
+                logger.error(f"Resume job {job_id} heartbeat failed: {str(e)}")
+
+    # Hand a claimed job back to the queue; refund gives back the attempt it used
+    async def _release(self, job_id: str, refund: bool = False):
+        async with SessionLocal() as db:
+            await db.execute(
+                update(ResumeJob)
+                .where(ResumeJob.id == job_id, ResumeJob.owner == self.owner, ResumeJob.status == "running")
+                .values(status="queued", owner=None, heartbeat_at=None,
+                        attempts=ResumeJob.attempts - (1 if refund else 0))
+            )
+            await db.commit()
+
+    # Record how a claimed job ended; a job recovered by another process is left alone
+    async def _finish(self, job_id: str, **fields):
+        async with SessionLocal() as db:
+            await db.execute(
+                update(ResumeJob)
+                .where(ResumeJob.id == job_id, ResumeJob.owner == self.owner)
+                .values(**fields, finished_at=datetime.utcnow())
+            )
+            await db.commit()
+
+    async def _purge(self) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+        async with SessionLocal() as db:
+            result = await db.execute(
+                delete(ResumeJob)
+                .where(ResumeJob.status.in_(["succeeded", "failed"]), ResumeJob.finished_at < cutoff)
+            )
+            await db.commit()
+            return result.rowcount
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            self._queued.discard(job_id)
+            try:
+                claimed = await self._claim(job_id)
+                if claimed is None:
+                    continue
+                request, latency_budget = claimed
+                run = asyncio.create_task(self.handler(job_id, request, latency_budget))
+                keep_alive = asyncio.create_task(self._keep_alive(job_id, run))
+                try:
+                    pdf_bytes, filename, ats_score = await run
+                except asyncio.CancelledError:
+                    if keep_alive.done() and not keep_alive.cancelled():
+                        # The lease was lost; the process that recovered the job owns it now
+                        continue
+                    # Shutting down: hand the job back so it is retried without waiting for the lease to lapse
+                    await self._release(job_id)
+                    raise
+                except JobRetryLater as e:
+                    logger.info(f"Resume job {job_id} will be retried in {e.delay:.1f}s: {str(e)}")
+                    await self._release(job_id, refund=True)
+                    self._enqueue_later(job_id, e.delay)
+                    continue
+                except Exception as e:
+                    logger.error(f"Resume job {job_id} failed: {str(e)}", exc_info=True)
+                    await self._finish(job_id, status="failed", error=str(e))
+                    continue
+                finally:
+                    keep_alive.cancel()
+                await self._finish(
+                    job_id, status="succeeded", result_pdf=pdf_bytes,
+                    filename=filename, ats_score=ats_score, error=None
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Resume job worker {index} error: {str(e)}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _sweeper(self):
+        while True:
+            try:
+                deleted = await self._purge()
+                if deleted:
+                    logger.info(f"Purged {deleted} expired resume jobs")
+            except Exception as e:
+                logger.error(f"Resume job retention sweep failed: {str(e)}")
+            await asyncio.sleep(JOB_SWEEP_INTERVAL_SECONDS)
+
+    # Picks up jobs of processes that went away after this one started
+    async def _recoverer(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                for job_id in await self._recover():
+                    self._enqueue(job_id)
+            except Exception as e:
+                logger.error(f"Resume job recovery failed: {str(e)}")
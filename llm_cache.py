@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from llm_client import llm_client, model_name
+from metrics import LLM_CACHE_LOOKUPS, observe_llm_call
+from single_flight import single_flight
+
+logger = logging.getLogger(__name__)
+
+# Cache settings (override through environment variables)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./llm_cache.db")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+# Clients send this header (any truthy value) to skip the cache lookup for one request
+CACHE_BYPASS_HEADER = "X-LLM-Cache-Bypass"
+
+# Set per request by the middleware in main.py
+cache_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+def prompt_to_text(prompt) -> str:
+    if isinstance(prompt, str):
+        return prompt
+    # Chat prompts are lists of messages; keep the role so different roles never collide
+    return json.dumps(
+        [[getattr(message, "type", ""), getattr(message, "content", str(message))] for message in prompt],
+        ensure_ascii=False,
+    )
+
+
+def response_to_text(response) -> str:
+    if isinstance(response, str):
+        return response
+    if hasattr(response, "content"):
+        return response.content
+    return str(response)
+
+
+def model_identity(llm):
+    return model_name(llm), getattr(llm, "temperature", None)
+
+
+def make_cache_key(model: str, temperature, prompt_text: str) -> str:
+    digest = hashlib.sha256()
+    for part in (str(model), repr(temperature), prompt_text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+# SQLite-backed response store bounded by entry count, total size and TTL (LRU eviction)
+class LLMResponseCache:
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, model TEXT, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str, model: str = None):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, value, size, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        entries, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        if entries > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                (entries - self.max_entries,),
+            )
+            total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total_bytes > self.max_bytes:
+            # Walk from least recently used until enough bytes are freed
+            excess = total_bytes - self.max_bytes
+            doomed = []
+            for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at"):
+                doomed.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+response_cache = (
+    LLMResponseCache(LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_BYTES)
+    if LLM_CACHE_ENABLED
+    else None
+)
+
+
+def cache_stats() -> dict:
+    if response_cache is None:
+        return {"enabled": False}
+    return response_cache.stats()
+
+
+# Call the model through the client manager (concurrency cap, timeout,
+# retries), recording latency and token metrics for call_site
+async def invoke_llm(llm, prompt, call_site: str, **kwargs) -> str:
+    start = time.perf_counter()
+    try:
+        response = await llm_client.ainvoke(llm, prompt, **kwargs)
+    except Exception as e:
+        observe_llm_call(call_site, time.perf_counter() - start, prompt_to_text(prompt), None, error=e)
+        raise
+    text = response_to_text(response)
+    observe_llm_call(call_site, time.perf_counter() - start, prompt_to_text(prompt), text,
+                     usage=getattr(response, "usage_metadata", None))
+    return text
+
+
+async def stream_llm(llm, prompt, call_site: str, **kwargs):
+    start = time.perf_counter()
+    parts = []
+    try:
+        async for chunk in llm_client.astream(llm, prompt, **kwargs):
+            text = response_to_text(chunk)
+            parts.append(text)
+            yield text
+    except Exception as e:
+        observe_llm_call(call_site, time.perf_counter() - start, prompt_to_text(prompt), "".join(parts), error=e)
+        raise
+    observe_llm_call(call_site, time.perf_counter() - start, prompt_to_text(prompt), "".join(parts))
+
+
+# Await llm.ainvoke(prompt) through the response cache and return the response
+# text; call_site labels the call in the metrics. On a miss, concurrent
+# identical prompts share one model call (single_flight).
+async def cached_ainvoke(llm, prompt, call_site: str = "unknown", **kwargs) -> str:
+    model, temperature = model_identity(llm)
+    key = make_cache_key(model, temperature, prompt_to_text(prompt))
+    if response_cache is None:
+        return await single_flight.call(key, call_site, lambda: invoke_llm(llm, prompt, call_site, **kwargs))
+
+    if cache_bypass.get():
+        response_cache.bypasses += 1
+        LLM_CACHE_LOOKUPS.labels(call_site, "bypass").inc()
+    else:
+        cached = await asyncio.to_thread(response_cache.get, key)
+        if cached is not None:
+            logger.debug("LLM cache hit for %s (%s)", model, key[:12])
+            LLM_CACHE_LOOKUPS.labels(call_site, "hit").inc()
+            return cached
+        LLM_CACHE_LOOKUPS.labels(call_site, "miss").inc()
+
+    async def fetch() -> str:
+        text = await invoke_llm(llm, prompt, call_site, **kwargs)
+        await asyncio.to_thread(response_cache.set, key, text, str(model))
+        return text
+
+    return await single_flight.call(key, call_site, fetch)
+
+
+# Stream llm.astream(prompt) through the response cache, yielding text chunks.
+# A cache hit replays the stored response as a single chunk; a miss is stored
+# only once the stream has completed. Concurrent identical streams share one
+# model stream.
+async def cached_astream(llm, prompt, call_site: str = "unknown", **kwargs):
+    model, temperature = model_identity(llm)
+    key = make_cache_key(model, temperature, prompt_to_text(prompt))
+    if response_cache is None:
+        async for text in single_flight.stream(key, call_site, lambda: stream_llm(llm, prompt, call_site, **kwargs)):
+            yield text
+        return
+
+    if cache_bypass.get():
+        response_cache.bypasses += 1
+        LLM_CACHE_LOOKUPS.labels(call_site, "bypass").inc()
+    else:
+        cached = await asyncio.to_thread(response_cache.get, key)
+        if cached is not None:
+            LLM_CACHE_LOOKUPS.labels(call_site, "hit").inc()
+            yield cached
+            return
+        LLM_CACHE_LOOKUPS.labels(call_site, "miss").inc()
+
+    async def fetch():
+        parts = []
+        async for text in stream_llm(llm, prompt, call_site, **kwargs):
+            parts.append(text)
+            yield text
+        await asyncio.to_thread(response_cache.set, key, "".join(parts), str(model))
+
+    async for text in single_flight.stream(key, call_site, fetch):
+        yield text
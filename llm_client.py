@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from metrics import LLM_CLIENT_EVENTS, LLM_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+# Client settings (override through environment variables)
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8"))
+# Concurrent calls allowed per model; LLM_MODEL_CONCURRENCY overrides single
+# models, e.g. "models/gemini-1.5-pro=4,gemini-pro=16"
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MODEL_CONCURRENCY = os.getenv("LLM_MODEL_CONCURRENCY", "")
+# Send a second, identical request when the first has not answered after this
+# many seconds and take whichever finishes first (0 disables hedging). Hedges
+# only use free concurrency slots, so they never queue behind real traffic.
+LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0"))
+
+# HTTP statuses worth retrying: rate limits and transient server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+_STREAM_END = object()
+
+
+def model_name(llm) -> str:
+    return str(getattr(llm, "model", None) or getattr(llm, "model_name", None) or type(llm).__name__)
+
+
+def parse_model_limits(value: str) -> Dict[str, int]:
+    limits = {}
+    for item in value.split(","):
+        if "=" in item:
+            model, limit = item.rsplit("=", 1)
+            limits[model.strip()] = int(limit)
+    return limits
+
+
+# Timeouts and dropped connections are retried, as are Google API errors
+# (google.api_core exceptions carry the HTTP status in .code)
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    try:
+        return int(status) in RETRYABLE_STATUS_CODES
+    except (TypeError, ValueError):
+        return False
+
+
+# Every model call goes through here: a semaphore per model caps concurrency,
+# each attempt has a deadline, retryable failures back off exponentially with
+# jitter, and slow calls can be hedged. The manager also owns the connection
+# to each endpoint (transport()), which every model built for a role by
+# llm_provider shares, so all roles reuse one pooled channel.
+class LLMClientManager:
+    def __init__(self, timeout: float, max_attempts: int, backoff_base: float, backoff_max: float,
+                 max_concurrency: int, model_concurrency: Optional[Dict[str, int]] = None,
+                 hedge_after: float = 0):
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_concurrency = max_concurrency
+        self.model_concurrency = model_concurrency or {}
+        self.hedge_after = hedge_after
+        self._counts = {"calls": 0, "streams": 0, "retries": 0, "timeouts": 0, "errors": 0,
+                        "hedges": 0, "hedge_wins": 0}
+        self._in_flight: Dict[str, int] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop = None
+        self._transports: Dict[str, object] = {}
+        self._async_transports: Dict[str, object] = {}
+        self._transport_loop = None
+        self._lock = threading.Lock()
+
+    def limit(self, model: str) -> int:
+        return self.model_concurrency.get(model, self.max_concurrency)
+
+    # The client for an endpoint, built once by build() and shared by every
+    # model that calls it
+    def transport(self, endpoint: str, build: Callable[[], object]) -> object:
+        with self._lock:
+            client = self._transports.get(endpoint)
+            if client is None:
+                client = self._transports[endpoint] = build()
+            return client
+
+    # Same for async clients, which belong to the event loop that built them
+    def async_transport(self, endpoint: str, build: Callable[[], object]) -> object:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._transport_loop is not loop:
+                self._transport_loop = loop
+                self._async_transports = {}
+            client = self._async_transports.get(endpoint)
+            if client is None:
+                client = self._async_transports[endpoint] = build()
+            return client
+
+    # asyncio primitives belong to one event loop; start over when the app
+    # (or a benchmark) runs on a new one
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphores = {}
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            semaphore = self._semaphores[model] = asyncio.Semaphore(self.limit(model))
+        return semaphore
+
+    def _count(self, model: str, event: str):
+        with self._lock:
+            self._counts[event] += 1
+        LLM_CLIENT_EVENTS.labels(model, event).inc()
+
+    def _track(self, model: str, delta: int):
+        with self._lock:
+            self._in_flight[model] = self._in_flight.get(model, 0) + delta
+        LLM_IN_FLIGHT.labels(model).inc(delta)
+
+    def _retrying(self, model: str) -> AsyncRetrying:
+        def before_sleep(retry_state):
+            self._count(model, "retries")
+            logger.warning(
+                f"LLM call to {model} failed ({retry_state.outcome.exception()!r}); "
+                f"retry {retry_state.attempt_number}/{self.max_attempts - 1} "
+                f"in {retry_state.next_action.sleep:.2f}s"
+            )
+
+        return AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_random_exponential(multiplier=self.backoff_base, max=self.backoff_max),
+            retry=retry_if_exception(is_retryable),
+            before_sleep=before_sleep,
+            reraise=True,
+        )
+
+    async def _attempt(self, llm, model: str, prompt, kwargs: dict):
+        async with self._semaphore(model):
+            self._track(model, 1)
+            try:
+                return await asyncio.wait_for(llm.ainvoke(prompt, **kwargs), self.timeout)
+            except asyncio.TimeoutError:
+                self._count(model, "timeouts")
+                raise
+            finally:
+                self._track(model, -1)
+
+    async def _hedged(self, llm, model: str, prompt, kwargs: dict):
+        if self.hedge_after <= 0:
+            return await self._attempt(llm, model, prompt, kwargs)
+        primary = asyncio.ensure_future(self._attempt(llm, model, prompt, kwargs))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if done or self._semaphore(model).locked():
+                return await primary
+            self._count(model, "hedges")
+            tasks.add(asyncio.ensure_future(self._attempt(llm, model, prompt, kwargs)))
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    # A failed request only counts when its twin has failed too
+                    if task.exception() is None or not tasks:
+                        if task is not primary and task.exception() is None:
+                            self._count(model, "hedge_wins")
+                        return task.result()
+        finally:
+            # Cancel the loser and wait for it, so its concurrency slot is
+            # free again by the time the caller has the answer
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def ainvoke(self, llm, prompt, **kwargs):
+        model = model_name(llm)
+        self._count(model, "calls")
+        try:
+            async for attempt in self._retrying(model):
+                with attempt:
+                    return await self._hedged(llm, model, prompt, kwargs)
+        except Exception:
+            self._count(model, "errors")
+            raise
+
+    # Open the stream and wait for its first chunk; only this part is retried,
+    # since chunks already handed to the caller cannot be taken back
+    async def _open_stream(self, llm, model: str, prompt, kwargs: dict):
+        semaphore = self._semaphore(model)
+        await semaphore.acquire()
+        self._track(model, 1)
+        stream = llm.astream(prompt, **kwargs).__aiter__()
+        try:
+            try:
+                first = await asyncio.wait_for(stream.__anext__(), self.timeout)
+            except StopAsyncIteration:
+                first = _STREAM_END
+        except BaseException as e:
+            if isinstance(e, asyncio.TimeoutError):
+                self._count(model, "timeouts")
+            await self._close_stream(model, semaphore, stream)
+            raise
+        return semaphore, stream, first
+
+    async def _close_stream(self, model: str, semaphore: asyncio.Semaphore, stream):
+        try:
+            if hasattr(stream, "aclose"):
+                await stream.aclose()
+        finally:
+            self._track(model, -1)
+            semaphore.release()
+
+    # Yields the model's chunks; the concurrency slot is held until the stream
+    # ends and each chunk must arrive within the timeout
+    async def astream(self, llm, prompt, **kwargs):
+        model = model_name(llm)
+        self._count(model, "streams")
+        try:
+            async for attempt in self._retrying(model):
+                with attempt:
+                    semaphore, stream, chunk = await self._open_stream(llm, model, prompt, kwargs)
+        except Exception:
+            self._count(model, "errors")
+            raise
+
+        try:
+            while chunk is not _STREAM_END:
+                yield chunk
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), self.timeout)
+                except StopAsyncIteration:
+                    chunk = _STREAM_END
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                self._count(model, "timeouts")
+            self._count(model, "errors")
+            raise
+        finally:
+            await self._close_stream(model, semaphore, stream)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counts)
+            in_flight = {model: count for model, count in self._in_flight.items() if count}
+        stats["in_flight"] = in_flight
+        stats["transports"] = sorted(self._transports)
+        stats["timeout_seconds"] = self.timeout
+        stats["max_attempts"] = self.max_attempts
+        stats["max_concurrency"] = self.max_concurrency
+        stats["model_concurrency"] = self.model_concurrency
+        stats["hedge_after_seconds"] = self.hedge_after
+        return stats
+
+
+llm_client = LLMClientManager(
+    LLM_TIMEOUT_SECONDS, LLM_MAX_ATTEMPTS, LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS,
+    LLM_MAX_CONCURRENCY, parse_model_limits(LLM_MODEL_CONCURRENCY), LLM_HEDGE_AFTER_SECONDS,
+)
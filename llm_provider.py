@@ -0,0 +1,94 @@
+import os
+import threading
+from typing import Callable, Dict
+
+from dotenv import load_dotenv
+
+from llm_client import LLM_TIMEOUT_SECONDS
+
+load_dotenv()
+
+# "gemini" calls Google; "fake" uses fake_llm.FakeLLM, which needs neither
+# network access nor GOOGLE_API_KEY
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+
+# The model behind each role the app asks for
+LLM_ROLES = {
+    "mcq": {"model": "models/gemini-1.5-pro", "chat": True},
+    "resume_graph": {"model": "gemini-pro", "chat": False},
+    "ats_check": {"model": "gemini-pro", "chat": True, "temperature": 0},
+}
+
+
+class LLMConfigurationError(RuntimeError):
+    pass
+
+
+def gemini_llm(role: str, spec: dict):
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise LLMConfigurationError("GOOGLE_API_KEY not found in environment variables")
+    # The Google client libraries take about half a second to import; only pay
+    # for them once a Gemini model is actually built
+    from gemini_models import gemini_model
+
+    # Deadlines and retries are applied by llm_client.llm_client; the library's
+    # own retry loop is turned off so the two do not multiply
+    options = {"timeout": LLM_TIMEOUT_SECONDS, "max_retries": 1}
+    if "temperature" in spec:
+        options["temperature"] = spec["temperature"]
+    # Every role's model shares the connection llm_client holds for Gemini
+    return gemini_model(spec, api_key, options)
+
+
+def fake_llm(role: str, spec: dict):
+    from fake_llm import fake_for_role
+
+    return fake_for_role(role, spec)
+
+
+# Provider factories: (role, spec) -> LangChain-compatible model
+PROVIDERS: Dict[str, Callable[[str, dict], object]] = {
+    "gemini": gemini_llm,
+    "fake": fake_llm,
+}
+
+_provider = LLM_PROVIDER
+_instances = {}
+_lock = threading.Lock()
+
+
+# The model for a role, built by the active provider on first use
+def get_llm(role: str):
+    llm = _instances.get(role)
+    if llm is None:
+        with _lock:
+            llm = _instances.get(role)
+            if llm is None:
+                if _provider not in PROVIDERS:
+                    raise LLMConfigurationError(f"Unknown LLM provider {_provider!r}")
+                llm = PROVIDERS[_provider](role, LLM_ROLES[role])
+                _instances[role] = llm
+    return llm
+
+
+# Switch provider (e.g. to "fake" for offline runs); models are rebuilt lazily
+def use_provider(name: str):
+    global _provider
+    if name not in PROVIDERS:
+        raise LLMConfigurationError(f"Unknown LLM provider {name!r}")
+    with _lock:
+        _provider = name
+        _instances.clear()
+
+
+# Build every role's model ahead of the first request (startup warm-up)
+def warm_up():
+    for role in LLM_ROLES:
+        get_llm(role)
+
+
+# Inject a specific model object for one role
+def set_llm(role: str, llm):
+    with _lock:
+        _instances[role] = llm
@@ -1,44 +1,79 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, Form, Header
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field, EmailStr
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from database import engine, SessionLocal, Base
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import SessionLocal, init_db
 from models import User
 from schemas import SignupSchema, LoginSchema
-from utils import extract_resume_info, generate_cover_letter, generate_and_parse_mcqs
-from fastapi.responses import FileResponse
-from typing import List
-from fpdf import FPDF
+from utils import extract_resume_info, generate_cover_letter, generate_and_parse_mcqs, stream_mcqs
+from typing import TYPE_CHECKING, List, Optional, Literal
 import os
-import PyPDF2 as pdf
 from pathlib import Path
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser, ResponseSchema, StructuredOutputParser
-from graph import run_resume_ats_workflow, parse_resume_data, create_resume_pdf, clean_text_for_pdf
-from fastapi.responses import StreamingResponse
-from typing import List
+from resume_text import get_resume_record, resume_text_cache
+from pdf_extract import PDF_MAX_BYTES, PDFExtractionError, shutdown_pool as shutdown_pdf_pool, warm_up as warm_up_pdf_extract
+from uploads import UPLOAD_FORM_OVERHEAD_BYTES, UploadLimitMiddleware, read_pdf_upload
+from llm_provider import get_llm, warm_up as warm_up_llm_clients
+from llm_cache import CACHE_BYPASS_HEADER, cache_bypass, cache_stats, cached_ainvoke
+from llm_client import llm_client
+from single_flight import single_flight
+from graph import (
+    WorkflowRunActiveError, WorkflowRunError, WorkflowRunNotFoundError, continue_resume_ats_workflow,
+    run_resume_ats_workflow, stream_resume_ats_workflow, workflow_run_status, parse_resume_data,
+    clean_text_for_pdf, warm_workflows,
+)
+from checkpoints import run_store, warm_up as warm_up_checkpoints
+from pdf_render import render_cache, render_resume, resume_styles, shutdown_pool as shutdown_render_pool
+from downloads import download_store
+from jobs import JobRetryLater, ResumeJobQueue, QueueFullError
+from question_bank import QuestionBank
+from warmup import WarmUp
+from ats_scoring import score_resume
+from prompt_budget import PROMPT_JD_MAX_TOKENS, PROMPT_RESUME_MAX_TOKENS, budget_stats, fit_prompt_sections
+from metrics import HTTP_REQUEST_SECONDS, register_cache, render_metrics
+from passwords import hash_password, verify_and_update_password, shutdown_password_pool
+from fastapi.responses import StreamingResponse, Response, JSONResponse
 import logging
+import json
+if TYPE_CHECKING:
+    from langchain_core.prompts import ChatPromptTemplate
+import asyncio
+import time
 from io import BytesIO
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
+# Set up logging; per-call detail goes to the sampled structured log in metrics.py
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 # Get the base directory and load environment variables
 BASE_DIR = Path(__file__).resolve().parent
 load_dotenv()
 
-# Get API key
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not GOOGLE_API_KEY:
-    raise ValueError("GOOGLE_API_KEY not found in environment variables")
-
 # Initialize FastAPI app
 app = FastAPI()
 
+# Batch resume checking limits
+RESUME_BATCH_MAX_FILES = int(os.getenv("RESUME_BATCH_MAX_FILES", "50"))
+RESUME_BATCH_CONCURRENCY = int(os.getenv("RESUME_BATCH_CONCURRENCY", "4"))
+# Uploads read into memory and extracted at once per batch; bounds a batch's
+# memory to roughly this many PDF_MAX_BYTES buffers
+RESUME_BATCH_EXTRACT_CONCURRENCY = int(os.getenv("RESUME_BATCH_EXTRACT_CONCURRENCY", "4"))
+
+# Cap upload request bodies before they are parsed; registered ahead of CORS
+# so early 413s still carry CORS headers
+UPLOAD_MAX_BODY_BYTES = PDF_MAX_BYTES + UPLOAD_FORM_OVERHEAD_BYTES
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        "/cover-letter/": UPLOAD_MAX_BODY_BYTES,
+        "/resume-checker": UPLOAD_MAX_BODY_BYTES,
+        "/resume-checker/batch": RESUME_BATCH_MAX_FILES * UPLOAD_MAX_BODY_BYTES,
+    },
+)
+
 # Allow CORS for Next.js frontend
 origins = ["http://localhost:3000"]
 app.add_middleware(
@@ -49,11 +84,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Honour the per-request LLM cache bypass header
+@app.middleware("http")
+async def llm_cache_bypass_middleware(request, call_next):
+    bypass = request.headers.get(CACHE_BYPASS_HEADER, "").lower() in ("1", "true", "yes")
+    token = cache_bypass.set(bypass)
+    try:
+        return await call_next(request)
+    finally:
+        cache_bypass.reset(token)
+
+# Request latency per route template; unmatched paths share one label so
+# scanners cannot blow up the series count
+@app.middleware("http")
+async def request_metrics_middleware(request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            request.method, route.path if route else "unmatched", str(status)
+        ).observe(time.perf_counter() - start)
+
 # Create the database tables
-Base.metadata.create_all(bind=engine)
+@app.on_event("startup")
+async def create_tables():
+    await init_db()
+
+# Heavy imports, prompt templates, the compiled workflows and the LLM clients
+# are loaded in the background after startup (steps are registered next to
+# /ready); until that finishes /ready answers 503
+warm_up = WarmUp()
+
+@app.on_event("startup")
+def start_warm_up():
+    warm_up.start()
+
+@app.on_event("shutdown")
+async def stop_warm_up():
+    await warm_up.stop()
 
-# For password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing runs on the bcrypt pool in passwords.py
+@app.on_event("shutdown")
+def stop_password_pool():
+    shutdown_password_pool()
+
+@app.on_event("shutdown")
+def stop_pdf_pool():
+    shutdown_pdf_pool()
+
+@app.on_event("shutdown")
+def stop_render_pool():
+    shutdown_render_pool()
+
+# Oversized (413), unreadable or too-slow (422) PDFs
+@app.exception_handler(PDFExtractionError)
+async def pdf_extraction_error_handler(request, exc: PDFExtractionError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
 
 # Resume evaluation models and setup
 class ResumeEvaluation(BaseModel):
@@ -62,8 +153,6 @@ class ResumeEvaluation(BaseModel):
     jd_match: int = Field(description="Numerical percentage (0-100) based on overall match")
     suggestions: List[str] = Field(description="Detailed Improvement suggestions")
 
-parser = PydanticOutputParser(pydantic_object=ResumeEvaluation)
-
 # Initialize LangChain components
 template = """Act as an expert ATS (Applicant Tracking System) and professional resume reviewer. Your task is to analyze the job description and resume provided below.
 
@@ -75,15 +164,8 @@ Resume Text:
 
 {format_instructions}
 
-{{"Mistakes": ["List each formatting, content, or structural issue"],
-"MissingKeywords": ["List each important keyword from the job description that is missing from the resume"],
-"JD Match": "Numerical percentage (0-100) based on overall match with the job description",
-"Suggestions": ["First specific improvement suggestion",
-"Second specific improvement suggestion",
-"Add more specific, actionable suggestions here"]}}
-
 Important guidelines:
-1. List each suggestion as a separate item in the Suggestions array
+1. List each suggestion as a separate item in the suggestions array
 2. Make each suggestion specific and actionable
 3. Include at least 3-5 detailed suggestions for improvement
 4. List all important missing keywords
@@ -92,39 +174,70 @@ Important guidelines:
 
 Ensure the response is in valid JSON format with all sections properly formatted as arrays."""
 
-prompt = ChatPromptTemplate.from_template(template=template)
-model = ChatGoogleGenerativeAI(
-    model="gemini-pro",
-    google_api_key=GOOGLE_API_KEY,
-    temperature=0
-)
+# The output parser and the ATS prompt (with its format instructions bound)
+# are built on first use or at warm-up, so importing the app does not load
+# langchain_core
+_evaluation_parser = None
+_ats_prompt = None
+
+def evaluation_parser():
+    global _evaluation_parser
+    if _evaluation_parser is None:
+        from langchain_core.output_parsers import PydanticOutputParser
+        _evaluation_parser = PydanticOutputParser(pydantic_object=ResumeEvaluation)
+    return _evaluation_parser
+
+def ats_prompt() -> "ChatPromptTemplate":
+    global _ats_prompt
+    if _ats_prompt is None:
+        from langchain_core.prompts import ChatPromptTemplate
+        _ats_prompt = ChatPromptTemplate.from_template(template=template).partial(
+            format_instructions=evaluation_parser().get_format_instructions()
+        )
+    return _ats_prompt
 
 # Utility functions
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def check_email_exists(db: AsyncSession, email: str) -> bool:
+    return await get_user_by_email(db, email) is not None
 
-def check_email_exists(db: Session, email: str) -> bool:
-    return db.query(User).filter(User.email == email).first() is not None
-
-def input_pdf_text(uploaded_file: UploadFile) -> str:
+def pdf_bytes_text(data: bytes, digest: Optional[str] = None) -> str:
     try:
-        reader = pdf.PdfReader(uploaded_file.file)
-        text = ""
-        for page in range(len(reader.pages)):
-            text += reader.pages[page].extract_text()
-        return ' '.join(text.split())
+        # Shares the content-hash cache with /cover-letter/
+        record = get_resume_record(data, digest)
+        return ' '.join(record["text"].split())
+    except PDFExtractionError:
+        raise
     except Exception as e:
-        raise Exception(f"Error reading PDF: {str(e)}")
+        raise PDFExtractionError(f"Error reading PDF: {str(e)}")
+
+# Bind the job-description side of the ATS prompt once; the result only needs resume_text
+def job_description_prompt(job_description: str) -> "ChatPromptTemplate":
+    fitted = fit_prompt_sections("resume_checker", {"job_description": (job_description, PROMPT_JD_MAX_TOKENS)})
+    return ats_prompt().partial(job_description=fitted["job_description"])
+
+def fit_resume_text(resume_text: str) -> str:
+    return fit_prompt_sections("resume_checker", {"resume_text": (resume_text, PROMPT_RESUME_MAX_TOKENS)})["resume_text"]
+
+def evaluation_response(parsed_response: ResumeEvaluation) -> dict:
+    return {
+        "Mistakes": parsed_response.mistakes,
+        "MissingKeywords": parsed_response.missing_keywords,
+        "JD Match": parsed_response.jd_match,
+        "Suggestions": parsed_response.suggestions,
+    }
+
+async def run_resume_evaluation(jd_prompt: "ChatPromptTemplate", resume_text: str) -> dict:
+    messages = jd_prompt.format_messages(resume_text=fit_resume_text(resume_text))
+    response = await cached_ainvoke(get_llm("ats_check"), messages, call_site="ats_check")
+    return evaluation_response(evaluation_parser().parse(response))
 
 # API Routes
 @app.get("/")
@@ -132,24 +245,34 @@ async def root():
     return {"message": "Welcome to the Resume Analyzer API. Visit /docs for API documentation."}
 
 @app.post("/signup")
-async def signup(user: SignupSchema, db: Session = Depends(get_db)):
-    if check_email_exists(db, user.email):
+async def signup(user: SignupSchema, db: AsyncSession = Depends(get_db)):
+    if await check_email_exists(db, user.email):
         raise HTTPException(status_code=400, detail="Email already exists.")
     
-    hashed_password = hash_password(user.password)
+    hashed_password = await hash_password(user.password)
     new_user = User(email=user.email, password=hashed_password, phone_number=user.phone_number)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent signup for the same email
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email already exists.")
+    await db.refresh(new_user)
     return {"message": "User created successfully"}
 
 @app.post("/login")
-async def login(user: LoginSchema, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+async def login(user: LoginSchema, db: AsyncSession = Depends(get_db)):
+    db_user = await get_user_by_email(db, user.email)
     if not db_user:
         raise HTTPException(status_code=400, detail="Invalid email or password")
-    if not verify_password(user.password, db_user.password):
+    valid, new_hash = await verify_and_update_password(user.password, db_user.password)
+    if not valid:
         raise HTTPException(status_code=400, detail="Invalid email or password")
+    if new_hash:
+        # Stored hash used a different bcrypt cost; upgrade it transparently
+        db_user.password = new_hash
+        await db.commit()
     return {"message": "Login successful"}
 
 @app.post("/cover-letter/")
@@ -159,14 +282,11 @@ async def create_cover_letter(
     company_name: str = Form(...), 
     job_description: str = Form(...)
 ):
-    resume_path = f"temp_{resume.filename}"
-    with open(resume_path, "wb") as buffer:
-        buffer.write(await resume.read())
-
-    name, email, address = extract_resume_info(resume_path)
-    cover_letter = generate_cover_letter(job_role, company_name, job_description, resume_path)
-
-    os.remove(resume_path)
+    # Parse the upload once, straight from memory; PDF parsing is CPU-bound,
+    # keep it off the event loop
+    upload = await read_pdf_upload(resume)
+    name, email, address = await run_in_threadpool(extract_resume_info, upload.data, upload.digest)
+    cover_letter = generate_cover_letter(job_role, company_name, job_description, (name, email, address))
 
     return {
         "name": name,
@@ -175,18 +295,66 @@ async def create_cover_letter(
         "cover_letter": cover_letter
     }
 
+# Interview questions come from the persistent bank when it has enough for
+# this role/level/JD; cold misses are generated here and banked for next time
+question_bank = QuestionBank(generate_and_parse_mcqs)
+
+@app.on_event("startup")
+async def start_question_bank():
+    await question_bank.start()
+
+@app.on_event("shutdown")
+async def stop_question_bank():
+    await question_bank.stop()
+
 @app.post("/interview-prep/")
 async def interview_prep(
     job_description: str = Form(...), 
     job_role: str = Form(...), 
-    experience_level: str = Form(...)
+    experience_level: str = Form(...),
+    stream: bool = Form(False)
 ):
+    if stream:
+        return StreamingResponse(
+            stream_mcqs_ndjson(job_description, job_role, experience_level),
+            media_type="application/x-ndjson"
+        )
     try:
-        mcqs = generate_and_parse_mcqs(job_description, job_role, experience_level)
+        mcqs = await question_bank.sample(job_description, job_role, experience_level)
+        if mcqs is None:
+            mcqs = await generate_and_parse_mcqs(job_description, job_role, experience_level)
+            await question_bank.add(job_description, job_role, experience_level, mcqs)
         return {"questions": mcqs}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Banked questions if there are enough, otherwise stream them from the model
+# and bank what was generated
+async def interview_questions(job_description: str, job_role: str, experience_level: str):
+    banked = await question_bank.sample(job_description, job_role, experience_level)
+    if banked is not None:
+        for question in banked:
+            yield question
+        return
+    generated = []
+    async for question in stream_mcqs(job_description, job_role, experience_level):
+        generated.append(question)
+        yield question
+    await question_bank.add(job_description, job_role, experience_level, generated)
+
+# One JSON object per line: {"index", "question"} for each MCQ, then {"done", "count"}
+async def stream_mcqs_ndjson(job_description: str, job_role: str, experience_level: str):
+    count = 0
+    try:
+        async for question in interview_questions(job_description, job_role, experience_level):
+            yield json.dumps({"index": count, "question": question}) + "\n"
+            count += 1
+    except Exception as e:
+        logger.error(f"Error streaming MCQs: {str(e)}", exc_info=True)
+        yield json.dumps({"error": str(e)}) + "\n"
+        return
+    yield json.dumps({"done": True, "count": count}) + "\n"
+
 # Pydantic model with EmailStr for validation
 class ResumeInput(BaseModel):
     name: str
@@ -196,6 +364,13 @@ class ResumeInput(BaseModel):
     education: str
     experience: List[str]
     projects: List[str]
+    # Optional per-request overrides for the ATS improvement loop
+    score_threshold: Optional[float] = Field(default=None, ge=0, le=1)
+    max_iterations: Optional[int] = Field(default=None, ge=0, le=10)
+    # Target job description for ATS scoring; without it the resume is scored
+    # against the details above
+    job_description: Optional[str] = None
+    ats_scorer: Optional[Literal["local", "llm"]] = None
 
     class Config:
         json_schema_extra = {
@@ -210,81 +385,378 @@ class ResumeInput(BaseModel):
             }
         }
 
+# Collect resume data as formatted string
+def format_resume_input(resume_input: ResumeInput) -> str:
+    return (
+        f"Name: {resume_input.name}\n"
+        f"Email: {resume_input.email}\n"
+        f"LinkedIn: {resume_input.linkedin}\n"
+        f"GitHub: {resume_input.github}\n"
+        f"Education: {resume_input.education}\n"
+        f"Experience:\n" + "\n".join([f"- {exp}" for exp in resume_input.experience]) + "\n"
+        f"Projects:\n" + "\n".join([f"- {proj}" for proj in resume_input.projects])
+    )
+
+# Parse the workflow result and render the PDF in-memory; returns (pdf bytes, filename)
+async def render_resume_pdf(final_result: str):
+    text = clean_text_for_pdf(final_result)
+    parsed_data = parse_resume_data(text)
+    
+    # Rendered on the pdf_render process pool, or served from its cache
+    pdf_bytes = await render_resume(parsed_data)
+    filename = f"resume_{parsed_data['name'].replace(' ', '_').lower()}.pdf"
+    return pdf_bytes, filename
+
+# A failed workflow run keeps its checkpoints; clients resume it by run ID
+# instead of paying for the whole run again
+def workflow_run_error_detail(e: WorkflowRunError) -> dict:
+    detail = {"run_id": e.run_id}
+    if e.resumable:
+        detail["resume_url"] = f"/generate_resume/runs/{e.run_id}/resume"
+    return detail
+
+async def resume_pdf_response(result: dict) -> StreamingResponse:
+    if not result or "final_result" not in result or not result["final_result"]:
+        logger.error("Failed to generate resume: Workflow returned None or no final result")
+        raise HTTPException(status_code=500, detail="Failed to generate resume")
+
+    pdf_bytes, filename = await render_resume_pdf(result["final_result"])
+
+    # Return a response with the PDF for download
+    response = StreamingResponse(
+        BytesIO(pdf_bytes),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+    )
+    logger.info("Successfully generated resume")
+    return response
+
 @app.post("/generate_resume/")
-async def generate_resume(resume_input: ResumeInput):
+async def generate_resume(
+    resume_input: ResumeInput,
+    x_latency_budget: Optional[float] = Header(default=None, gt=0)
+):
     logger.info(f"Received request with data: {resume_input}")
     
     try:
-        # Collect resume data as formatted string
-        input_data_str = (
-            f"Name: {resume_input.name}\n"
-            f"Email: {resume_input.email}\n"
-            f"LinkedIn: {resume_input.linkedin}\n"
-            f"GitHub: {resume_input.github}\n"
-            f"Education: {resume_input.education}\n"
-            f"Experience:\n" + "\n".join([f"- {exp}" for exp in resume_input.experience]) + "\n"
-            f"Projects:\n" + "\n".join([f"- {proj}" for proj in resume_input.projects])
-        )
+        input_data_str = format_resume_input(resume_input)
 
         # Run ATS workflow and generate resume data
-        result = run_resume_ats_workflow(input_data_str)
-        if not result or "final_result" not in result or not result["final_result"]:
-            logger.error("Failed to generate resume: Workflow returned None or no final result")
-            raise HTTPException(status_code=500, detail="Failed to generate resume")
-
-        # Parse the result and create PDF in-memory
-        text = clean_text_for_pdf(result["final_result"])
-        parsed_data = parse_resume_data(text)
-        
-        # Use BytesIO as an in-memory buffer for the PDF
-        pdf_buffer = BytesIO()
-        create_resume_pdf(pdf_buffer, parsed_data)
-        pdf_buffer.seek(0)
-        
-        # Return a response with the PDF for download
-        response = StreamingResponse(
-            pdf_buffer, 
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=resume_{parsed_data['name'].replace(' ', '_').lower()}.pdf"
-            }
+        result = await run_resume_ats_workflow(
+            input_data_str,
+            score_threshold=resume_input.score_threshold,
+            max_iterations=resume_input.max_iterations,
+            job_description=resume_input.job_description,
+            ats_scorer=resume_input.ats_scorer,
+            latency_budget=x_latency_budget,
         )
-        logger.info("Successfully generated resume")
-        return response
+        return await resume_pdf_response(result)
 
+    except WorkflowRunError as e:
+        logger.error(f"Error generating resume: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail={"error": str(e), **workflow_run_error_detail(e)})
     except Exception as e:
         logger.error(f"Error generating resume: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+# Workflow runs: status of a run and resuming a failed or interrupted run from
+# its last checkpoint (succeeded runs drop their checkpoints)
+@app.get("/generate_resume/runs/{run_id}")
+async def get_workflow_run(run_id: str):
+    status = await workflow_run_status(run_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Workflow run not found")
+    if status["resumable"]:
+        status["resume_url"] = f"/generate_resume/runs/{run_id}/resume"
+    return status
+
+@app.post("/generate_resume/runs/{run_id}/resume")
+async def resume_workflow_run(
+    run_id: str,
+    x_latency_budget: Optional[float] = Header(default=None, gt=0)
+):
+    try:
+        result = await continue_resume_ats_workflow(run_id, latency_budget=x_latency_budget)
+        return await resume_pdf_response(result)
+    except WorkflowRunNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except WorkflowRunActiveError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except WorkflowRunError as e:
+        logger.error(f"Error resuming workflow run {run_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail={"error": str(e), **workflow_run_error_detail(e)})
     
+# NDJSON progress stream for the resume workflow: {"event": "run", "run_id"},
+# one {"event": "node"} line per graph node transition, then
+# {"event": "complete", "download_url", ...} whose URL serves the rendered PDF
+# for DOWNLOAD_TTL_SECONDS. A failed run can be resumed by its run ID.
+async def generate_resume_events(resume_input: ResumeInput, latency_budget: Optional[float] = None):
+    try:
+        final_state = None
+        async for event in stream_resume_ats_workflow(
+            format_resume_input(resume_input),
+            score_threshold=resume_input.score_threshold,
+            max_iterations=resume_input.max_iterations,
+            job_description=resume_input.job_description,
+            ats_scorer=resume_input.ats_scorer,
+            latency_budget=latency_budget,
+        ):
+            if event["event"] == "result":
+                final_state = event["state"]
+                continue
+            yield json.dumps(event) + "\n"
+
+        if not final_state or not final_state.get("final_result"):
+            raise ValueError("Workflow returned no final result")
+        pdf_bytes, filename = await render_resume_pdf(final_state["final_result"])
+        token = download_store.put(pdf_bytes, filename)
+        yield json.dumps({
+            "event": "complete",
+            "ats_score": final_state["ats_score"],
+            "iterations": final_state["iterations"],
+            "stop_reason": final_state.get("stop_reason", ""),
+            "download_token": token,
+            "download_url": f"/generate_resume/download/{token}",
+            "filename": filename,
+        }) + "\n"
+        logger.info("Successfully generated resume")
+    except WorkflowRunError as e:
+        logger.error(f"Error generating resume: {str(e)}", exc_info=True)
+        yield json.dumps({"event": "error", "detail": str(e), **workflow_run_error_detail(e)}) + "\n"
+    except Exception as e:
+        logger.error(f"Error generating resume: {str(e)}", exc_info=True)
+        yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+
+@app.post("/generate_resume/stream")
+async def generate_resume_stream(
+    resume_input: ResumeInput,
+    x_latency_budget: Optional[float] = Header(default=None, gt=0)
+):
+    logger.info(f"Received streaming request with data: {resume_input}")
+    return StreamingResponse(
+        generate_resume_events(resume_input, x_latency_budget),
+        media_type="application/x-ndjson"
+    )
+
+# Background job mode: submit returns a job id immediately and a worker pool
+# runs the workflow; clients poll the status URL and download the PDF. The job
+# ID doubles as the workflow run ID, so a job interrupted by a restart
+# continues from its last checkpoint instead of starting over.
+async def run_resume_job(job_id: str, request: dict, latency_budget: Optional[float]):
+    try:
+        try:
+            result = await continue_resume_ats_workflow(job_id, latency_budget=latency_budget)
+        except WorkflowRunNotFoundError:
+            resume_input = ResumeInput(**request)
+            result = await run_resume_ats_workflow(
+                format_resume_input(resume_input),
+                score_threshold=resume_input.score_threshold,
+                max_iterations=resume_input.max_iterations,
+                job_description=resume_input.job_description,
+                ats_scorer=resume_input.ats_scorer,
+                latency_budget=latency_budget,
+                run_id=job_id,
+            )
+    except WorkflowRunActiveError as e:
+        # A job recovered after a crash can find its run still leased by the
+        # dead process; pick it up again once that lease has lapsed
+        raise JobRetryLater(str(e), e.retry_after + 1)
+    if not result or not result.get("final_result"):
+        raise RuntimeError("Workflow returned None or no final result")
+    pdf_bytes, filename = await render_resume_pdf(result["final_result"])
+    return pdf_bytes, filename, result["ats_score"]
+
+job_queue = ResumeJobQueue(run_resume_job)
+
+@app.on_event("startup")
+async def start_job_queue():
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    await job_queue.stop()
+
+# Shutdown hooks run in registration order, so the store closes after
+# stop_job_queue: cancelling an in-flight job records its workflow run as
+# interrupted, which needs the store still open
+@app.on_event("startup")
+def open_run_store():
+    run_store.start()
+
+@app.on_event("shutdown")
+async def close_run_store():
+    await run_store.close()
+
+@app.post("/generate_resume/jobs", status_code=202)
+async def submit_resume_job(
+    resume_input: ResumeInput,
+    x_latency_budget: Optional[float] = Header(default=None, gt=0)
+):
+    try:
+        job = await job_queue.submit(resume_input.model_dump(mode="json"), x_latency_budget)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    job["status_url"] = f"/generate_resume/jobs/{job['job_id']}"
+    return job
+
+@app.get("/generate_resume/jobs/{job_id}")
+async def get_resume_job(job_id: str):
+    status = await job_queue.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
+
+@app.get("/generate_resume/jobs/{job_id}/pdf")
+async def download_resume_job(job_id: str):
+    job = await job_queue.result(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return Response(
+        content=job.result_pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename={job.filename}"}
+    )
+
+@app.get("/generate_resume/download/{token}")
+async def download_generated_resume(token: str):
+    item = download_store.get(token)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Download not found or expired")
+    content, filename, media_type = item
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
 @app.post("/resume-checker")
 async def evaluate_resume(job_description: str = Form(...), resume: UploadFile = File(...)):
     try:
-        if not resume.filename.endswith('.pdf'):
-            return {"error": "Please upload a PDF file"}
-
-        resume_text = input_pdf_text(resume)
-        messages = prompt.format_messages(
-            job_description=job_description,
-            resume_text=resume_text,
-            format_instructions=parser.get_format_instructions()
-        )
+        upload = await read_pdf_upload(resume)
+        resume_text = await run_in_threadpool(pdf_bytes_text, upload.data, upload.digest)
+        messages = job_description_prompt(job_description).format_messages(resume_text=fit_resume_text(resume_text))
         
-        response =  model.invoke(input = messages)
+        response = await cached_ainvoke(get_llm("ats_check"), messages, call_site="ats_check")
         
         try:
-            parsed_response = parser.parse(response.content)
-            return {
-                "Mistakes": parsed_response.mistakes,
-                "MissingKeywords": parsed_response.missing_keywords,
-                "JD Match": parsed_response.jd_match,
-                "Suggestions": parsed_response.suggestions,
-            }
+            return evaluation_response(evaluation_parser().parse(response))
         except Exception as e:
             return {"error": str(e)}
 
+    except (PDFExtractionError, HTTPException):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Evaluate many resumes against one job description. Text extraction runs in
+# parallel, LLM calls are capped at RESUME_BATCH_CONCURRENCY, and every file
+# gets its own result or error. With stream=true, results are sent as NDJSON
+# in completion order instead of one JSON body in upload order.
+@app.post("/resume-checker/batch")
+async def evaluate_resume_batch(
+    job_description: str = Form(...),
+    resumes: List[UploadFile] = File(...),
+    stream: bool = Form(False)
+):
+    if len(resumes) > RESUME_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {RESUME_BATCH_MAX_FILES} resumes per batch")
+
+    jd_prompt = job_description_prompt(job_description)
+    semaphore = asyncio.Semaphore(RESUME_BATCH_CONCURRENCY)
+    extract_semaphore = asyncio.Semaphore(RESUME_BATCH_EXTRACT_CONCURRENCY)
+
+    # Only the extracted text outlives the semaphore; the upload bytes are
+    # dropped before the next file is read
+    async def extract(resume: UploadFile) -> str:
+        async with extract_semaphore:
+            upload = await read_pdf_upload(resume)
+            return await run_in_threadpool(pdf_bytes_text, upload.data, upload.digest)
+
+    async def evaluate(index: int, resume: UploadFile) -> dict:
+        item = {"index": index, "filename": resume.filename}
+        try:
+            resume_text = await extract(resume)
+        except HTTPException as e:
+            item["error"] = e.detail
+            return item
+        except Exception as e:
+            item["error"] = str(e)
+            return item
+        try:
+            async with semaphore:
+                item["evaluation"] = await run_resume_evaluation(jd_prompt, resume_text)
+        except Exception as e:
+            logger.error(f"Error evaluating {resume.filename}: {str(e)}")
+            item["error"] = str(e)
+        return item
+
+    tasks = [evaluate(index, resume) for index, resume in enumerate(resumes)]
+    if not stream:
+        return {"results": await asyncio.gather(*tasks)}
+
+    async def results_ndjson():
+        for next_result in asyncio.as_completed(tasks):
+            yield json.dumps(await next_result) + "\n"
+
+    return StreamingResponse(results_ndjson(), media_type="application/x-ndjson")
+
+@app.get("/llm-cache/stats")
+async def llm_cache_stats():
+    return cache_stats()
+
+@app.get("/llm-client/stats")
+async def llm_client_stats():
+    return llm_client.stats()
+
+@app.get("/llm-coalescing/stats")
+async def llm_coalescing_stats():
+    return single_flight.stats()
+
+@app.get("/resume-cache/stats")
+async def resume_cache_stats():
+    return resume_text_cache.stats()
+
+@app.get("/resume-pdf-cache/stats")
+async def resume_pdf_cache_stats():
+    return render_cache.stats()
+
+@app.get("/question-bank/stats")
+async def question_bank_stats():
+    return question_bank.stats()
+
+@app.get("/prompt-budget/stats")
+async def prompt_budget_stats():
+    return budget_stats()
+
+warm_up.add("workflows", warm_workflows)
+warm_up.add("ats_prompt", ats_prompt)
+warm_up.add("llm_clients", warm_up_llm_clients)
+warm_up.add("pdf_extract", warm_up_pdf_extract)
+warm_up.add("pdf_render", resume_styles)
+warm_up.add("ats_scoring", lambda: score_resume("python", "python"))
+warm_up.add("checkpoints", warm_up_checkpoints)
+
+# Readiness probe: 200 once warm-up has completed, 503 (with per-step status) before
+@app.get("/ready")
+async def ready():
+    status = warm_up.stats()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+register_cache("llm_response", cache_stats)
+register_cache("resume_text", resume_text_cache.stats)
+register_cache("resume_pdf", render_cache.stats)
+register_cache("question_bank", question_bank.stats)
+
+# Prometheus scrape endpoint
+@app.get("/metrics")
+async def metrics():
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
 # Additional utility function for cleaning up
 # @app.on_event("shutdown")
 # def cleanup_temp_files():
\ No newline at end of file
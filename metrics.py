@@ -0,0 +1,137 @@
+import functools
+import json
+import logging
+import os
+import random
+import time
+from typing import Callable, Dict, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from prompt_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Fraction of LLM calls written to the structured call log (0 disables it)
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.05"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route template (time to response start)",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_duration_seconds", "Latency of calls that reached the model", ["call_site", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens sent to and received from the model", ["call_site", "kind"])
+LLM_CACHE_LOOKUPS = Counter("llm_cache_lookups_total", "LLM response cache lookups", ["call_site", "result"])
+GRAPH_NODE_SECONDS = Histogram(
+    "graph_node_duration_seconds", "Resume workflow node latency", ["node"], buckets=LATENCY_BUCKETS,
+)
+GRAPH_ITERATIONS = Histogram(
+    "resume_graph_iterations", "Improvement iterations per resume workflow run", ["stop_reason"],
+    buckets=(0, 1, 2, 3, 4, 5, 6, 8, 10),
+)
+LLM_SINGLE_FLIGHT_EVENTS = Counter(
+    "llm_single_flight_total",
+    "Identical concurrent LLM requests: calls started (leaders), requests that joined one (coalesced), "
+    "calls cancelled because every waiter left (abandoned)",
+    ["call_site", "event"],
+)
+LLM_CLIENT_EVENTS = Counter(
+    "llm_client_events_total", "LLM client calls, retries, timeouts and hedges by model", ["model", "event"],
+)
+WORKFLOW_RUNS = Counter(
+    "resume_workflow_runs_total",
+    "Checkpointed resume workflow runs started, resumed, succeeded, failed or interrupted", ["event"],
+)
+LLM_IN_FLIGHT = Gauge("llm_in_flight_requests", "Model requests currently in flight", ["model"])
+PDF_PARSE_SECONDS = Histogram(
+    "pdf_parse_duration_seconds", "PDF text extraction latency", ["outcome"], buckets=LATENCY_BUCKETS,
+)
+PDF_RENDER_SECONDS = Histogram(
+    "pdf_render_duration_seconds", "Resume PDF render latency (cache misses only)", buckets=LATENCY_BUCKETS,
+)
+
+
+# Exposes the hit/miss counters the caches already keep through their stats()
+class CacheStatsCollector:
+    def __init__(self):
+        self.sources: Dict[str, Callable[[], dict]] = {}
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily("cache_hit_ratio", "Cache hit ratio since start", labels=["cache"])
+        entries = GaugeMetricFamily("cache_entries", "Entries currently cached", labels=["cache"])
+        for name, stats_fn in list(self.sources.items()):
+            try:
+                stats = stats_fn()
+            except Exception as e:
+                logger.warning(f"Could not read {name} cache stats: {e}")
+                continue
+            if "hits" not in stats:
+                continue
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            ratio.add_metric([name], stats.get("hit_rate", 0.0))
+            if "entries" in stats:
+                entries.add_metric([name], stats["entries"])
+        return [hits, misses, ratio, entries]
+
+
+cache_collector = CacheStatsCollector()
+REGISTRY.register(cache_collector)
+
+
+def register_cache(name: str, stats_fn: Callable[[], dict]):
+    cache_collector.sources[name] = stats_fn
+
+
+def render_metrics():
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def log_sampled(event: str, **fields):
+    if LOG_SAMPLE_RATE > 0 and random.random() < LOG_SAMPLE_RATE:
+        logger.info(json.dumps({"event": event, **fields}, default=str))
+
+
+# Record one model call. usage is the response's usage_metadata when the
+# client reports it; otherwise token counts are estimated from the text.
+def observe_llm_call(call_site: str, seconds: float, prompt_text: str, response_text: Optional[str],
+                     usage: Optional[dict] = None, error: Optional[Exception] = None):
+    outcome = "error" if error is not None else "ok"
+    LLM_CALL_SECONDS.labels(call_site, outcome).observe(seconds)
+    prompt_tokens = (usage or {}).get("input_tokens") or estimate_tokens(prompt_text)
+    completion_tokens = (usage or {}).get("output_tokens") or estimate_tokens(response_text or "")
+    LLM_TOKENS.labels(call_site, "prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(call_site, "completion").inc(completion_tokens)
+    log_sampled(
+        "llm_call", call_site=call_site, outcome=outcome, duration_ms=round(seconds * 1000, 1),
+        prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+        error=type(error).__name__ if error is not None else None,
+    )
+
+
+# Wrap a LangGraph node so its duration is recorded. functools.wraps keeps the
+# wrapped signature visible, so LangGraph still passes config to nodes that take it.
+def timed_node(name: str, node):
+    @functools.wraps(node)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = node(*args, **kwargs)
+            if hasattr(result, "__await__"):
+                result = await result
+            return result
+        finally:
+            GRAPH_NODE_SECONDS.labels(name).observe(time.perf_counter() - start)
+    return wrapper
+
+
+def observe_graph_run(state: dict):
+    GRAPH_ITERATIONS.labels(state.get("stop_reason") or "unknown").observe(state.get("iterations", 0))
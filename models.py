@@ -1,5 +1,7 @@
 # models.py
-from sqlalchemy import Column, Integer, String
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, LargeBinary, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import deferred
 from database import Base
 
 class User(Base):
@@ -8,4 +10,46 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
     password = Column(String)
-    phone_number = Column(String)  # Add this line for phone number
\ No newline at end of file
+    phone_number = Column(String)  # Add this line for phone number
+
+class ResumeJob(Base):
+    __tablename__ = 'resume_jobs'
+
+    id = Column(String, primary_key=True, index=True)
+    status = Column(String, index=True, default='queued')  # queued, running, succeeded, failed
+    request = Column(Text)  # ResumeInput as JSON
+    latency_budget = Column(Float, nullable=True)
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    ats_score = Column(Float, nullable=True)
+    filename = Column(String, nullable=True)
+    owner = Column(String, nullable=True)  # process running the job
+    heartbeat_at = Column(DateTime, nullable=True)  # lease renewed while it runs
+    # Loaded only when the PDF is downloaded (ResumeJobQueue.result), not on status polls
+    result_pdf = deferred(Column(LargeBinary, nullable=True))
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True, index=True)
+
+class MCQBank(Base):
+    __tablename__ = 'mcq_banks'
+
+    key = Column(String, primary_key=True)  # hash of normalized role, level and JD fingerprint
+    job_role = Column(String)
+    experience_level = Column(String)
+    job_description = Column(Text)  # kept so background refills can regenerate
+    served_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_served_at = Column(DateTime, nullable=True)
+
+class MCQQuestion(Base):
+    __tablename__ = 'mcq_questions'
+    __table_args__ = (UniqueConstraint('bank_key', 'question_hash'),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    bank_key = Column(String, ForeignKey('mcq_banks.key', ondelete='CASCADE'), index=True)
+    question_hash = Column(String)
+    text = Column(Text)
+    options = Column(Text)  # JSON list of option strings
+    correct_answer = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,42 @@
+import asyncio
+import os
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from worker_pools import WorkerPool
+
+# bcrypt work factor (log2 rounds). Hashes made with any other cost are
+# rehashed transparently on the next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL while hashing, so a thread pool runs hashes in
+# parallel on separate cores without blocking the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+hash_pool = WorkerPool(PASSWORD_HASH_WORKERS, processes=False, thread_name_prefix="bcrypt")
+
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hash_pool.get(), pwd_context.hash, password)
+
+
+# Returns (is_valid, replacement_hash); replacement_hash is set when the stored
+# hash was made with a different cost and should be saved in its place
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        hash_pool.get(), pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+def shutdown_password_pool():
+    hash_pool.shutdown()
@@ -0,0 +1,256 @@
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from io import BytesIO
+from typing import List, Optional
+
+from worker_pools import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+# Extraction limits (override through environment variables)
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+PDF_EXTRACT_TIMEOUT_SECONDS = float(os.getenv("PDF_EXTRACT_TIMEOUT_SECONDS", "20"))
+# Documents with at least this many pages are split across the process pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+# Extraction runs on this many worker processes, where the time limit can stop
+# a page mid-way; with 0 it runs on the calling thread and the limit is only
+# checked between pages
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+# How long past the deadline to wait for a worker before replacing the pool
+PDF_EXTRACT_KILL_GRACE_SECONDS = float(os.getenv("PDF_EXTRACT_KILL_GRACE_SECONDS", "2"))
+
+
+class PDFExtractionError(ValueError):
+    status_code = 422
+
+
+class PDFTooLargeError(PDFExtractionError):
+    status_code = 413
+
+
+class PDFTimeoutError(PDFExtractionError):
+    status_code = 422
+
+
+# When each pool task started running (0 while it is not), written by the
+# worker itself: a future is reported as running as soon as it reaches the
+# pool's call queue, so only this tells a task stuck past its deadline from one
+# still waiting for a worker. A slot is handed out per task and returned once
+# the task is done.
+_TASK_SLOTS = 256
+_task_started = multiprocessing.get_context("spawn").RawArray("d", _TASK_SLOTS)
+_free_slots = queue.SimpleQueue()
+for _slot in range(_TASK_SLOTS):
+    _free_slots.put(_slot)
+
+
+def _init_worker(task_started):
+    global _task_started
+    _task_started = task_started
+
+
+extract_pool = WorkerPool(PDF_EXTRACT_WORKERS, initializer=_init_worker, initargs=(_task_started,))
+
+
+def shutdown_pool():
+    extract_pool.shutdown()
+
+
+# BaseException so that pypdf's own `except Exception` blocks cannot swallow it
+class _DeadlineExceeded(BaseException):
+    pass
+
+
+def _deadline_exceeded(signum, frame):
+    raise _DeadlineExceeded()
+
+
+# Pool tasks run on the worker's main thread, so a timer signal interrupts a
+# page that would otherwise never finish and the worker is free for the next
+# task. deadline is wall-clock time, since the task may have waited in the queue.
+@contextmanager
+def _worker_task(deadline: float, slot: Optional[int]):
+    from pypdf.errors import PdfReadError
+
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise PDFTimeoutError("PDF text extraction ran out of time")
+    alarm = hasattr(signal, "setitimer")
+    if alarm:
+        signal.signal(signal.SIGALRM, _deadline_exceeded)
+        signal.setitimer(signal.ITIMER_REAL, remaining)
+    if slot is not None:
+        _task_started[slot] = time.time()
+    try:
+        yield
+    except _DeadlineExceeded:
+        raise PDFTimeoutError("PDF text extraction ran out of time")
+    except (PdfReadError, ValueError, KeyError, TypeError) as e:
+        if isinstance(e, PDFExtractionError):
+            raise
+        raise PDFExtractionError(f"Error reading PDF: {str(e)}")
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        if slot is not None:
+            _task_started[slot] = 0.0
+
+
+# Runs in a pool worker: parses the document, enforces the page limit and
+# extracts every page, unless the document has split_pages pages or more, in
+# which case only the page count is returned and the pages are split across
+# the pool
+def _extract_document(data: bytes, max_pages: int, split_pages: Optional[int], deadline: float,
+                      slot: Optional[int] = None):
+    from pypdf import PdfReader
+
+    with _worker_task(deadline, slot):
+        reader = PdfReader(BytesIO(data))
+        page_count = len(reader.pages)
+        if page_count > max_pages:
+            raise PDFTooLargeError(f"PDF has {page_count} pages, the limit is {max_pages}")
+        if split_pages is not None and page_count >= split_pages:
+            return page_count, None
+        return page_count, [page.extract_text() or "" for page in reader.pages]
+
+
+# Runs in a pool worker: each worker opens its own reader over the same bytes
+def _extract_page_range(data: bytes, start: int, stop: int, deadline: float,
+                        slot: Optional[int] = None) -> List[str]:
+    from pypdf import PdfReader
+
+    with _worker_task(deadline, slot):
+        reader = PdfReader(BytesIO(data))
+        return [reader.pages[index].extract_text() or "" for index in range(start, stop)]
+
+
+def _import_pypdf():
+    import pypdf  # noqa: F401
+
+
+# Imports pypdf here and starts the pool workers, so the first upload does not
+# spend its time limit spawning processes
+def warm_up():
+    _import_pypdf()
+    if PDF_EXTRACT_WORKERS > 0:
+        pool = extract_pool.get()
+        for future in [pool.submit(_import_pypdf) for _ in range(PDF_EXTRACT_WORKERS)]:
+            future.result()
+
+
+def _page_ranges(page_count: int, chunks: int):
+    size = -(-page_count // chunks)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _submit(pool, fn, *args):
+    try:
+        slot = _free_slots.get_nowait()
+    except queue.Empty:
+        slot = None  # untracked, so never taken for a stuck task
+    try:
+        future = pool.submit(fn, *args, slot)
+    except BaseException:
+        if slot is not None:
+            _free_slots.put(slot)
+        raise
+    if slot is not None:
+        future.add_done_callback(lambda _: _free_slots.put(slot))
+    return future, slot
+
+
+# Wait for the tasks in order. The worker stops itself at the deadline; the
+# grace period only matters when it cannot (no SIGALRM, stuck in C code).
+def _collect(pool, tasks, deadline: float, timeout: float) -> list:
+    try:
+        return [
+            future.result(timeout=max(0.0, deadline - time.monotonic()) + PDF_EXTRACT_KILL_GRACE_SECONDS)
+            for future, _ in tasks
+        ]
+    except PDFTimeoutError:
+        for future, _ in tasks:
+            future.cancel()
+        raise PDFTimeoutError(f"PDF text extraction took longer than {timeout:g}s")
+    except FutureTimeoutError:
+        # Still waiting for a worker is fine; started and still running this
+        # long after its deadline means the worker is stuck. The slot is read
+        # before done() is checked, as it is only handed out again once done.
+        stuck = any(
+            slot is not None and _task_started[slot] > 0 and not future.done() for future, slot in tasks
+        )
+        for future, _ in tasks:
+            future.cancel()
+        if stuck:
+            # Last resort when a worker ignores its own deadline: kill the
+            # pool's processes; the next extraction starts a new pool
+            extract_pool.recycle(pool)
+            logger.warning("Replaced the PDF extraction pool after a worker overran its deadline")
+        raise PDFTimeoutError(f"PDF text extraction took longer than {timeout:g}s")
+
+
+# Extract the text of a PDF held in memory, enforcing byte, page and time
+# limits. The document is parsed and its pages extracted on the process pool,
+# large documents split into page ranges across its workers; page texts are
+# collected in a list and joined once.
+def extract_pdf_text(data: bytes, max_bytes: int = PDF_MAX_BYTES, max_pages: int = PDF_MAX_PAGES,
+                     timeout: float = PDF_EXTRACT_TIMEOUT_SECONDS) -> str:
+    if len(data) > max_bytes:
+        raise PDFTooLargeError(f"PDF is larger than {max_bytes} bytes")
+    deadline = time.monotonic() + timeout
+    if PDF_EXTRACT_WORKERS <= 0:
+        return _extract_in_thread(data, max_pages, deadline, timeout)
+
+    wall_deadline = time.time() + timeout
+    split_pages = PDF_PARALLEL_MIN_PAGES if PDF_EXTRACT_WORKERS > 1 else None
+    try:
+        pool = extract_pool.get()
+        [(page_count, parts)] = _collect(
+            pool, [_submit(pool, _extract_document, data, max_pages, split_pages, wall_deadline)], deadline, timeout
+        )
+        if parts is None:
+            tasks = [
+                _submit(pool, _extract_page_range, data, start, stop, wall_deadline)
+                for start, stop in _page_ranges(page_count, PDF_EXTRACT_WORKERS)
+            ]
+            parts = [text for texts in _collect(pool, tasks, deadline, timeout) for text in texts]
+    except PDFExtractionError:
+        raise
+    except Exception as e:
+        raise PDFExtractionError(f"Error reading PDF: {str(e)}")
+
+    return "".join(parts)
+
+
+# Without a pool: runs on the calling thread, and the time limit is only
+# checked between pages
+def _extract_in_thread(data: bytes, max_pages: int, deadline: float, timeout: float) -> str:
+    # pypdf is imported on first use (or by warm_up) to keep app startup fast
+    from pypdf import PdfReader
+    from pypdf.errors import PdfReadError
+
+    try:
+        reader = PdfReader(BytesIO(data))
+        page_count = len(reader.pages)
+    except (PdfReadError, ValueError, KeyError, TypeError) as e:
+        raise PDFExtractionError(f"Error reading PDF: {str(e)}")
+    if page_count > max_pages:
+        raise PDFTooLargeError(f"PDF has {page_count} pages, the limit is {max_pages}")
+
+    parts = []
+    try:
+        for page in reader.pages:
+            if time.monotonic() > deadline:
+                raise PDFTimeoutError(f"PDF text extraction took longer than {timeout:g}s")
+            parts.append(page.extract_text() or "")
+    except PDFExtractionError:
+        raise
+    except Exception as e:
+        raise PDFExtractionError(f"Error reading PDF: {str(e)}")
+    return "".join(parts)
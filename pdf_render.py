@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from metrics import PDF_RENDER_SECONDS
+from worker_pools import WorkerPool
+
+# Rendering is CPU-bound and holds the GIL, so it runs on a process pool;
+# 0 workers renders on the thread pool instead
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", str(os.cpu_count() or 1)))
+# Rendered PDFs kept in memory, keyed by a hash of the parsed resume
+PDF_RENDER_CACHE_MAX_ENTRIES = int(os.getenv("PDF_RENDER_CACHE_MAX_ENTRIES", "128"))
+
+_styles = None
+_styles_lock = threading.Lock()
+
+
+# The sample stylesheet plus the resume styles, built once per process.
+# reportlab is imported here rather than at module level so importing the app
+# does not pay for it; warm-up or the first render does.
+def resume_styles():
+    global _styles
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    with _styles_lock:
+        if _styles is None:
+            styles = getSampleStyleSheet()
+            styles.add(ParagraphStyle(
+                name='NameStyle',
+                parent=styles['Heading1'],
+                fontSize=24,
+                spaceAfter=6,
+                alignment=TA_CENTER
+            ))
+            styles.add(ParagraphStyle(
+                name='ContactStyle',
+                parent=styles['Normal'],
+                fontSize=11,
+                spaceAfter=20,
+                alignment=TA_CENTER
+            ))
+            styles.add(ParagraphStyle(
+                name='SectionHeader',
+                parent=styles['Heading2'],
+                fontSize=14,
+                spaceBefore=12,
+                spaceAfter=6,
+                textColor='navy'
+            ))
+            styles.add(ParagraphStyle(
+                name='BulletPoint',
+                parent=styles['Normal'],
+                fontSize=11,
+                leftIndent=20,
+                bulletIndent=10,
+                spaceBefore=2,
+                spaceAfter=2
+            ))
+            styles.add(ParagraphStyle(
+                name='JobTitle',
+                parent=styles['Normal'],
+                fontSize=12,
+                spaceAfter=6,
+                textColor='black',
+                bold=True  # Make the job title bold
+            ))
+            _styles = styles
+        return _styles
+
+
+def create_resume_pdf(file_name, details):
+    from reportlab.lib.pagesizes import LETTER
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    doc = SimpleDocTemplate(file_name, pagesize=LETTER, rightMargin=72, leftMargin=72, topMargin=36, bottomMargin=36)
+    styles = resume_styles()
+    story = []
+
+    # Header section
+    story.append(Paragraph(details['name'], styles['NameStyle']))
+    story.append(Paragraph(details['contact_info'], styles['ContactStyle']))
+
+    # Summary section
+    if details['summary']:
+        story.append(Paragraph('SUMMARY', styles['SectionHeader']))
+        story.append(Paragraph(details['summary'], styles['Normal']))
+        story.append(Spacer(1, 12))
+
+    # Experience section
+    if details['experience']:
+        story.append(Paragraph('PROFESSIONAL EXPERIENCE', styles['SectionHeader']))
+        for job in details['experience']:
+            # Job title and company line
+            job_header = f"{job['title']} | {job['company']}"
+            if job.get('location') and job.get('date'):
+                job_header += f" | {job['location']} | {job['date']}"
+            story.append(Paragraph(job_header, styles['JobTitle']))
+
+            # Job duties
+            for duty in job['duties']:
+                story.append(Paragraph(f"• {duty}", styles['BulletPoint']))
+            story.append(Spacer(1, 6))
+
+    # Education section
+    if details['education']:
+        story.append(Paragraph('EDUCATION', styles['SectionHeader']))
+        story.append(Paragraph(details['education'], styles['Normal']))
+        story.append(Spacer(1, 12))
+
+    # Skills section
+    if details['skills']:
+        story.append(Paragraph('SKILLS', styles['SectionHeader']))
+        skills_text = "<br/>".join(f"<b>{skill}:</b> {value}" for skill, value in details['skills'].items())
+        story.append(Paragraph(skills_text, styles['Normal']))
+        story.append(Spacer(1, 12))
+
+    # Projects section
+    if details['projects']:
+        story.append(Paragraph('PROJECTS', styles['SectionHeader']))
+        for project in details['projects']:
+            project_text = f"<b>{project['name']}:</b> {project['description']}"
+            story.append(Paragraph(project_text, styles['Normal']))
+            story.append(Spacer(1, 6))
+
+    # Certifications section (if not empty)
+    if details['certifications']:
+        story.append(Paragraph('CERTIFICATIONS', styles['SectionHeader']))
+        for cert in details['certifications']:
+            story.append(Paragraph(cert, styles['Normal']))
+        story.append(Spacer(1, 12))
+
+    # Additional Information
+    if details['additional_info']:
+        story.append(Paragraph('ADDITIONAL INFORMATION', styles['SectionHeader']))
+        story.append(Paragraph(details['additional_info'], styles['Normal']))
+        story.append(Spacer(1, 12))
+
+    doc.build(story)
+
+
+# Runs in a pool worker
+def render_resume_bytes(details: dict) -> bytes:
+    buffer = BytesIO()
+    create_resume_pdf(buffer, details)
+    return buffer.getvalue()
+
+
+def resume_render_key(details: dict) -> str:
+    canonical = json.dumps(details, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# Bounded LRU of rendered PDFs keyed by resume_render_key
+class RenderCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pdf
+
+    def set(self, key: str, pdf: bytes):
+        with self._lock:
+            self._entries[key] = pdf
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        with self._lock:
+            cached_bytes = sum(len(pdf) for pdf in self._entries.values())
+            entries = len(self._entries)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "bytes": cached_bytes,
+        }
+
+
+render_cache = RenderCache(PDF_RENDER_CACHE_MAX_ENTRIES)
+
+render_pool = WorkerPool(PDF_RENDER_WORKERS)
+
+
+def shutdown_pool():
+    render_pool.shutdown()
+
+
+# Render a parsed resume to PDF bytes off the event loop, reusing the output
+# of an earlier render of identical data
+async def render_resume(details: dict) -> bytes:
+    key = resume_render_key(details)
+    pdf = render_cache.get(key)
+    if pdf is not None:
+        return pdf
+    start = time.perf_counter()
+    if PDF_RENDER_WORKERS > 0:
+        pdf = await asyncio.get_running_loop().run_in_executor(render_pool.get(), render_resume_bytes, details)
+    else:
+        pdf = await run_in_threadpool(render_resume_bytes, details)
+    PDF_RENDER_SECONDS.observe(time.perf_counter() - start)
+    render_cache.set(key, pdf)
+    return pdf
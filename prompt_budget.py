@@ -0,0 +1,156 @@
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from ats_scoring import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Per-section token budgets (override through environment variables)
+PROMPT_BUDGET_ENABLED = os.getenv("PROMPT_BUDGET_ENABLED", "1").lower() not in ("0", "false", "no")
+PROMPT_JD_MAX_TOKENS = int(os.getenv("PROMPT_JD_MAX_TOKENS", "1200"))
+PROMPT_RESUME_MAX_TOKENS = int(os.getenv("PROMPT_RESUME_MAX_TOKENS", "2000"))
+
+# Gemini averages about four characters per token on English prose; word and
+# punctuation pieces catch text that is denser than that (code, lists)
+CHARS_PER_TOKEN = 4
+TOKEN_PIECE_REGEX = re.compile(r"\w+|[^\w\s]")
+
+HORIZONTAL_SPACE_REGEX = re.compile(r"[^\S\n]+")
+BLANK_LINES_REGEX = re.compile(r"\n{3,}")
+SENTENCE_REGEX = re.compile(r"(?<=[.!?;])\s+")
+# Lines that carry no signal for matching or question generation: legal and
+# EEO notices, application instructions, page furniture
+BOILERPLATE_REGEX = re.compile(
+    r"equal (?:employment )?opportunity|\beeo\b|affirmative action|reasonable accommodation"
+    r"|without regard to (?:race|age|sex)|protected veteran|e-verify|privacy (?:notice|policy)"
+    r"|how to apply|apply now|click (?:here|apply)|^page \d+(?: of \d+)?$|^©|all rights reserved",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    return max(math.ceil(len(text) / CHARS_PER_TOKEN), len(TOKEN_PIECE_REGEX.findall(text)) * 3 // 4)
+
+
+def _clean_lines(text: str, drop_lines: bool) -> str:
+    seen = set()
+    lines = []
+    for line in HORIZONTAL_SPACE_REGEX.sub(" ", text).splitlines():
+        line = line.strip()
+        if not line:
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        if drop_lines:
+            key = line.lower()
+            if key in seen or BOILERPLATE_REGEX.search(line):
+                continue
+            seen.add(key)
+        lines.append(line)
+    return BLANK_LINES_REGEX.sub("\n\n", "\n".join(lines)).strip()
+
+
+# Collapse runs of whitespace; when the text is still over max_tokens (or no
+# budget is given), also drop boilerplate lines and lines repeated verbatim
+# (headers and footers copied onto every page). Text within budget keeps all
+# of its lines.
+def compact_text(text: str, max_tokens: Optional[int] = None) -> str:
+    collapsed = _clean_lines(text, drop_lines=False)
+    if max_tokens is not None and estimate_tokens(collapsed) <= max_tokens:
+        return collapsed
+    return _clean_lines(collapsed, drop_lines=True)
+
+
+# Hard cut to the budget, at a word boundary where there is one
+def truncate_to_budget(text: str, max_tokens: int) -> str:
+    end = min(len(text), max_tokens * CHARS_PER_TOKEN)
+    while end and estimate_tokens(text[:end]) > max_tokens:
+        end = end * 9 // 10
+    if end < len(text):
+        space = text.rfind(" ", 0, end + 1)
+        if space > end // 2:
+            end = space
+    return text[:end].rstrip()
+
+
+def _units(text: str) -> Tuple[List[str], str]:
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) > 1:
+        return lines, "\n"
+    return [sentence for sentence in SENTENCE_REGEX.split(text) if sentence], " "
+
+
+# Extractive cut: keep the lines (or sentences, for single-line text such as
+# extracted PDF text) with the most distinctive terms per token, in their
+# original order, until the budget is used up. Terms repeated on most lines
+# (culture blurbs, near-duplicate paragraphs) weigh little.
+def fit_to_budget(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    units, separator = _units(text)
+    unit_terms = [set(tokenize(unit)) for unit in units]
+    document_frequency = Counter(term for terms in unit_terms for term in terms)
+    costs = [estimate_tokens(unit) + 1 for unit in units]
+
+    def salience(index: int) -> float:
+        weight = sum(math.log1p(len(units) / document_frequency[term]) for term in unit_terms[index])
+        return weight / costs[index]
+
+    ranked = sorted(range(len(units)), key=salience, reverse=True)
+    kept = []
+    used = 0
+    for index in ranked:
+        if used + costs[index] <= max_tokens:
+            kept.append(index)
+            used += costs[index]
+    if not kept and units:
+        # Every unit is over budget on its own (e.g. a PDF with no sentence
+        # punctuation); an empty section would be worse than a truncated one
+        return truncate_to_budget(units[ranked[0]], max_tokens)
+    return separator.join(units[index] for index in sorted(kept))
+
+
+_stats = {"requests": 0, "tokens_before": 0, "tokens_after": 0}
+_stats_lock = threading.Lock()
+
+
+# Compact and fit each named prompt section to its budget; sections maps a
+# name to (text, max_tokens). Logs the per-section and total tokens saved.
+def fit_prompt_sections(call_site: str, sections: Dict[str, Tuple[str, int]]) -> Dict[str, str]:
+    if not PROMPT_BUDGET_ENABLED:
+        return {name: text for name, (text, _) in sections.items()}
+
+    fitted = {}
+    report = []
+    before_total = after_total = 0
+    for name, (text, max_tokens) in sections.items():
+        before = estimate_tokens(text)
+        fitted[name] = fit_to_budget(compact_text(text, max_tokens), max_tokens)
+        after = estimate_tokens(fitted[name])
+        report.append(f"{name} {before}->{after}")
+        before_total += before
+        after_total += after
+
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["tokens_before"] += before_total
+        _stats["tokens_after"] += after_total
+    logger.info(f"Prompt budget for {call_site}: {', '.join(report)} (saved {before_total - after_total} tokens)")
+    return fitted
+
+
+def budget_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["tokens_saved"] = stats["tokens_before"] - stats["tokens_after"]
+    stats["enabled"] = PROMPT_BUDGET_ENABLED
+    stats["jd_max_tokens"] = PROMPT_JD_MAX_TOKENS
+    stats["resume_max_tokens"] = PROMPT_RESUME_MAX_TOKENS
+    return stats
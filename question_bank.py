@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from ats_scoring import tokenize
+from database import SessionLocal
+from llm_cache import cache_bypass
+from models import MCQBank, MCQQuestion
+
+logger = logging.getLogger(__name__)
+
+# Bank settings (override through environment variables)
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "1").lower() not in ("0", "false", "no")
+# Questions returned per /interview-prep/ request when served from the bank
+QUESTION_BANK_SERVE_COUNT = int(os.getenv("QUESTION_BANK_SERVE_COUNT", "15"))
+# Pools below this size are topped up in the background
+QUESTION_BANK_MIN_POOL = int(os.getenv("QUESTION_BANK_MIN_POOL", "45"))
+# A pool is only topped up once it has been served from this many times, so
+# one-off (role, level, JD) combinations cost a single generation
+QUESTION_BANK_REFILL_AFTER_HITS = int(os.getenv("QUESTION_BANK_REFILL_AFTER_HITS", "1"))
+# Generation rounds a single refill may spend before giving up (the model
+# often repeats questions it has already produced)
+QUESTION_BANK_REFILL_MAX_ROUNDS = int(os.getenv("QUESTION_BANK_REFILL_MAX_ROUNDS", "3"))
+QUESTION_BANK_REFILL_WORKERS = int(os.getenv("QUESTION_BANK_REFILL_WORKERS", "1"))
+
+# Generator signature: (job_description, job_role, experience_level) -> questions
+QuestionGenerator = Callable[[str, str, str], Awaitable[List[dict]]]
+
+LABEL_REGEX = re.compile(r"[^a-z0-9+#]+")
+
+
+def normalize_label(value: str) -> str:
+    return " ".join(LABEL_REGEX.sub(" ", value.lower()).split())
+
+
+# Order-, case- and punctuation-insensitive fingerprint of the JD's terms, so
+# reposts of the same posting with different formatting share a bank
+def jd_fingerprint(job_description: str) -> str:
+    terms = " ".join(sorted(set(tokenize(job_description))))
+    return hashlib.sha256(terms.encode("utf-8")).hexdigest()[:16]
+
+
+def bank_key(job_description: str, job_role: str, experience_level: str) -> str:
+    parts = (normalize_label(job_role), normalize_label(experience_level), jd_fingerprint(job_description))
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def question_hash(question: dict) -> str:
+    return hashlib.sha256(normalize_label(question["text"]).encode("utf-8")).hexdigest()
+
+
+def question_dict(row: MCQQuestion) -> dict:
+    return {"text": row.text, "options": json.loads(row.options), "correctAnswer": row.correct_answer}
+
+
+# Persistent MCQ pools keyed by bank_key. Requests are answered with a random
+# sample from the pool when it holds enough questions; otherwise the caller
+# generates synchronously and hands the result to add(). Pools that are
+# served from repeatedly and run low are topped up by background workers.
+class QuestionBank:
+    def __init__(self, generator: QuestionGenerator, serve_count: int = QUESTION_BANK_SERVE_COUNT,
+                 min_pool: int = QUESTION_BANK_MIN_POOL, workers: int = QUESTION_BANK_REFILL_WORKERS,
+                 enabled: bool = QUESTION_BANK_ENABLED, refill_after_hits: int = QUESTION_BANK_REFILL_AFTER_HITS):
+        self.generator = generator
+        self.serve_count = serve_count
+        self.min_pool = min_pool
+        self.refill_after_hits = refill_after_hits
+        self.workers = workers
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_failures = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending = set()
+        self._tasks = []
+
+    async def start(self):
+        if not self.enabled:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    # A random sample of serve_count questions, or None on a cold miss
+    async def sample(self, job_description: str, job_role: str, experience_level: str) -> Optional[List[dict]]:
+        if not self.enabled:
+            return None
+        key = bank_key(job_description, job_role, experience_level)
+        try:
+            async with SessionLocal() as db:
+                pool_size = await self._pool_size(db, key)
+                if pool_size < self.serve_count:
+                    self.misses += 1
+                    return None
+                rows = (await db.execute(
+                    select(MCQQuestion)
+                    .where(MCQQuestion.bank_key == key)
+                    .order_by(func.random())
+                    .limit(self.serve_count)
+                )).scalars().all()
+                served_count = (await db.execute(
+                    select(MCQBank.served_count).where(MCQBank.key == key)
+                )).scalar_one_or_none() or 0
+                await db.execute(
+                    update(MCQBank)
+                    .where(MCQBank.key == key)
+                    .values(served_count=MCQBank.served_count + 1, last_served_at=datetime.utcnow())
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Question bank lookup failed: {str(e)}")
+            return None
+        self.hits += 1
+        if pool_size < self.min_pool and served_count + 1 >= self.refill_after_hits:
+            self.request_refill(key)
+        return [question_dict(row) for row in rows]
+
+    # Store freshly generated questions (duplicates are skipped). The pool is
+    # not topped up until it is served from: most keys are never asked again.
+    async def add(self, job_description: str, job_role: str, experience_level: str, questions: List[dict]):
+        if not self.enabled or not questions:
+            return
+        key = bank_key(job_description, job_role, experience_level)
+        try:
+            await self._store(key, job_description, job_role, experience_level, questions)
+        except Exception as e:
+            logger.error(f"Could not store questions in the bank: {str(e)}")
+
+    def request_refill(self, key: str):
+        if self._queue is None or key in self._pending:
+            return
+        self._pending.add(key)
+        self._queue.put_nowait(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "refills": self.refills,
+            "refill_failures": self.refill_failures,
+            "pending_refills": len(self._pending),
+        }
+
+    async def _pool_size(self, db, key: str) -> int:
+        return (await db.execute(
+            select(func.count()).select_from(MCQQuestion).where(MCQQuestion.bank_key == key)
+        )).scalar_one()
+
+    async def _store(self, key: str, job_description: str, job_role: str, experience_level: str,
+                     questions: List[dict]) -> int:
+        async with SessionLocal() as db:
+            if await db.get(MCQBank, key) is None:
+                try:
+                    async with db.begin_nested():
+                        db.add(MCQBank(key=key, job_role=job_role, experience_level=experience_level,
+                                       job_description=job_description, served_count=0))
+                except IntegrityError:
+                    pass  # created concurrently
+            existing = set((await db.execute(
+                select(MCQQuestion.question_hash).where(MCQQuestion.bank_key == key)
+            )).scalars().all())
+            added = 0
+            for question in questions:
+                digest = question_hash(question)
+                if digest in existing:
+                    continue
+                existing.add(digest)
+                try:
+                    async with db.begin_nested():
+                        db.add(MCQQuestion(bank_key=key, question_hash=digest, text=question["text"],
+                                           options=json.dumps(question["options"]),
+                                           correct_answer=question["correctAnswer"]))
+                    added += 1
+                except IntegrityError:
+                    pass  # stored concurrently
+            await db.commit()
+            return added
+
+    async def _refill(self, key: str):
+        async with SessionLocal() as db:
+            bank = await db.get(MCQBank, key)
+            if bank is None:
+                return
+            pool_size = await self._pool_size(db, key)
+        # Refills repeat the prompt that filled the pool in the first place, so
+        # the response cache would only hand back the questions already stored
+        token = cache_bypass.set(True)
+        try:
+            for _ in range(QUESTION_BANK_REFILL_MAX_ROUNDS):
+                if pool_size >= self.min_pool:
+                    return
+                questions = await self.generator(bank.job_description, bank.job_role, bank.experience_level)
+                added = await self._store(key, bank.job_description, bank.job_role, bank.experience_level, questions)
+                self.refills += 1
+                if not added:
+                    return
+                pool_size += added
+        finally:
+            cache_bypass.reset(token)
+
+    async def _worker(self, index: int):
+        while True:
+            key = await self._queue.get()
+            try:
+                await self._refill(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.refill_failures += 1
+                logger.error(f"Question bank refill worker {index} error: {str(e)}", exc_info=True)
+            finally:
+                self._pending.discard(key)
+                self._queue.task_done()
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from metrics import PDF_PARSE_SECONDS
+from pdf_extract import extract_pdf_text
+
+logger = logging.getLogger(__name__)
+
+# In-memory LRU size, and an optional directory for the on-disk tier
+RESUME_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "256"))
+RESUME_CACHE_DIR = os.getenv("RESUME_CACHE_DIR")
+
+NAME_REGEX = re.compile(r"^(.+)$", re.MULTILINE)
+EMAIL_REGEX = re.compile(r"Email:\s*(\S+)")
+ADDRESS_REGEX = re.compile(r"^(.*?)(?=Phone:)", re.MULTILINE)
+
+
+def resume_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# Parse the PDF once and derive everything the endpoints need from the text
+def parse_resume_bytes(data: bytes) -> dict:
+    start = time.perf_counter()
+    try:
+        resume_text = extract_pdf_text(data)
+    except Exception:
+        PDF_PARSE_SECONDS.labels("error").observe(time.perf_counter() - start)
+        raise
+    PDF_PARSE_SECONDS.labels("ok").observe(time.perf_counter() - start)
+
+    name = NAME_REGEX.search(resume_text)
+    email = EMAIL_REGEX.search(resume_text)
+    address = ADDRESS_REGEX.search(resume_text)
+
+    return {
+        "text": resume_text,
+        "name": name.group(1).strip() if name else "Unknown",
+        "email": email.group(1).strip() if email else "Unknown",
+        "address": address.group(0).strip() if address else "Unknown",
+    }
+
+
+# Bounded LRU of parsed resumes keyed by SHA-256 of the uploaded bytes,
+# optionally backed by one JSON file per digest on disk
+class ResumeTextCache:
+    def __init__(self, max_entries: int, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, digest: str) -> Optional[dict]:
+        with self._lock:
+            record = self._entries.get(digest)
+            if record is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return record
+        record = self._read_disk(digest)
+        with self._lock:
+            if record is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(digest, record)
+        return record
+
+    def set(self, digest: str, record: dict):
+        with self._lock:
+            self._remember(digest, record)
+        self._write_disk(digest, record)
+
+    def _remember(self, digest: str, record: dict):
+        self._entries[digest] = record
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, digest: str) -> Optional[dict]:
+        if not self.disk_dir:
+            return None
+        try:
+            return json.loads((self.disk_dir / f"{digest}.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable resume cache entry {digest}: {e}")
+            return None
+
+    def _write_disk(self, digest: str, record: dict):
+        if not self.disk_dir:
+            return
+        path = self.disk_dir / f"{digest}.json"
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not persist resume cache entry {digest}: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk_tier": str(self.disk_dir) if self.disk_dir else None,
+        }
+
+
+resume_text_cache = ResumeTextCache(RESUME_CACHE_MAX_ENTRIES, RESUME_CACHE_DIR)
+
+
+# digest can be passed in when the caller already hashed the bytes
+def get_resume_record(data: bytes, digest: Optional[str] = None) -> dict:
+    digest = digest or resume_digest(data)
+    record = resume_text_cache.get(digest)
+    if record is None:
+        record = parse_resume_bytes(data)
+        resume_text_cache.set(digest, record)
+    return record
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from metrics import LLM_SINGLE_FLIGHT_EVENTS
+
+# Share one model call between concurrent identical requests (0 disables)
+LLM_COALESCE_ENABLED = os.getenv("LLM_COALESCE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+# One in-flight call. The call runs in its own task so that a waiter going
+# away (client disconnect, timeout) never cancels it for the others; it is
+# cancelled only once nobody is waiting for it any more. Chunks are kept so
+# a request that joins a streaming call late still sees the whole response.
+class Flight:
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.finished = False
+        self.waiters = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    async def push(self, chunk: str):
+        self.chunks.append(chunk)
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def finish(self):
+        self.finished = True
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def wait_beyond(self, index: int):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.finished or len(self.chunks) > index)
+
+
+# Single-flight coalescing of identical in-flight LLM calls, keyed like the
+# response cache: the first request for a key (the leader) starts the call,
+# requests arriving while it runs join it, and all of them get its result or
+# its exception. Nothing is kept once the call finishes; that is the cache's job.
+class SingleFlight:
+    def __init__(self, enabled: bool = LLM_COALESCE_ENABLED):
+        self.enabled = enabled
+        self._flights: Dict[str, Flight] = {}
+        self._loop = None
+        self._counts = {"leaders": 0, "coalesced": 0, "abandoned": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, call_site: str, event: str):
+        with self._lock:
+            self._counts[event] += 1
+        LLM_SINGLE_FLIGHT_EVENTS.labels(call_site, event).inc()
+
+    # Join the flight for key, starting it with produce(flight) if there is none
+    def _join(self, key: str, call_site: str, produce: Callable[[Flight], Awaitable[str]]) -> Flight:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Tasks belong to one event loop; flights left on an old one are unusable
+            self._loop = loop
+            self._flights = {}
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = Flight()
+            flight.task = asyncio.ensure_future(self._run(key, flight, produce))
+            self._count(call_site, "leaders")
+        else:
+            self._count(call_site, "coalesced")
+        flight.waiters += 1
+        return flight
+
+    async def _run(self, key: str, flight: Flight, produce: Callable[[Flight], Awaitable[str]]) -> str:
+        try:
+            return await produce(flight)
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            await asyncio.shield(flight.finish())
+
+    def _leave(self, key: str, call_site: str, flight: Flight):
+        flight.waiters -= 1
+        if flight.waiters == 0 and not flight.task.done():
+            # Nobody wants the answer any more; new requests start afresh
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.task.cancel()
+            self._count(call_site, "abandoned")
+
+    # Await fetch() once per key among concurrent callers
+    async def call(self, key: str, call_site: str, fetch: Callable[[], Awaitable[str]]) -> str:
+        if not self.enabled:
+            return await fetch()
+
+        async def produce(flight: Flight) -> str:
+            text = await fetch()
+            await flight.push(text)
+            return text
+
+        flight = self._join(key, call_site, produce)
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            self._leave(key, call_site, flight)
+
+    # Stream fetch()'s chunks once per key: every caller receives every chunk,
+    # and callers of call() for the same key get the joined text
+    async def stream(self, key: str, call_site: str, fetch: Callable[[], AsyncIterator[str]]):
+        if not self.enabled:
+            async for chunk in fetch():
+                yield chunk
+            return
+
+        async def produce(flight: Flight) -> str:
+            async for chunk in fetch():
+                await flight.push(chunk)
+            return "".join(flight.chunks)
+
+        flight = self._join(key, call_site, produce)
+        try:
+            index = 0
+            while True:
+                while index < len(flight.chunks):
+                    yield flight.chunks[index]
+                    index += 1
+                if flight.finished:
+                    break
+                await flight.wait_beyond(index)
+            # Re-raises the call's exception, if any
+            await asyncio.shield(flight.task)
+        finally:
+            self._leave(key, call_site, flight)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counts)
+        requests = stats["leaders"] + stats["coalesced"]
+        stats["enabled"] = self.enabled
+        stats["in_flight"] = len(self._flights)
+        stats["coalesced_rate"] = stats["coalesced"] / requests if requests else 0.0
+        return stats
+
+
+single_flight = SingleFlight()
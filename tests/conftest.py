@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Tests never touch the development databases or a real model
+_workdir = tempfile.mkdtemp(prefix="resume-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/test.db"
+os.environ["LLM_CACHE_PATH"] = f"{_workdir}/llm_cache.db"
+os.environ["WORKFLOW_CHECKPOINT_PATH"] = f"{_workdir}/workflow_checkpoints.db"
+os.environ["LLM_PROVIDER"] = "fake"
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from checkpoints import WorkflowRunStore
+
+
+class WorkflowRunLeaseTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "checkpoints.db")
+        # Two worker processes sharing one checkpoint file
+        self.first = WorkflowRunStore(path, 3600, 300, lease_seconds=0.2, owner="worker-1")
+        self.second = WorkflowRunStore(path, 3600, 300, lease_seconds=0.2, owner="worker-2")
+
+    async def asyncTearDown(self):
+        await self.first.close()
+        await self.second.close()
+
+    async def test_live_run_cannot_be_claimed_by_another_process(self):
+        self.assertTrue(await self.first.claim("run"))
+        self.assertFalse(await self.second.claim("run"))
+        self.assertFalse(await self.first.claim("run"))
+        self.assertEqual((await self.second.get("run"))["status"], "running")
+
+    async def test_lapsed_lease_is_interrupted_and_can_be_taken_over(self):
+        self.assertTrue(await self.first.claim("run"))
+        await asyncio.sleep(0.3)
+        self.assertEqual((await self.second.get("run"))["status"], "interrupted")
+        self.assertTrue(await self.second.claim("run"))
+        # The original owner can no longer renew or finish the run
+        self.assertFalse(await self.first.heartbeat("run"))
+        await self.first.mark("run", "failed", "late")
+        self.assertEqual((await self.second.get("run"))["status"], "running")
+
+    async def test_lease_remaining_counts_down_while_the_holder_is_silent(self):
+        self.assertEqual(await self.second.lease_remaining("run"), 0)
+        self.assertTrue(await self.first.claim("run"))
+        self.assertGreater(await self.second.lease_remaining("run"), 0)
+        await asyncio.sleep(0.3)
+        self.assertEqual(await self.second.lease_remaining("run"), 0)
+
+    async def test_keep_alive_cancels_a_run_that_was_taken_over(self):
+        self.assertTrue(await self.first.claim("run"))
+        run = asyncio.create_task(asyncio.sleep(60))
+        heartbeat = asyncio.create_task(self.first.keep_alive("run", run, interval=0.3))
+        await asyncio.sleep(0.25)
+        self.assertTrue(await self.second.claim("run"))
+        await asyncio.wait_for(heartbeat, 5)
+        with self.assertRaises(asyncio.CancelledError):
+            await run
+
+    async def test_finished_run_can_be_resumed(self):
+        self.assertTrue(await self.first.claim("run"))
+        await self.first.mark("run", "failed", "boom")
+        self.assertEqual((await self.second.get("run"))["status"], "failed")
+        self.assertTrue(await self.second.claim("run"))
+
+    async def test_closed_store_does_not_reopen(self):
+        await self.first.claim("run")
+        await self.first.close()
+        with self.assertRaises(RuntimeError):
+            await self.first.mark("run", "interrupted")
+
+
+if __name__ == "__main__":
+    unittest.main()
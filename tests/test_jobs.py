@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, update
+
+from database import SessionLocal, init_db
+from jobs import JobRetryLater, ResumeJobQueue
+from models import ResumeJob
+
+
+async def no_handler(job_id, request, latency_budget):
+    raise AssertionError("workers are not started in these tests")
+
+
+class ResumeJobLeaseTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_db()
+        async with SessionLocal() as db:
+            await db.execute(delete(ResumeJob))
+            await db.commit()
+        # Two worker processes sharing one jobs table
+        self.first = ResumeJobQueue(no_handler, lease_seconds=30, owner="worker-1")
+        self.second = ResumeJobQueue(no_handler, lease_seconds=30, owner="worker-2")
+        self.job_id = (await self.first._create({"name": "Jane"}, None))["job_id"]
+
+    async def _set_heartbeat(self, age_seconds: float):
+        async with SessionLocal() as db:
+            await db.execute(
+                update(ResumeJob).where(ResumeJob.id == self.job_id)
+                .values(heartbeat_at=datetime.utcnow() - timedelta(seconds=age_seconds))
+            )
+            await db.commit()
+
+    async def test_only_one_process_claims_a_job(self):
+        claims = await asyncio.gather(self.first._claim(self.job_id), self.second._claim(self.job_id))
+        self.assertEqual(sum(claim is not None for claim in claims), 1)
+        job = await self.first.result(self.job_id)
+        self.assertEqual((job.status, job.attempts), ("running", 1))
+
+    async def test_recovery_skips_jobs_a_live_process_is_running(self):
+        self.assertIsNotNone(await self.first._claim(self.job_id))
+        self.assertNotIn(self.job_id, await self.second._recover())
+        self.assertEqual((await self.second.status(self.job_id))["status"], "running")
+        self.assertTrue(await self.first._heartbeat(self.job_id))
+
+    async def test_job_with_lapsed_lease_is_recovered_and_taken_over(self):
+        self.assertIsNotNone(await self.first._claim(self.job_id))
+        await self._set_heartbeat(60)
+        self.assertIn(self.job_id, await self.second._recover())
+        self.assertIsNotNone(await self.second._claim(self.job_id))
+        # The original owner can no longer renew or finish the job
+        self.assertFalse(await self.first._heartbeat(self.job_id))
+        await self.first._finish(self.job_id, status="failed", error="late")
+        self.assertEqual((await self.second.status(self.job_id))["status"], "running")
+
+    async def test_lost_lease_cancels_the_running_job(self):
+        started = asyncio.Event()
+
+        async def handler(job_id, request, latency_budget):
+            started.set()
+            await asyncio.sleep(60)
+
+        queue = ResumeJobQueue(handler, workers=1, heartbeat_seconds=0.05, lease_seconds=30, owner="worker-3")
+        await queue.start()
+        try:
+            await asyncio.wait_for(started.wait(), 5)
+            await self._set_heartbeat(60)
+            self.assertIn(self.job_id, await self.second._recover())
+            await asyncio.wait_for(queue._queue.join(), 5)
+        finally:
+            await queue.stop()
+        self.assertEqual((await self.second.status(self.job_id))["status"], "queued")
+
+    async def test_job_asked_to_retry_later_is_not_failed(self):
+        calls = []
+
+        async def handler(job_id, request, latency_budget):
+            calls.append(job_id)
+            if len(calls) < 3:
+                raise JobRetryLater("run still leased", 0.05)
+            return b"%PDF", "resume.pdf", 90.0
+
+        queue = ResumeJobQueue(handler, workers=1, max_attempts=1, owner="worker-3")
+        await queue.start()
+        try:
+            for _ in range(100):
+                if (await queue.status(self.job_id))["status"] not in ("queued", "running"):
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await queue.stop()
+        job = await queue.result(self.job_id)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual((job.status, job.attempts), ("succeeded", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import asyncio
+import unittest
+
+from llm_client import LLMClientManager
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+class BadRequest(Exception):
+    code = 400
+
+
+# Plays one scripted step per call: a number is a delay before answering
+# "answer-<call>", an exception is raised straight away
+class ScriptedLLM:
+    def __init__(self, model: str, *steps):
+        self.model = model
+        self.steps = list(steps)
+        self.calls = 0
+        self.cancelled = []
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.calls += 1
+        call = self.calls
+        step = self.steps[call - 1]
+        if isinstance(step, BaseException):
+            raise step
+        try:
+            await asyncio.sleep(step)
+        except asyncio.CancelledError:
+            self.cancelled.append(call)
+            raise
+        return f"answer-{call}"
+
+
+def manager(**overrides) -> LLMClientManager:
+    options = dict(timeout=1, max_attempts=3, backoff_base=0.001, backoff_max=0.01, max_concurrency=4)
+    options.update(overrides)
+    return LLMClientManager(**options)
+
+
+class RetryTest(unittest.IsolatedAsyncioTestCase):
+    async def test_rate_limited_call_is_retried(self):
+        client = manager()
+        llm = ScriptedLLM("retry-429", RateLimited(), RateLimited(), 0)
+        self.assertEqual(await client.ainvoke(llm, "prompt"), "answer-3")
+        self.assertEqual(client.stats()["retries"], 2)
+        self.assertEqual(client.stats()["errors"], 0)
+
+    async def test_timed_out_attempt_is_retried(self):
+        client = manager(timeout=0.05)
+        llm = ScriptedLLM("retry-timeout", 1, 0)
+        self.assertEqual(await client.ainvoke(llm, "prompt"), "answer-2")
+        self.assertEqual(llm.cancelled, [1])
+        self.assertEqual((client.stats()["timeouts"], client.stats()["retries"]), (1, 1))
+
+    async def test_client_errors_are_not_retried(self):
+        client = manager()
+        llm = ScriptedLLM("no-retry-400", BadRequest(), 0)
+        with self.assertRaises(BadRequest):
+            await client.ainvoke(llm, "prompt")
+        self.assertEqual(llm.calls, 1)
+        self.assertEqual(client.stats()["errors"], 1)
+
+    async def test_gives_up_after_max_attempts(self):
+        client = manager(max_attempts=2)
+        llm = ScriptedLLM("give-up-429", RateLimited(), RateLimited(), 0)
+        with self.assertRaises(RateLimited):
+            await client.ainvoke(llm, "prompt")
+        self.assertEqual(llm.calls, 2)
+
+
+class HedgeTest(unittest.IsolatedAsyncioTestCase):
+    async def test_faster_hedge_wins_and_slow_primary_is_cancelled(self):
+        client = manager(hedge_after=0.05)
+        llm = ScriptedLLM("hedge-wins", 5, 0)
+        self.assertEqual(await asyncio.wait_for(client.ainvoke(llm, "prompt"), 1), "answer-2")
+        self.assertEqual(llm.cancelled, [1])
+        self.assertEqual((client.stats()["hedges"], client.stats()["hedge_wins"]), (1, 1))
+        self.assertEqual(client.stats()["in_flight"], {})
+
+    async def test_primary_finishing_first_cancels_the_hedge(self):
+        client = manager(hedge_after=0.05)
+        llm = ScriptedLLM("primary-wins", 0.1, 5)
+        self.assertEqual(await asyncio.wait_for(client.ainvoke(llm, "prompt"), 1), "answer-1")
+        self.assertEqual(llm.cancelled, [2])
+        self.assertEqual((client.stats()["hedges"], client.stats()["hedge_wins"]), (1, 0))
+        self.assertEqual(client.stats()["in_flight"], {})
+
+    async def test_failed_hedge_waits_for_its_twin(self):
+        client = manager(hedge_after=0.05)
+        llm = ScriptedLLM("hedge-fails", 0.1, BadRequest())
+        self.assertEqual(await client.ainvoke(llm, "prompt"), "answer-1")
+        self.assertEqual(client.stats()["errors"], 0)
+
+    async def test_no_hedge_without_a_free_slot(self):
+        client = manager(hedge_after=0.05, max_concurrency=1)
+        llm = ScriptedLLM("hedge-no-slot", 0.1, 0)
+        self.assertEqual(await client.ainvoke(llm, "prompt"), "answer-1")
+        self.assertEqual((llm.calls, client.stats()["hedges"]), (1, 0))
+
+
+class TransportTest(unittest.IsolatedAsyncioTestCase):
+    async def test_one_transport_per_endpoint(self):
+        client = manager()
+        built = []
+
+        def build():
+            built.append(object())
+            return built[-1]
+
+        self.assertIs(client.transport("gemini", build), client.transport("gemini", build))
+        self.assertIs(client.async_transport("gemini", build), client.async_transport("gemini", build))
+        self.assertEqual(len(built), 2)
+
+    async def test_gemini_roles_share_one_client(self):
+        # Building the models opens no connection, so no real key is needed
+        from gemini_models import gemini_model
+
+        chat = gemini_model({"model": "models/gemini-1.5-pro", "chat": True}, "test-key", {})
+        text = gemini_model({"model": "gemini-pro", "chat": False}, "test-key", {})
+        scorer = gemini_model({"model": "gemini-pro", "chat": True}, "test-key", {"temperature": 0})
+        self.assertIs(chat.client, scorer.client)
+        self.assertIs(chat.client, text.client.client)
+        self.assertIs(chat.async_client, scorer.async_client)
+
+
+if __name__ == "__main__":
+    unittest.main()
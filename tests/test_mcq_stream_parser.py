@@ -0,0 +1,79 @@
+import unittest
+
+from utils import MCQStreamParser, parse_mcqs
+
+RAW = (
+    "Here are your questions:\n"
+    "Q1. What does **GIL** stand for?\n"
+    "A) Global Interpreter Lock\n"
+    "B) General Input Loop\n"
+    "C) Graph Index Layer\n"
+    "D) Garbage In, Lost\n"
+    "Answer: A\n"
+    "Q2. Which index type suits range scans?\n"
+    "A) Hash\n"
+    "B) B-tree\n"
+    "C) Bitmap\n"
+    "D) GIN\n"
+    "Answer: B\n"
+    "Q10. Which command lists pods?\n"
+    "A) kubectl get pods\n"
+    "B) kubectl pods\n"
+    "C) kubectl ls\n"
+    "D) kubectl show pods\n"
+    "Answer: A\n"
+)
+
+
+def stream(parser, chunks):
+    questions = []
+    for chunk in chunks:
+        questions.extend(parser.feed(chunk))
+    return questions + parser.close()
+
+
+class MCQStreamParserTest(unittest.TestCase):
+    def test_every_chunk_split_matches_whole_text_parse(self):
+        # Cuts every marker, option and answer line at every possible offset
+        expected = parse_mcqs(RAW)
+        self.assertEqual(len(expected), 3)
+        for size in range(1, 12):
+            chunks = [RAW[index:index + size] for index in range(0, len(RAW), size)]
+            self.assertEqual(stream(MCQStreamParser(), chunks), expected, size)
+
+    def test_question_is_emitted_once_its_answer_line_ends(self):
+        parser = MCQStreamParser()
+        self.assertEqual(parser.feed("Q1. Pick one\nA) x\nB) y\nC) z\nD) w\nAnswer"), [])
+        self.assertEqual(parser.feed(": C"), [])
+        questions = parser.feed("\nQ2")
+        self.assertEqual(questions, [{"text": "Pick one", "options": ["x", "y", "z", "w"], "correctAnswer": 2}])
+        self.assertEqual(parser.close(), [])
+
+    def test_marker_split_across_chunks_is_not_mistaken_for_text(self):
+        parser = MCQStreamParser()
+        questions = parser.feed("Q1. First\nA) a\nB) b\nC) c\nD) d\nAnswer: D\nQ")
+        questions += parser.feed("2. Second\nA) a\nB) b\nC) c\nD) d\nAnswer: B\n")
+        self.assertEqual([question["text"] for question in questions], ["First", "Second"])
+        self.assertEqual([question["correctAnswer"] for question in questions], [3, 1])
+
+    def test_final_question_without_trailing_newline_is_flushed_on_close(self):
+        parser = MCQStreamParser()
+        text = RAW.rstrip("\n")
+        questions = parser.feed(text)
+        self.assertEqual(len(questions), 2)
+        last = parser.close()
+        self.assertEqual(last, [{
+            "text": "Which command lists pods?",
+            "options": ["kubectl get pods", "kubectl pods", "kubectl ls", "kubectl show pods"],
+            "correctAnswer": 0,
+        }])
+        self.assertEqual(parser.close(), [])
+
+    def test_question_without_answer_line_is_cut_by_next_marker(self):
+        parser = MCQStreamParser()
+        questions = parser.feed("Q1. Orphan\nA) a\nB) b\nC) c\nD) d\nQ2. Next\nA) a\n")
+        self.assertEqual(questions, [{"text": "Orphan", "options": ["a", "b", "c", "d"], "correctAnswer": 0}])
+
+
+if __name__ == "__main__":
+    unittest.main()
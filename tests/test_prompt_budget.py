@@ -0,0 +1,48 @@
+import unittest
+
+from prompt_budget import compact_text, estimate_tokens, fit_prompt_sections, fit_to_budget
+
+SKILLS = ["python", "kubernetes", "postgresql", "react", "terraform", "spark", "golang", "kafka"]
+
+
+class FitToBudgetTest(unittest.TestCase):
+    def test_text_within_budget_is_unchanged(self):
+        text = "Python engineer. Built Kubernetes operators."
+        self.assertEqual(fit_to_budget(text, 100), text)
+
+    def test_keeps_salient_sentences_within_budget(self):
+        text = " ".join(f"Built {skill} services for payments." for skill in SKILLS) * 20
+        fitted = fit_to_budget(text, 50)
+        self.assertTrue(fitted)
+        self.assertLessEqual(estimate_tokens(fitted), 50)
+
+    def test_single_unit_over_budget_is_truncated_not_dropped(self):
+        # Extracted PDF text collapsed onto one line with no sentence punctuation
+        text = " ".join(SKILLS[index % len(SKILLS)] + f" project{index}" for index in range(8000))
+        self.assertGreater(len(text), 80000)
+        fitted = fit_to_budget(text, 2000)
+        self.assertTrue(fitted)
+        self.assertLessEqual(estimate_tokens(fitted), 2000)
+        self.assertTrue(text.startswith(fitted))
+
+
+class CompactTextTest(unittest.TestCase):
+    JD = "Backend engineer\nPython and PostgreSQL\nWe are an equal opportunity employer.\nPage 1 of 2"
+
+    def test_text_within_budget_keeps_boilerplate(self):
+        self.assertEqual(compact_text(self.JD, 100), self.JD)
+        self.assertEqual(fit_prompt_sections("test", {"jd": (self.JD, 100)})["jd"], self.JD)
+
+    def test_whitespace_is_collapsed_within_budget(self):
+        self.assertEqual(compact_text("Backend   engineer\n\n\n\nPython ", 100), "Backend engineer\n\nPython")
+
+    def test_boilerplate_and_repeated_lines_dropped_over_budget(self):
+        text = "\n".join([self.JD] + [f"Owns service {index}" for index in range(40)] + ["Backend engineer"])
+        compacted = compact_text(text, 50)
+        self.assertNotIn("equal opportunity", compacted)
+        self.assertNotIn("Page 1 of 2", compacted)
+        self.assertEqual(compacted.count("Backend engineer"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
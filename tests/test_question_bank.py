@@ -0,0 +1,76 @@
+import json
+import unittest
+
+from database import SessionLocal, init_db
+from llm_cache import cached_ainvoke
+from question_bank import QuestionBank, bank_key
+
+JOB_DESCRIPTION = "Backend engineer: Python, PostgreSQL, Kubernetes"
+
+
+# Writes a new batch of distinct questions on every call, like a model
+# sampling at a non-zero temperature
+class BatchLLM:
+    model = "batch-fake"
+    temperature = 0.7
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.calls = 0
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.calls += 1
+        start = (self.calls - 1) * self.batch_size
+        return json.dumps([
+            {"text": f"Question {number}?", "options": ["A", "B", "C", "D"], "correctAnswer": 0}
+            for number in range(start, start + self.batch_size)
+        ])
+
+
+class QuestionBankRefillTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_db()
+        self.llm = BatchLLM(batch_size=15)
+
+        # Same prompt every time, through the response cache, as utils.generate_mcqs does
+        async def generate(job_description, job_role, experience_level):
+            prompt = f"MCQs for {job_role} ({experience_level}):\n{job_description}"
+            return json.loads(await cached_ainvoke(self.llm, prompt, call_site="mcq_generation"))
+
+        self.generate = generate
+        self.bank = QuestionBank(generate, serve_count=15, min_pool=45, workers=1)
+        await self.bank.start()
+
+    async def asyncTearDown(self):
+        await self.bank.stop()
+
+    async def _pool_size(self, job_role: str) -> int:
+        async with SessionLocal() as db:
+            return await self.bank._pool_size(db, bank_key(JOB_DESCRIPTION, job_role, "Senior"))
+
+    async def test_cold_miss_is_not_refilled(self):
+        questions = await self.generate(JOB_DESCRIPTION, "Data Engineer", "Senior")
+        await self.bank.add(JOB_DESCRIPTION, "Data Engineer", "Senior", questions)
+        await self.bank._queue.join()
+
+        self.assertEqual(await self._pool_size("Data Engineer"), 15)
+        self.assertEqual(self.llm.calls, 1)
+        self.assertEqual(self.bank.stats()["refills"], 0)
+
+    async def test_refill_grows_pool_past_cached_batch(self):
+        # The request path generates (and caches) the first batch, then hands it to the bank
+        questions = await self.generate(JOB_DESCRIPTION, "Backend Engineer", "Senior")
+        await self.bank.add(JOB_DESCRIPTION, "Backend Engineer", "Senior", questions)
+        # Asked again: served from the pool, which is then topped up
+        served = await self.bank.sample(JOB_DESCRIPTION, "Backend Engineer", "Senior")
+        self.assertEqual(len(served), 15)
+        self.assertTrue(all(isinstance(question["correctAnswer"], int) for question in served))
+        await self.bank._queue.join()
+
+        self.assertEqual(await self._pool_size("Backend Engineer"), 45)
+        self.assertEqual(self.llm.calls, 3)
+        self.assertEqual(self.bank.stats()["refills"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import asyncio
+import unittest
+
+from single_flight import SingleFlight
+
+
+class Boom(Exception):
+    pass
+
+
+# A model call that runs until release() is called, counting how often it
+# was started and whether it was cancelled
+class GatedCall:
+    def __init__(self, result: str = "answer", chunks=()):
+        self.result = result
+        self.chunks = list(chunks)
+        self.starts = 0
+        self.cancelled = False
+        self.started = asyncio.Event()
+        self._release = asyncio.Event()
+        self._error = None
+
+    def release(self, error: Exception = None):
+        self._error = error
+        self._release.set()
+
+    async def fetch(self) -> str:
+        self.starts += 1
+        self.started.set()
+        try:
+            await self._release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self._error:
+            raise self._error
+        return self.result
+
+    async def fetch_stream(self):
+        self.starts += 1
+        self.started.set()
+        for chunk in self.chunks:
+            yield chunk
+            await asyncio.sleep(0)
+        await self._release.wait()
+        if self._error:
+            raise self._error
+
+
+class SingleFlightCallTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.flights = SingleFlight(enabled=True)
+
+    async def test_concurrent_callers_share_one_call(self):
+        call = GatedCall()
+        waiters = [asyncio.ensure_future(self.flights.call("key", "test", call.fetch)) for _ in range(3)]
+        await call.started.wait()
+        call.release()
+        self.assertEqual(await asyncio.gather(*waiters), ["answer"] * 3)
+        self.assertEqual(call.starts, 1)
+        self.assertEqual((self.flights.stats()["leaders"], self.flights.stats()["coalesced"]), (1, 2))
+
+    async def test_followers_get_the_result_after_the_leader_is_cancelled(self):
+        call = GatedCall()
+        leader = asyncio.ensure_future(self.flights.call("key", "test", call.fetch))
+        await call.started.wait()
+        follower = asyncio.ensure_future(self.flights.call("key", "test", call.fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+        call.release()
+        self.assertEqual(await follower, "answer")
+        self.assertFalse(call.cancelled)
+        self.assertEqual(call.starts, 1)
+
+    async def test_flight_is_abandoned_when_the_last_waiter_leaves(self):
+        call = GatedCall()
+        waiters = [asyncio.ensure_future(self.flights.call("key", "test", call.fetch)) for _ in range(2)]
+        await call.started.wait()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        self.assertTrue(call.cancelled)
+        self.assertEqual(self.flights.stats()["abandoned"], 1)
+        self.assertEqual(self.flights.stats()["in_flight"], 0)
+
+        # The next request starts a new call instead of joining the cancelled one
+        retry = GatedCall("second")
+        pending = asyncio.ensure_future(self.flights.call("key", "test", retry.fetch))
+        await retry.started.wait()
+        retry.release()
+        self.assertEqual(await pending, "second")
+
+    async def test_exception_reaches_every_waiter(self):
+        call = GatedCall()
+        waiters = [asyncio.ensure_future(self.flights.call("key", "test", call.fetch)) for _ in range(3)]
+        await call.started.wait()
+        call.release(Boom("model failed"))
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        self.assertTrue(all(isinstance(result, Boom) for result in results))
+        self.assertEqual(call.starts, 1)
+        self.assertEqual(self.flights.stats()["in_flight"], 0)
+
+    async def test_disabled_calls_are_not_shared(self):
+        flights = SingleFlight(enabled=False)
+        call = GatedCall()
+        call.release()
+        self.assertEqual(await asyncio.gather(*(flights.call("key", "test", call.fetch) for _ in range(2))),
+                         ["answer", "answer"])
+        self.assertEqual(call.starts, 2)
+
+
+class SingleFlightStreamTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.flights = SingleFlight(enabled=True)
+
+    async def collect(self, call: GatedCall) -> list:
+        return [chunk async for chunk in self.flights.stream("key", "test", call.fetch_stream)]
+
+    async def test_late_joiner_gets_replayed_chunks(self):
+        call = GatedCall(chunks=["Q1. ", "What ", "is "])
+        early = asyncio.ensure_future(self.collect(call))
+        await call.started.wait()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        expected = ["Q1. ", "What ", "is "]
+        # Every chunk has been produced before the second caller arrives
+        self.assertEqual(self.flights._flights["key"].chunks, expected)
+        late = asyncio.ensure_future(self.collect(call))
+        await asyncio.sleep(0)
+        call.release()
+        self.assertEqual(await early, expected)
+        self.assertEqual(await late, expected)
+        self.assertEqual(call.starts, 1)
+
+    async def test_call_joining_a_stream_gets_the_joined_text(self):
+        call = GatedCall(chunks=["Q1. ", "Answer: A\n"])
+        streaming = asyncio.ensure_future(self.collect(call))
+        await call.started.wait()
+        joined = asyncio.ensure_future(self.flights.call("key", "test", call.fetch))
+        await asyncio.sleep(0)
+        call.release()
+        self.assertEqual(await joined, "Q1. Answer: A\n")
+        self.assertEqual(await streaming, ["Q1. ", "Answer: A\n"])
+        self.assertEqual(call.starts, 1)
+
+    async def test_stream_exception_reaches_every_waiter_after_its_chunks(self):
+        call = GatedCall(chunks=["partial"])
+        received = [[], []]
+
+        async def consume(index: int):
+            async for chunk in self.flights.stream("key", "test", call.fetch_stream):
+                received[index].append(chunk)
+
+        consumers = [asyncio.ensure_future(consume(index)) for index in range(2)]
+        await call.started.wait()
+        call.release(Boom("stream broke"))
+        results = await asyncio.gather(*consumers, return_exceptions=True)
+        self.assertTrue(all(isinstance(result, Boom) for result in results))
+        self.assertEqual(received, [["partial"], ["partial"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import hashlib
+import os
+from dataclasses import dataclass
+
+from fastapi import HTTPException, UploadFile
+
+from pdf_extract import PDF_MAX_BYTES
+
+# Uploads are read from Starlette's spool in chunks of this size
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(64 * 1024)))
+# Allowance for form fields and multipart framing on top of the file itself
+UPLOAD_FORM_OVERHEAD_BYTES = int(os.getenv("UPLOAD_FORM_OVERHEAD_BYTES", str(256 * 1024)))
+
+PDF_MAGIC = b"%PDF-"
+# The PDF spec allows junk before the header; readers look in the first KiB
+PDF_MAGIC_WINDOW = 1024
+
+
+@dataclass
+class PDFUpload:
+    filename: str
+    data: bytes
+    digest: str
+
+
+# Read an uploaded PDF out of Starlette's spool chunk by chunk: reject non-PDF
+# filenames and content (415) and anything over max_bytes (413) as soon as it
+# is seen, and hash the bytes on the way through so the resume cache does not
+# hash them again. Starlette has already received the multipart body by now;
+# UploadLimitMiddleware is what cuts off oversized bodies while they arrive.
+async def read_pdf_upload(upload: UploadFile, max_bytes: int = PDF_MAX_BYTES) -> PDFUpload:
+    filename = upload.filename or ""
+    if not filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=415, detail="Please upload a PDF file")
+    if upload.size is not None and upload.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"PDF is larger than {max_bytes} bytes")
+
+    sha256 = hashlib.sha256()
+    size = 0
+    head = b""
+    chunks = []
+    while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"PDF is larger than {max_bytes} bytes")
+        if len(head) < PDF_MAGIC_WINDOW:
+            head += chunk[:PDF_MAGIC_WINDOW - len(head)]
+            if len(head) >= PDF_MAGIC_WINDOW and PDF_MAGIC not in head:
+                raise HTTPException(status_code=415, detail="Uploaded file is not a PDF")
+        sha256.update(chunk)
+        chunks.append(chunk)
+    if PDF_MAGIC not in head:
+        raise HTTPException(status_code=415, detail="Uploaded file is not a PDF")
+    return PDFUpload(filename=filename, data=b"".join(chunks), digest=sha256.hexdigest())
+
+
+# ASGI middleware that caps request bodies per path. Requests announcing a
+# larger Content-Length get a 413 before any of the body is read; chunked or
+# lying clients are cut off as soon as the streamed bytes pass the limit.
+class UploadLimitMiddleware:
+    def __init__(self, app, limits: dict):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await self._reject(send, limit)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=f"Request body is larger than {limit} bytes")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send, limit: int):
+        body = f'{{"detail":"Request body is larger than {limit} bytes"}}'.encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Load the heavy dependencies and clients in the background once the app has
+# started; with 0 they are loaded on first use and /ready reports ready at once
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+# Runs the registered warm-up steps one after another on worker threads, so the
+# server accepts traffic (liveness, cheap endpoints) while imports, prompt
+# templates, workflows and LLM clients are prepared. Requests that need a step
+# before it has run simply load it themselves.
+class WarmUp:
+    def __init__(self, enabled: bool = WARMUP_ENABLED):
+        self.enabled = enabled
+        self.steps: Dict[str, Callable[[], object]] = {}
+        self.results: Dict[str, dict] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, name: str, step: Callable[[], object]):
+        self.steps[name] = step
+        self.results[name] = {"status": "pending"}
+
+    def start(self):
+        self.started_at = time.monotonic()
+        if not self.enabled:
+            self.finished_at = self.started_at
+            return
+        self._task = asyncio.create_task(self.run())
+
+    async def run(self):
+        for name, step in self.steps.items():
+            start = time.perf_counter()
+            self.results[name] = {"status": "running"}
+            try:
+                await asyncio.to_thread(step)
+            except Exception as e:
+                logger.warning(f"Warm-up step {name} failed: {e}")
+                self.results[name] = {"status": "failed", "error": str(e)}
+            else:
+                self.results[name] = {"status": "done"}
+            self.results[name]["seconds"] = round(time.perf_counter() - start, 3)
+        self.finished_at = time.monotonic()
+        logger.info(f"Warm-up finished in {self.finished_at - self.started_at:.2f}s")
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    # Ready once every step has run without failing; a failed step (for
+    # example a missing API key) keeps the app out of rotation
+    def ready(self) -> bool:
+        if self.finished_at is None:
+            return False
+        return not self.enabled or all(result["status"] == "done" for result in self.results.values())
+
+    def stats(self) -> dict:
+        finished = self.finished_at is not None
+        return {
+            "ready": self.ready(),
+            "enabled": self.enabled,
+            "finished": finished,
+            "seconds": round(self.finished_at - self.started_at, 3) if finished else None,
+            "steps": self.results,
+        }
@@ -0,0 +1,53 @@
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+# A module's executor, created on first use and shared by its callers.
+# Process pools use spawn: forking a process that already runs threads is not
+# safe. After shutdown() or recycle() the next get() starts a fresh pool.
+class WorkerPool:
+    def __init__(self, workers: int, processes: bool = True, thread_name_prefix: str = "",
+                 initializer: Optional[Callable] = None, initargs: tuple = ()):
+        self.workers = workers
+        self.processes = processes
+        self.thread_name_prefix = thread_name_prefix
+        self.initializer = initializer
+        self.initargs = initargs
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.processes:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=self.initializer,
+                        initargs=self.initargs,
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix=self.thread_name_prefix,
+                        initializer=self.initializer, initargs=self.initargs,
+                    )
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    # Kill a process pool's workers outright, for work that will not stop on
+    # its own; executor is the one the caller used, in case it was already replaced
+    def recycle(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()